@@ -73,7 +73,6 @@ setup(
     install_requires=[
         'keri @ git+https://git@github.com/provenant-dev/keripy.git@v1.1.6-pr3',
         'hio>=0.6.8',
-        'multicommand>=1.0.0',
         'arelle-release>=1.0.0',
         'lxml>=4.6.3',
         'blake3>=0.3.1',
@@ -82,6 +81,8 @@ setup(
         'requests>=2.26.0'
     ],
     extras_require={
+        'asgi': ['uvicorn>=0.23', 'httpx>=0.23'],
+        'brotli': ['brotli>=1.2'],
     },
     tests_require=[
         'coverage>=5.5',
@@ -3,14 +3,74 @@
 keri.kxbrl.commands module
 
 """
-import multicommand
+import importlib
+import pkgutil
+import sys
 
 from caxe.app.cli import commands
 
 
+def discover(package):
+    """ Returns command names of package mapped to True for command groups, without importing any command
+
+    Modules of the package are commands and subpackages are groups of commands.
+
+    Parameters:
+        package (module): commands package
+
+    """
+    return {info.name: info.ispkg for info in pkgutil.iter_modules(package.__path__)
+            if not info.name.startswith("_")}
+
+
+def walk(package=commands, prefix=()):
+    """ Yields the name path of every command of package and its command groups """
+    for name, group in sorted(discover(package).items()):
+        if group:
+            yield from walk(importlib.import_module(f"{package.__name__}.{name}"), prefix + (name,))
+        else:
+            yield prefix + (name,)
+
+
+def usage(prog, package, file=sys.stdout):
+    print(f"usage: {prog} {{{','.join(sorted(discover(package)))}}} ...", file=file)
+
+
+def resolve(argv, package=commands, prog="cake"):
+    """ Import only the command named by the leading arguments
+
+    Parameters:
+        argv (list): command line arguments without the program name
+        package (module): commands package
+        prog (str): program name used in usage messages
+
+    Returns:
+        tuple: (parser, remaining arguments) of the selected command's module, exits with usage
+               if the arguments do not name a command
+
+    """
+    names = discover(package)
+    if not argv or argv[0] in ("-h", "--help"):
+        usage(prog, package)
+        sys.exit(0 if argv else 2)
+
+    name, *rest = argv
+    if name not in names:
+        usage(prog, package, file=sys.stderr)
+        print(f"{prog}: error: invalid choice: '{name}' (choose from {', '.join(sorted(names))})", file=sys.stderr)
+        sys.exit(2)
+
+    module = importlib.import_module(f"{package.__name__}.{name}")
+    if names[name]:
+        return resolve(rest, package=module, prog=f"{prog} {name}")
+
+    module.parser.prog = f"{prog} {name}"
+    return module.parser, rest
+
+
 def main():
-    parser = multicommand.create_parser(commands)
-    args = parser.parse_args()
+    parser, argv = resolve(sys.argv[1:])
+    args = parser.parse_args(argv)
 
     try:
         args.handler(args)
@@ -0,0 +1,35 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.bench.compare module
+
+"""
+import argparse
+import sys
+
+from caxe.core import benching
+
+parser = argparse.ArgumentParser(description='Compare two benchmark results')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('base', help='Baseline benchmark results JSON file')
+parser.add_argument('head', help='Benchmark results JSON file to compare against the baseline')
+parser.add_argument('--threshold', '-t', type=float, help='Relative change of median treated as unchanged',
+                    default=0.05)
+parser.add_argument('--fail-slower', action='store_true', help='Exit non zero if any stage is slower')
+
+
+def handler(args):
+    """
+    Print median timings of each stage of two benchmark results side by side
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    rows = benching.compare(benching.load(args.base), benching.load(args.head), threshold=args.threshold)
+
+    print(f"{'stage':>14}  {'base':>12}  {'head':>12}  {'ratio':>7}")
+    for row in rows:
+        print(f"{row['stage']:>14}  {row['base'] * 1000:10.2f}ms  {row['head'] * 1000:10.2f}ms  "
+              f"{row['ratio']:7.3f}  {row['change']}")
+
+    if args.fail_slower and any(row['change'] == "slower" for row in rows):
+        sys.exit(1)
@@ -0,0 +1,37 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.bench.fixture module
+
+"""
+import argparse
+
+from caxe.core import fixturing
+
+parser = argparse.ArgumentParser(description='Build offline load test fixture and prebuild the caxe keystore')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--dir', '-d', dest="path", help='Fixture directory', required=True)
+parser.add_argument('--stub', help='Base URL of the stub server', default="http://127.0.0.1:8724")
+parser.add_argument('--reports', type=int, help='Number of reports', default=4)
+parser.add_argument('--facts', type=int, help='Number of facts in each report', default=1000)
+parser.add_argument('-n', '--name', help='Name of caxe keystore to prebuild', default="caxe-bench")
+parser.add_argument('--base', '-b', help='additional optional prefix to file location of KERI keystore',
+                    required=False, default="")
+parser.add_argument('--alias', '-a', help='human readable alias of the caxe identifier', default="caxe")
+parser.add_argument('--passcode', help='22 character encryption passcode for keystore (is not saved)',
+                    dest="bran", default=None)
+
+
+def handler(args):
+    """
+    Build load test fixture
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    fixturer = fixturing.Fixturer(args.path, stub=args.stub, reports=args.reports, facts=args.facts)
+    manifest = fixturer.build(name=args.name, alias=args.alias, base=args.base, bran=args.bran)
+
+    for entry in manifest["reports"]:
+        print(f"{entry['path']}  rd {entry['rd']}  credential {entry['credential']}")
+    print(f"Start the server with: cake server --name {args.name} --alias {args.alias}"
+          f"{' --base ' + args.base if args.base else ''}")
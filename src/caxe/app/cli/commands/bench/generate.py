@@ -0,0 +1,35 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.bench.generate module
+
+"""
+import argparse
+
+from caxe.core import generating
+
+parser = argparse.ArgumentParser(description='Generate synthetic iXBRL report and local taxonomy for benchmarking')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--out', '-o', help='Output directory for report and taxonomy', required=True)
+parser.add_argument('--name', '-n', help='Base file name of the report', default="report")
+parser.add_argument('--facts', type=int, help='Number of facts', default=1000)
+parser.add_argument('--dimensions', type=int, help='Number of explicit dimensions', default=2)
+parser.add_argument('--members', type=int, help='Number of domain members of each dimension', default=4)
+parser.add_argument('--footnotes', type=int, help='Number of footnotes', default=10)
+parser.add_argument('--languages', help='Comma separated language codes', default="en")
+parser.add_argument('--links', type=int, help='Number of embedded ACDC credential links', default=1)
+parser.add_argument('--oobi', help='Base URL of embedded credential OOBI links', default="http://127.0.0.1:5642")
+parser.add_argument('--seed', type=int, help='Random seed', default=0)
+
+
+def handler(args):
+    """
+    Generate synthetic iXBRL report
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    generator = generating.Generator(facts=args.facts, dimensions=args.dimensions, members=args.members,
+                                     footnotes=args.footnotes, languages=args.languages.split(","),
+                                     links=args.links, oobi=args.oobi, seed=args.seed)
+    path = generator.generate(args.out, name=args.name)
+    print(path)
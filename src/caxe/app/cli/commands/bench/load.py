@@ -0,0 +1,48 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.bench.load module
+
+"""
+import argparse
+
+from caxe.core import loading
+
+parser = argparse.ArgumentParser(description='Load test the verify and saidify endpoints of a caxe server')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--dir', '-d', dest="path", help='Fixture directory', required=True)
+parser.add_argument('--url', '-u', help='Base URL of caxe server', default="http://127.0.0.1:8723")
+parser.add_argument('--modes', '-m', help=f'Comma separated request modes, from {",".join(loading.MODES)}',
+                    default=",".join(loading.MODES))
+parser.add_argument('--concurrency', '-c', type=int, help='Number of concurrent clients', default=8)
+parser.add_argument('--requests', '-r', type=int, help='Total number of requests', default=100)
+parser.add_argument('--duration', type=float, help='Seconds to run, overrides --requests', default=None)
+parser.add_argument('--timeout', type=float, help='Seconds to wait for each response', default=30.0)
+parser.add_argument('--facts', type=int, help='Number of fact ids sent with each saidify request', default=10)
+parser.add_argument('--out', '-o', help='Output file for JSON results', default=None)
+
+
+def handler(args):
+    """
+    Run load test and print throughput and latency percentiles of each request mode
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    loader = loading.Loader(args.url, args.path, modes=tuple(args.modes.split(",")), concurrency=args.concurrency,
+                            requests=args.requests, duration=args.duration, timeout=args.timeout, facts=args.facts)
+    results = loader.run()
+
+    if args.out:
+        loading.save(results, args.out)
+
+    meta = results["meta"]
+    print(f"{meta['concurrency']} clients, {meta['elapsed']:.2f}s, {meta['throughput']:.2f} req/s")
+    print(f"{'mode':>8}  {'requests':>8}  {'ok':>6}  {'req/s':>8}  {'p50':>10}  {'p95':>10}  {'p99':>10}")
+    for mode, stats in results["modes"].items():
+        if not stats["requests"]:
+            continue
+
+        print(f"{mode:>8}  {stats['requests']:8d}  {stats['ok']:6d}  {stats['throughput']:8.2f}  "
+              f"{stats['p50'] * 1000:8.1f}ms  {stats['p95'] * 1000:8.1f}ms  {stats['p99'] * 1000:8.1f}ms")
+        for error, count in stats["errors"].items():
+            print(f"{'':>10}{count} x {error}")
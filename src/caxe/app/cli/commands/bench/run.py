@@ -0,0 +1,40 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.bench.run module
+
+"""
+import argparse
+import json
+
+from caxe.core import benching
+
+parser = argparse.ArgumentParser(description='Benchmark extraction stages of an iXBRL report')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--file', '-f', help='iXBRL report to benchmark', required=True)
+parser.add_argument('--out', '-o', help='Output file for JSON results, printed if not provided', default=None)
+parser.add_argument('--runs', '-r', type=int, help='Number of timed runs of each stage', default=5)
+parser.add_argument('--warmup', '-w', type=int, help='Number of untimed runs of each stage', default=1)
+parser.add_argument('--stages', '-s', help=f'Comma separated stages to run, from {",".join(benching.STAGES)}',
+                    default=",".join(benching.STAGES))
+parser.add_argument('--validations', action='store_true',
+                    help='Time the full Arelle load profile buffering log records for validation messages')
+
+
+def handler(args):
+    """
+    Benchmark extraction of iXBRL report
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    bencher = benching.Bencher(args.file, runs=args.runs, warmup=args.warmup, stages=tuple(args.stages.split(",")),
+                               validations=args.validations)
+    results = bencher.run()
+
+    if args.out:
+        benching.save(results, args.out)
+    else:
+        print(json.dumps(results, indent=2))
+
+    for stage, stats in results["stages"].items():
+        print(f"{stage:>14}  median {stats['median'] * 1000:10.2f}ms  min {stats['min'] * 1000:10.2f}ms")
@@ -0,0 +1,36 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.bench.startup module
+
+"""
+import argparse
+import json
+
+from caxe.core import benching
+
+parser = argparse.ArgumentParser(description='Benchmark startup time of each cake command')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--out', '-o', help='Output file for JSON results, printed if not provided', default=None)
+parser.add_argument('--runs', '-r', type=int, help='Number of timed runs of each command', default=5)
+parser.add_argument('--warmup', '-w', type=int, help='Number of untimed runs of each command', default=1)
+parser.add_argument('--commands', '-c', help='Comma separated commands to time, e.g. "links,bench run"',
+                    default=None)
+
+
+def handler(args):
+    """
+    Benchmark startup of cake commands
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    names = [tuple(name.split()) for name in args.commands.split(",")] if args.commands else None
+    results = benching.startup(runs=args.runs, warmup=args.warmup, names=names)
+
+    if args.out:
+        benching.save(results, args.out)
+    else:
+        print(json.dumps(results, indent=2))
+
+    for name, stats in results["stages"].items():
+        print(f"{name:>16}  median {stats['median'] * 1000:10.2f}ms  min {stats['min'] * 1000:10.2f}ms")
@@ -0,0 +1,38 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.bench.stub module
+
+"""
+import argparse
+
+from caxe.core import stubbing
+
+parser = argparse.ArgumentParser(description='Serve load test fixture reports and credential OOBIs')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--dir', '-d', dest="path", help='Fixture directory', required=True)
+parser.add_argument('--host', default="127.0.0.1", help='Host address to bind (default: 127.0.0.1)')
+parser.add_argument('-p', '--port', type=int, default=8724, help="Port to bind.  Defaults to 8724")
+parser.add_argument('--latency', type=float, default=0.0, help='Seconds to delay every response')
+parser.add_argument('--jitter', type=float, default=0.0, help='Maximum additional random seconds of delay')
+parser.add_argument('--failure-rate', dest="failures", type=float, default=0.0,
+                    help='Fraction of requests answered with 503, between 0 and 1')
+parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible failures and jitter')
+
+
+def handler(args):
+    """
+    Run stub server until interrupted
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    stubber = stubbing.Stubber(latency=args.latency, jitter=args.jitter, failures=args.failures, seed=args.seed)
+    server = stubbing.server(args.path, host=args.host, port=args.port, stubber=stubber)
+
+    print(f"Stub server listening on {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -6,83 +6,62 @@ keri.kli.commands module
 import argparse
 import io
 import json
+import os
 
-import blake3
-from lxml import etree, html
-
-from keri import help
-from keri.core import coring
-from arelle import ModelManager, CntlrCmdLine, FileSource
-
-from caxe.core import attribing
+from caxe.core import extracting
 
 parser = argparse.ArgumentParser(description='Extract attributes section')
 parser.set_defaults(handler=lambda args: handler(args),
                     transferable=True)
-parser.add_argument('--file', '-f', help='File to load and extract', default="", required=True)
-parser.add_argument('--out', '-o', help='Putput file for extract data values', default="", required=True)
+source = parser.add_mutually_exclusive_group(required=True)
+source.add_argument('--file', '-f', help='File to load and extract', default=None)
+source.add_argument('--dir', '-d', dest="path", help='Directory of reports to extract in batch', default=None)
+source.add_argument('--manifest', '-m', help='File listing one report path per line to extract in batch',
+                    default=None)
+parser.add_argument('--out', '-o', help='Output file for extract data values, JSONL with one record per report '
+                                        'in batch mode', default="", required=True)
+parser.add_argument('--workers', '-w', type=int, help='Number of batch worker processes, defaults to CPU count',
+                    default=None)
+parser.add_argument('--fact-workers', dest="factWorkers", type=int, default=1,
+                    help='Number of processes extracting the facts of --file once it loads, 0 for the CPU count.  '
+                         'Reports with fewer than 20000 facts are extracted in one process')
+parser.add_argument('--stream', action='store_true',
+                    help='Stream fact records of --file to compact JSON output to reduce peak memory')
+parser.add_argument('--cache-dir', dest="cacheDir", help='Shared Arelle taxonomy cache directory', default=None)
+parser.add_argument('--merkle', action='store_true',
+                    help='Attest the Merkle root `mr` of the fact records for per-fact inclusion proofs')
 
 
 def handler(args):
     """
-    Create KERI identifier prefix in specified key store with alias
+    Extract and saidify the attestation of a report, or of every report of a batch
 
     Args:
         args(Namespace): arguments object from command line
     """
-    cntlr = CntlrCmdLine.CntlrCmdLine()
-    cntlr.startLogging(logFileName='logToBuffer')
-
-    f = io.open(args.file, mode="r", encoding="utf-8")
-    out = io.open(args.out, mode="w", encoding="utf-8")
-
-    data = f.read()
-
-    root = html.document_fromstring(data.encode("utf-8"))
-    links = root.xpath(".//link[@type='application/json+acdc']")
-
-    for link in links:
-        link.getparent().remove(link)
-
-    data = etree.tostring(root)
-    xmld = etree.canonicalize(data.decode("utf-8"))
-    raw = blake3.blake3(xmld.encode("utf-8")).digest()
-    diger = coring.Diger(raw=raw)
-
-    a = dict(
-        d='',
-        rd=diger.qb64,
-        dt=help.nowIso8601()
-    )
-
-    mmgr = ModelManager.initialize(cntlr)
-    filesource = FileSource.FileSource(args.file)
-    mmgr.load(filesource)
-
-    attriber = attribing.Attiber(dts=mmgr.modelXbrl)
-    attriber.createViewer()
-
-    values = []
-    for fact in mmgr.modelXbrl.facts:
-        raw = blake3.blake3(etree.tostring(fact)).digest()
-        diger = coring.Diger(raw=raw)
-        fad = attriber.taxonomyData['facts'][fact.id]
-        attr = dict(
-            i=fact.id,
-            t=fact.localName,
-            d=diger.qb64,
-            v=fad['v'],
-        )
-        attr['c'] = fad['a']['c']
-        attr['e'] = fad['a']['e']
-        attr['p'] = fad['a']['p']
-
-        if 'f' in fad:
-            attr['f'] = fad['f']
-
-        values.append(attr)
-
-    a['f'] = values
-    _, a = coring.Saider.saidify(sad=a)
-
-    json.dump(a, out, indent=2)
+    if args.file:
+        cntlr = extracting.controller(cacheDir=args.cacheDir)
+        workers = args.factWorkers or os.cpu_count()
+        if args.stream:
+            with open(args.out, mode="wb") as out:
+                extracting.stream(cntlr, args.file, out, merkle=args.merkle, workers=workers)
+            return
+
+        a = extracting.attest(cntlr, args.file, merkle=args.merkle, workers=workers)
+
+        out = io.open(args.out, mode="w", encoding="utf-8")
+        json.dump(a, out, indent=2)
+        return
+
+    paths = extracting.scan(args.path) if args.path else extracting.manifest(args.manifest)
+    batcher = extracting.Batcher(paths, args.out, workers=args.workers, cacheDir=args.cacheDir,
+                                 merkle=args.merkle)
+
+    def progress(record):
+        if "error" in record:
+            print(f"{record['path']}: {record['error']}")
+        else:
+            print(f"{record['path']}: {record['said']} ({record['elapsed']:.2f}s)")
+
+    extracted, failed, skipped = batcher.run(progress=progress)
+    print(f"extracted {extracted}, failed {failed}, skipped {skipped} already extracted of {len(paths)} reports")
@@ -0,0 +1,7 @@
+# -*- encoding: utf-8 -*-
+
+"""
+CAXE
+caxe.app.cli.commands.proof package
+
+"""
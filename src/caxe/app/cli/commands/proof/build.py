@@ -0,0 +1,46 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.proof.build module
+
+"""
+import argparse
+import json
+import sys
+
+from caxe.core import merkling
+
+parser = argparse.ArgumentParser(description='Build the Merkle inclusion proof of one fact of an attestation')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--attestation', '-a', help='Attestation JSON file written by `cake extract --merkle`',
+                    required=True)
+parser.add_argument('--fact', '-f', dest="fid", help='Id of the fact to prove', required=True)
+parser.add_argument('--out', '-o', help='Output file for the proof, stdout if not provided', default=None)
+
+
+def handler(args):
+    """
+    Build the inclusion proof of a fact from the fact records of an attestation
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    with open(args.attestation, "r", encoding="utf-8") as f:
+        a = json.load(f)
+
+    try:
+        proof = merkling.prove(a.get('f', []), args.fid)
+    except ValueError as ex:
+        print(f"ERR: {ex}", file=sys.stderr)
+        sys.exit(1)
+
+    if a.get('mr') != proof['mr']:
+        print(f"ERR: Merkle root {proof['mr']} of the fact records does not match attested root {a.get('mr')}",
+              file=sys.stderr)
+        sys.exit(1)
+
+    if args.out is None:
+        print(json.dumps(proof, indent=2))
+        return
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(proof, f, indent=2)
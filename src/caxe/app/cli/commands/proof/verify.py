@@ -0,0 +1,33 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.proof.verify module
+
+"""
+import argparse
+import json
+import sys
+
+from caxe.core import merkling
+
+parser = argparse.ArgumentParser(description='Verify the Merkle inclusion proof of a fact')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('proof', help='Proof JSON file from `cake proof build` or the /report/proof endpoint')
+parser.add_argument('--root', '-r', help='Trusted Merkle root `mr`, such as that of a verified attestation '
+                                         'credential, the proof must be for this root', default=None)
+
+
+def handler(args):
+    """
+    Check the inclusion proof of a fact without the rest of the report, exiting non zero if it is invalid
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    with open(args.proof, "r", encoding="utf-8") as f:
+        proof = json.load(f)
+
+    if not merkling.verify(proof, mr=args.root):
+        print(f"invalid proof of fact {proof.get('i')}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"fact {proof['i']} is fact {proof['x']} of {proof['n']} under Merkle root {proof['mr']}")
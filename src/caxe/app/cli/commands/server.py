@@ -6,10 +6,13 @@ keri.kli.commands module
 import argparse
 import os
 
+from keri import help
 from keri.app import keeping, habbing, directing, configing, oobiing
 from keri.app.cli.common import existing
 
-from caxe.core import serving
+from caxe.core import admitting, compressing, ogling, serving, profiling, tracing, warming
+
+logger = help.ogler.getLogger()
 
 parser = argparse.ArgumentParser(description='Launch CaXe micro-service')
 parser.set_defaults(handler=lambda args: launch(args),
@@ -38,9 +41,140 @@ parser.add_argument('--config-file',
                     action='store',
                     default=None,
                     help="configuration filename override")
+parser.add_argument('--cache-ttl',
+                    dest="cacheTtl",
+                    type=float,
+                    default=float(os.environ.get('CAXE_CACHE_TTL', 60.0)),
+                    help="Seconds to cache report verification results, 0 disables caching.  Defaults to 60")
+parser.add_argument('--batch-parallelism',
+                    dest="parallelism",
+                    type=int,
+                    default=int(os.environ.get('CAXE_BATCH_PARALLELISM', 16)),
+                    help="Maximum number of reports of one batch verified at once.  Defaults to 16")
+parser.add_argument('--profile-dir',
+                    dest="profileDir",
+                    default=os.environ.get('CAXE_PROFILE_DIR'),
+                    help="directory to save request profiles in, enables on-demand profiling, requires "
+                         "--profile-token")
+parser.add_argument('--profile-token',
+                    dest="profileToken",
+                    default=os.environ.get('CAXE_PROFILE_TOKEN'),
+                    help="admin token that must be sent in the CAXE-Profile header to profile a request and "
+                         "to retrieve profiles")
+parser.add_argument('--profile-all',
+                    dest="profileAll",
+                    action='store_true',
+                    help="profile every saidify and verify request, requires --profile-dir")
+parser.add_argument('--loglevel',
+                    choices=ogling.Levels,
+                    default=os.environ.get('CAXE_LOG_LEVEL', 'WARNING'),
+                    help="Level of the log records written, by a background thread, to stderr.  Defaults to WARNING")
+parser.add_argument('--log-sample',
+                    dest="logSample",
+                    type=int,
+                    default=int(os.environ.get('CAXE_LOG_SAMPLE', 100)),
+                    help="Write one of every so many records of high volume debug messages, 1 writes all.  "
+                         "Defaults to 100")
+parser.add_argument('--trace-file',
+                    dest="traceFile",
+                    default=os.environ.get('CAXE_TRACE_FILE'),
+                    help="JSONL file to append the spans of sampled verify and saidify requests to, enables tracing, "
+                         "shared by every worker.  Read with `cake trace`")
+parser.add_argument('--trace-rate',
+                    dest="traceRate",
+                    type=float,
+                    default=float(os.environ.get('CAXE_TRACE_RATE', 0.01)),
+                    help="Fraction of requests traced when --trace-file is set.  Defaults to 0.01")
+parser.add_argument('--verify-concurrency',
+                    dest="verifyConcurrency",
+                    type=int,
+                    default=int(os.environ.get('CAXE_VERIFY_CONCURRENCY', 64)),
+                    help="Maximum number of report verifications in progress, 0 is unlimited.  Defaults to 64")
+parser.add_argument('--verify-queue',
+                    dest="verifyQueue",
+                    type=int,
+                    default=int(os.environ.get('CAXE_VERIFY_QUEUE', 256)),
+                    help="Maximum number of report verifications waiting to start, further requests are rejected "
+                         "with 429.  Defaults to 256")
+parser.add_argument('--saidify-concurrency',
+                    dest="saidifyConcurrency",
+                    type=int,
+                    default=int(os.environ.get('CAXE_SAIDIFY_CONCURRENCY', os.cpu_count() or 1)),
+                    help="Maximum number of saidify requests in progress, 0 is unlimited.  Defaults to the number "
+                         "of CPUs")
+parser.add_argument('--saidify-queue',
+                    dest="saidifyQueue",
+                    type=int,
+                    default=int(os.environ.get('CAXE_SAIDIFY_QUEUE', 16)),
+                    help="Maximum number of saidify requests waiting to start in --asgi mode, further requests are "
+                         "rejected with 429.  Defaults to 16")
+parser.add_argument('--report-budget',
+                    dest="reportBudget",
+                    type=int,
+                    default=int(os.environ.get('CAXE_REPORT_BUDGET', 1 << 29)),
+                    help="Bytes of report bodies each process holds at once, new reports wait while the budget is "
+                         "spent, except uploads to the hio server that are rejected with 429, 0 is unlimited.  "
+                         "Defaults to 512MB")
+parser.add_argument('--client-rate',
+                    dest="clientRate",
+                    type=float,
+                    default=float(os.environ.get('CAXE_CLIENT_RATE', 0.0)),
+                    help="Requests per second allowed for each client, identified by the CAXE-Client header or its "
+                         "address, 0 disables per-client limits.  Defaults to 0")
+parser.add_argument('--client-burst',
+                    dest="clientBurst",
+                    type=float,
+                    default=None,
+                    help="Requests a client may make at once.  Defaults to --client-rate")
+parser.add_argument('--compress-threshold',
+                    dest="compressThreshold",
+                    type=int,
+                    default=int(os.environ.get('CAXE_COMPRESS_THRESHOLD', compressing.Threshold)),
+                    help="Minimum size in bytes of responses compressed for clients sending Accept-Encoding.  "
+                         "Defaults to 1024")
+parser.add_argument('--compress-level',
+                    dest="compressLevel",
+                    type=int,
+                    default=int(os.environ.get('CAXE_COMPRESS_LEVEL', compressing.Level)),
+                    help="Compression level of responses, 0 disables response compression.  Defaults to 6")
+parser.add_argument('--job-ttl',
+                    dest="jobTtl",
+                    type=float,
+                    default=float(os.environ['CAXE_JOB_TTL']) if 'CAXE_JOB_TTL' in os.environ else None,
+                    help="Seconds the results of verification jobs, requested with Prefer: respond-async, are kept "
+                         "after they finish.  Defaults to 3600.  Jobs are served by the hio server only, it is an "
+                         "error with --asgi or --workers")
+parser.add_argument('--warm-interval',
+                    dest="warmInterval",
+                    type=float,
+                    default=float(os.environ['CAXE_WARM_INTERVAL']) if 'CAXE_WARM_INTERVAL' in os.environ else None,
+                    help="Seconds between refreshes of the credential (curls) and issuer (iurls) OOBIs of the "
+                         "configuration file.  Defaults to half of --cache-ttl")
+parser.add_argument('--asgi',
+                    action='store_true',
+                    help="serve with falcon.asgi on uvicorn instead of the hio HTTP server, requires caxe[asgi]")
+parser.add_argument('--workers',
+                    type=int,
+                    default=int(os.environ.get('CAXE_WORKERS', 0)),
+                    help="number of worker processes accepting connections on the port, each serving as --asgi, "
+                         "while this process owns the keystore.  Defaults to 0, a single process")
+parser.add_argument('--executor-workers',
+                    dest="executorWorkers",
+                    type=int,
+                    default=None,
+                    help="number of threads for report parsing and Arelle processing of each --asgi process")
 
 
 def launch(args, expire=0.0):
+    if args.profileDir is not None and not args.profileToken:
+        parser.error("--profile-dir requires --profile-token, the admin token profiles are retrieved with")
+    if args.profileAll and args.profileDir is None:
+        parser.error("--profile-all requires --profile-dir")
+    if args.jobTtl is not None and (args.asgi or args.workers > 0):
+        parser.error("--job-ttl requires the hio server, verification jobs are not served with --asgi or --workers")
+
+    ogling.start(level=args.loglevel, every=args.logSample)
+
     name = args.name
     base = args.base
     bran = args.bran
@@ -49,6 +183,14 @@ def launch(args, expire=0.0):
     alias = args.alias
     configFile = args.configFile
     configDir = args.configDir
+    cacheTtl = args.cacheTtl
+    parallelism = args.parallelism
+    profiler = profiling.Profiler(path=args.profileDir, token=args.profileToken, always=args.profileAll)
+    limits = admitting.Limits(verify=args.verifyConcurrency, verifyQueue=args.verifyQueue,
+                              saidify=args.saidifyConcurrency, saidifyQueue=args.saidifyQueue,
+                              rate=args.clientRate, burst=args.clientBurst, budget=args.reportBudget)
+    compressor = compressing.Compressor(threshold=args.compressThreshold, level=args.compressLevel)
+    tracer = tracing.Tracer(path=args.traceFile, rate=args.traceRate)
 
     ks = keeping.Keeper(name=name,
                         base=base,
@@ -56,18 +198,19 @@ def launch(args, expire=0.0):
                         reopen=True)
 
     aeid = ks.gbls.get('aeid')
+    ks.close()
 
-    if aeid is None:
-
-        cf = None
-        if configFile is not None:
-            cf = configing.Configer(name=configFile,
-                                    base=base,
-                                    headDirPath=configDir,
-                                    temp=False,
-                                    reopen=True,
-                                    clear=False)
+    cf = None
+    if configFile is not None:
+        cf = configing.Configer(name=configFile,
+                                base=base,
+                                headDirPath=configDir,
+                                temp=False,
+                                reopen=True,
+                                clear=False)
+    oobis = warming.Oobis.load(cf, interval=args.warmInterval)
 
+    if aeid is None:
         hby = habbing.Habery(name=name, base=base, bran=bran, cf=cf)
     else:
         hby = existing.setupHby(name=name, base=base, bran=bran)
@@ -77,9 +220,31 @@ def launch(args, expire=0.0):
     
     doers = [hbyDoer, *obl.doers]
 
-    doers += serving.setup(hby, alias, htp, host)
+    if args.workers > 0:
+        from caxe.core import clustering
+
+        doers += clustering.setup(hby, alias, host=host, port=htp, count=args.workers, ttl=cacheTtl,
+                                  parallelism=parallelism, profiler=profiler, workers=args.executorWorkers,
+                                  limits=limits, compressor=compressor, oobis=oobis, tracer=tracer,
+                                  loglevel=args.loglevel, logSample=args.logSample)
+        logger.info("Caxe Server listening on %s with %d workers", htp, args.workers)
+        directing.runController(doers=doers, expire=0.0)
+        return
+
+    if args.asgi:
+        from caxe.core import asyncing
+
+        app = asyncing.setup(hby, alias, doers=doers, ttl=cacheTtl, parallelism=parallelism, profiler=profiler,
+                             workers=args.executorWorkers, limits=limits, compressor=compressor, oobis=oobis,
+                             tracer=tracer)
+        logger.info("Caxe ASGI Server listening on %s", htp)
+        asyncing.run(app, host=host, port=htp)
+        return
+
+    doers += serving.setup(hby, alias, htp, host, ttl=cacheTtl, parallelism=parallelism, profiler=profiler,
+                           limits=limits, compressor=compressor, jobTtl=args.jobTtl, oobis=oobis, tracer=tracer)
 
-    print(f"Caxe Server listening on {htp}")
+    logger.info("Caxe Server listening on %s", htp)
     directing.runController(doers=doers, expire=0.0)
 
 
@@ -0,0 +1,35 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.taxonomy.add module
+
+"""
+import argparse
+import sys
+
+from caxe.core import cataloging
+
+parser = argparse.ArgumentParser(description='Add taxonomy packages to the taxonomy store')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('packages', nargs='+', help='Taxonomy package zip files or URLs')
+parser.add_argument('--dir', '-d', help='Taxonomy store directory, defaults to CAXE_TAXONOMY_DIR or '
+                                        '~/.caxe/taxonomies', default=None)
+
+
+def handler(args):
+    """
+    Copy taxonomy packages into the taxonomy store so their taxonomies load from the package archives
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    cataloger = cataloging.Cataloger(path=args.dir)
+    for package in args.packages:
+        try:
+            info = cataloger.add(package)
+        except (ValueError, OSError) as ex:
+            print(ex, file=sys.stderr)
+            sys.exit(1)
+
+        print(f"added {info['name']} {info.get('version') or ''} ({info['identifier']})")
+
+    print("run `cake taxonomy prewarm` to check the store loads its entry points offline")
@@ -0,0 +1,32 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.taxonomy.list module
+
+"""
+import argparse
+import os
+
+from caxe.core import cataloging
+
+parser = argparse.ArgumentParser(description='List the taxonomy packages and entry points of the taxonomy store')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--dir', '-d', help='Taxonomy store directory, defaults to CAXE_TAXONOMY_DIR or '
+                                        '~/.caxe/taxonomies', default=None)
+
+
+def handler(args):
+    """
+    Print the packages, prewarmed entry points and warm state of the taxonomy store
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    cataloger = cataloging.Cataloger(path=args.dir)
+    index = cataloger.index()
+
+    print(f"store {cataloger.path} {'warm, offline' if cataloger.offline else 'warm' if index['warm'] else 'cold'}")
+    for info in index["packages"]:
+        print(f"package {info['name']} {info.get('version') or ''} {info['identifier']} "
+              f"{os.path.basename(info['URL'])}")
+    for entry in index["entries"]:
+        print(f"entry {entry}")
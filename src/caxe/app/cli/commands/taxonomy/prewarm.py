@@ -0,0 +1,45 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.taxonomy.prewarm module
+
+"""
+import argparse
+import sys
+
+from caxe.core import cataloging
+
+parser = argparse.ArgumentParser(description='Load taxonomy entry points into the taxonomy store so reports load '
+                                             'without the network')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('entries', nargs='*', help='Taxonomy entry point schema URLs or reports to add to the entry points '
+                                               'of the store, the stored entry points are prewarmed again if none')
+parser.add_argument('--dir', '-d', help='Taxonomy store directory, defaults to CAXE_TAXONOMY_DIR or '
+                                        '~/.caxe/taxonomies', default=None)
+
+
+def handler(args):
+    """
+    Load every entry point of the taxonomy store online then offline, marking the store warm if all load offline
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    cataloger = cataloging.Cataloger(path=args.dir)
+    results = cataloger.prewarm(args.entries)
+    if not results:
+        print("no entry points, pass taxonomy entry point URLs or reports to prewarm", file=sys.stderr)
+        sys.exit(1)
+
+    for result in results:
+        print(f"{result['entry']}: {result['documents']} documents, online {result['online']:.2f}s, "
+              f"offline {result['offline']:.2f}s")
+        for error in result["errors"][:10]:
+            print(f"  {error}")
+        if len(result["errors"]) > 10:
+            print(f"  ... {len(result['errors']) - 10} more errors")
+
+    if not cataloger.index()["warm"]:
+        print("store is not warm, entry points above failed to load offline", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"store {cataloger.path} is warm, taxonomies load offline")
@@ -0,0 +1,49 @@
+# -*- encoding: utf-8 -*-
+"""
+caxe.app.cli.commands.trace module
+
+"""
+import argparse
+import json
+import sys
+
+from caxe.core import tracing
+
+parser = argparse.ArgumentParser(description='Print the timeline of a traced request or the slowest traced requests')
+parser.set_defaults(handler=lambda args: handler(args))
+parser.add_argument('--file', '-f', help='Trace file written by `cake server --trace-file`', required=True)
+parser.add_argument('--id', '-i', dest="tid", help='Trace id, the uuid of a verification, to print the timeline of',
+                    default=None)
+parser.add_argument('--slowest', '-s', type=int, help='Number of slowest traced requests to list when no --id is '
+                                                      'given.  Defaults to 10', default=10)
+
+
+def handler(args):
+    """
+    Print the spans of one traced request as an indented timeline, or list the slowest traced requests
+
+    Args:
+        args(Namespace): arguments object from command line
+    """
+    try:
+        if args.tid is None:
+            roots = tracing.slowest(args.file, count=args.slowest)
+        else:
+            spans = tracing.timeline(args.file, args.tid)
+    except OSError as ex:
+        print(ex, file=sys.stderr)
+        sys.exit(1)
+
+    if args.tid is None:
+        for root in roots:
+            print(f"{root['trace']} {root['name']} {root['secs']:.3f}s {json.dumps(root['attrs'], default=str)}")
+        return
+
+    if not spans:
+        print(f"no spans of trace {args.tid} in {args.file}", file=sys.stderr)
+        sys.exit(1)
+
+    for span in spans:
+        indent = "  " * span["depth"]
+        print(f"{span['offset']:8.3f}s {indent}{span['name']} {span['secs']:.3f}s "
+              f"{json.dumps(span['attrs'], default=str)}")
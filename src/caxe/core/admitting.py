@@ -0,0 +1,375 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.admitting module
+
+Admission control of the report endpoints with concurrency, queue depth, per-client rate and report byte limits
+
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+
+import falcon
+from keri.help import ogler
+
+from caxe.core.metering import meter
+
+logger = ogler.getLogger()
+
+
+class Bucket:
+    """ Token bucket refilled at rate tokens per second up to burst tokens """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+
+    def take(self):
+        """ Take one token
+
+        Returns:
+            float: 0.0 if a token was taken, otherwise seconds until the next token is available
+
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+
+        return (1.0 - self.tokens) / self.rate
+
+    def full(self):
+        return self.tokens + (time.monotonic() - self.stamp) * self.rate >= self.burst
+
+
+class Limiter:
+    """ Per-client token buckets so one client cannot starve the others
+
+    Clients are identified by the CAXE-Client header, set by the gateway in front of
+    the service, falling back to the remote address of the connection.
+
+    """
+
+    Header = "CAXE-Client"
+    Clients = 10000  # buckets kept before idle buckets are pruned
+
+    def __init__(self, rate, burst=None):
+        """ Create per-client rate limits
+
+        Parameters:
+            rate (float): requests per second allowed for each client
+            burst (float): requests a client may make at once, defaults to rate and at least 1
+
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.buckets = dict()
+
+    def client(self, req):
+        """ Returns identifier of the client of req """
+        return req.get_header(self.Header) or req.remote_addr
+
+    def wait(self, req):
+        """ Returns 0.0 if the client of req is within its rate, otherwise seconds until it may retry """
+        client = self.client(req)
+        if (bucket := self.buckets.get(client)) is None:
+            if len(self.buckets) >= self.Clients:
+                self.prune()
+            bucket = self.buckets[client] = Bucket(rate=self.rate, burst=self.burst)
+
+        return bucket.take()
+
+    def prune(self):
+        """ Remove the buckets of clients idle long enough to have a full bucket """
+        for client in [client for client, bucket in self.buckets.items() if bucket.full()]:
+            del self.buckets[client]
+
+
+class Admitter:
+    """ Concurrency and queue depth limits of one endpoint
+
+    At most .concurrency requests run at once and at most .queue more wait for one of
+    them to finish.  Requests beyond both limits, or from a client over its rate, are
+    rejected at once with 429 Too Many Requests and a Retry-After header so the requests
+    that are admitted keep bounded latency under a spike.  Limits of 0 are unlimited.
+
+    """
+
+    Retry = 1  # seconds clients are asked to wait after a capacity rejection
+
+    def __init__(self, name, concurrency=0, queue=0, limiter=None, retry=None, budget=None):
+        """ Create endpoint admission control
+
+        Parameters:
+            name (str): endpoint name used in metrics
+            concurrency (int): maximum requests running at once, 0 is unlimited
+            queue (int): maximum requests waiting to run
+            limiter (Limiter): optional per-client rate limits, may be shared by endpoints
+            retry (int): Retry-After seconds of capacity rejections
+            budget (Budget): report bytes in flight, shared by the endpoints of the process, unlimited if None
+
+        """
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.limiter = limiter
+        self.budget = budget if budget is not None else Budget()
+        self.retry = retry if retry is not None else self.Retry
+        self.active = 0
+        self.queued = 0
+        self.waiters = deque()
+
+        meter.depth(f"{name}_active", lambda: self.active)
+        meter.depth(f"{name}_queued", lambda: self.queued)
+
+    def limit(self, req):
+        """ Reject req if its client is over its rate """
+        if self.limiter is not None and (wait := self.limiter.wait(req)) > 0:
+            meter.count(f"{self.name}_rate_limited")
+            raise falcon.HTTPTooManyRequests(title="Too Many Requests",
+                                             description=f"Client request rate exceeded for {self.name}",
+                                             retry_after=math.ceil(wait))
+
+    def reject(self):
+        """ Reject the current request for lack of capacity """
+        meter.count(f"{self.name}_rejected")
+        raise falcon.HTTPTooManyRequests(title="Too Many Requests",
+                                         description=f"Too many {self.name} requests in progress",
+                                         retry_after=self.retry)
+
+    def acquire(self):
+        """ Returns True if a running slot was taken """
+        if self.concurrency and self.active >= self.concurrency:
+            return False
+
+        self.active += 1
+        return True
+
+    def hold(self):
+        """ Returns True if a queue slot was taken """
+        if self.queued >= self.queue:
+            return False
+
+        self.queued += 1
+        return True
+
+    def admit(self, req):
+        """ Admit req to run now or to wait in the queue, rejecting it if it can do neither
+
+        Returns:
+            bool: True if req may run now, False if it must wait for .resume()
+
+        """
+        self.limit(req)
+        if self.acquire():
+            return True
+        if self.hold():
+            return False
+
+        self.reject()
+
+    def release(self, held=False):
+        """ Free the running slot, or the queue slot if held, of a finished request
+
+        A freed running slot is handed directly to the longest waiting .slot() if any.
+
+        """
+        if held:
+            self.queued -= 1
+            return
+
+        self.active -= 1
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.queued -= 1
+                self.active += 1
+                waiter.set_result(None)
+                break
+
+    def resume(self):
+        """ Returns True if a queued request may now run, moving it from its queue slot to a running slot """
+        if self.queued and (not self.concurrency or self.active < self.concurrency):
+            self.queued -= 1
+            self.active += 1
+            return True
+
+        return False
+
+    @contextmanager
+    def running(self, req):
+        """ Context manager running req in a slot, rejecting it when none is free, for handlers that cannot wait """
+        self.limit(req)
+        if not self.acquire():
+            self.reject()
+
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot(self, req=None, bounded=True):
+        """ Async context manager running the enclosed block in a slot, waiting in the queue when none is free
+
+        Parameters:
+            req (Request): request to rate limit, None for work already admitted
+            bounded (bool): reject when the queue is full, False to wait regardless
+
+        """
+        if req is not None:
+            self.limit(req)
+
+        if not self.acquire():
+            if not self.hold():
+                if bounded:
+                    self.reject()
+                self.queued += 1
+
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():  # slot handed over as the wait was cancelled
+                    self.release()
+                else:
+                    if waiter in self.waiters:
+                        self.waiters.remove(waiter)
+                    self.queued -= 1
+                raise
+
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class Hold:
+    """ Report bytes reserved from a Budget """
+
+    __slots__ = ("budget", "size")
+
+    def __init__(self, budget, size):
+        self.budget = budget
+        self.size = size
+
+    def resize(self, size):
+        """ Account size bytes instead of the estimate reserved, such as the decoded body of a request """
+        self.budget.used += size - self.size
+        self.size = size
+        self.budget.wake()
+
+    def release(self):
+        """ Return the bytes held to the budget before the end of the reservation """
+        self.resize(0)
+
+
+class Budget:
+    """ Bytes of the report bodies a process holds at once
+
+    A report body is held from the moment it is read or fetched until its links and
+    digests, or its facts, are extracted.  New reports wait in arrival order while the
+    bodies in flight exceed .limit, so resident memory follows the reports being
+    processed rather than the reports being received.  A report larger than the whole
+    budget runs alone rather than waiting forever.
+
+    """
+
+    def __init__(self, limit=0):
+        """ Create report byte budget
+
+        Parameters:
+            limit (int): bytes of report bodies held at once, 0 is unlimited
+
+        """
+        self.limit = limit
+        self.used = 0
+        self.waiters = deque()
+
+        meter.depth("report_bytes", lambda: self.used)
+
+    def fits(self, size):
+        """ Returns True if size more bytes may be held now """
+        return not self.limit or self.used == 0 or self.used + size <= self.limit
+
+    def wake(self):
+        """ Hand freed bytes to the longest waiting reservations that now fit """
+        while self.waiters and self.fits(self.waiters[0][1]):
+            waiter, size = self.waiters.popleft()
+            if not waiter.done():
+                self.used += size
+                waiter.set_result(None)
+
+    def take(self, size):
+        """ Returns Hold of size bytes if they fit now, otherwise None, for servers that cannot wait
+
+        The caller returns the bytes with Hold.release().
+
+        """
+        if self.waiters or not self.fits(size):
+            return None
+
+        self.used += size
+        return Hold(budget=self, size=size)
+
+    @asynccontextmanager
+    async def reserve(self, size):
+        """ Async context manager holding size bytes for the enclosed block, waiting while they do not fit
+
+        Parameters:
+            size (int): bytes of the report body, an estimate such as Content-Length that the yielded
+                        Hold can correct once the body is read, 0 to wait only while the budget is spent
+
+        """
+        if not self.waiters and self.fits(size):
+            self.used += size
+        else:
+            meter.count("report_bytes_delayed")
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append((waiter, size))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():  # bytes handed over as the wait was cancelled
+                    self.used -= size
+                    self.wake()
+                else:
+                    self.waiters = deque(item for item in self.waiters if item[0] is not waiter)
+                raise
+
+        hold = Hold(budget=self, size=size)
+        try:
+            yield hold
+        finally:
+            self.used -= hold.size
+            self.wake()
+
+
+@dataclass
+class Limits:
+    """ Admission limits of the report endpoints, 0 is unlimited """
+    verify: int = 0  # verifications running at once
+    verifyQueue: int = 0  # verifications waiting to run
+    saidify: int = 0  # saidify requests running at once
+    saidifyQueue: int = 0  # saidify requests waiting to run
+    rate: float = 0.0  # requests per second of each client
+    burst: float = None  # requests a client may make at once
+    budget: int = 0  # bytes of report bodies held at once by the process
+
+    def admitters(self):
+        """ Returns (verify, saidify) Admitters sharing one per-client Limiter and one report byte Budget """
+        limiter = Limiter(rate=self.rate, burst=self.burst) if self.rate > 0 else None
+        budget = Budget(limit=self.budget)
+        return (Admitter("verify", concurrency=self.verify, queue=self.verifyQueue, limiter=limiter, budget=budget),
+                Admitter("saidify", concurrency=self.saidify, queue=self.saidifyQueue, limiter=limiter,
+                         budget=budget))
@@ -0,0 +1,757 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.asyncing module
+
+ASGI serving of the report endpoints on falcon.asgi
+
+"""
+import asyncio
+import functools
+import json
+import time
+from collections import deque
+from concurrent import futures
+
+import falcon
+import falcon.asgi
+from hio.base import doing
+from keri import help
+from keri.core import coring
+from keri.help import helping
+
+from caxe.core import admitting, compressing, serving, reporting, metering, profiling, tracing
+from caxe.core.metering import meter
+
+try:
+    import httpx
+except ImportError as ex:
+    raise ImportError("ASGI serving requires httpx, install it with `pip install caxe[asgi]`") from ex
+
+logger = help.ogler.getLogger()
+
+Tock = 0.03125  # seconds between iterations of the background KERI doers
+
+
+class Doister:
+    """ falcon.asgi middleware running hio doers as a background asyncio task
+
+    The doers, the KERI message parser and escrow processing among them, run in the
+    event loop thread between requests so the async endpoints share the parser input
+    stream and the databases with them without locking.  The task starts with the ASGI
+    lifespan startup event and exits every doer on shutdown.
+
+    """
+
+    def __init__(self, doers, tock=Tock):
+        """ Create background doer runner
+
+        Parameters:
+            doers (list): hio doers to run for the lifetime of the server
+            tock (float): seconds between iterations of the doers
+
+        """
+        self.doist = doing.Doist(doers=doers, tock=tock, real=True)
+        self.task = None
+
+    async def process_startup(self, scope, event):
+        self.task = asyncio.create_task(self.run())
+
+    async def process_shutdown(self, scope, event):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self):
+        """ Run the doers until they are all done or the task is cancelled """
+        self.doist.deeds = deque()
+        self.doist.enter()
+        try:
+            while self.doist.deeds:
+                self.doist.recur()
+                await asyncio.sleep(self.doist.tock)
+        finally:
+            self.doist.exit()
+
+
+class Fetcher:
+    """ falcon.asgi middleware owning the HTTP client that fetches report pages and credential OOBIs
+
+    Fetches are awaited on the event loop, so the number in flight is bounded by the
+    admission limits of the endpoints rather than by a pool of threads.  The client is
+    closed on the ASGI lifespan shutdown event.
+
+    """
+
+    Timeout = serving.ReportIterable.TimeoutReport
+    Keepalive = 20  # idle connections kept open for reuse
+    Errors = (httpx.HTTPError, httpx.InvalidURL)  # raised by .get when no response is received
+
+    def __init__(self, timeout=Timeout):
+        """ Create fetcher
+
+        Parameters:
+            timeout (float): seconds to wait for each connect, read and write of a fetch
+
+        """
+        self.client = httpx.AsyncClient(timeout=timeout, follow_redirects=True,
+                                        limits=httpx.Limits(max_connections=None,
+                                                            max_keepalive_connections=self.Keepalive))
+
+    async def process_shutdown(self, scope, event):
+        await self.client.aclose()
+
+    async def get(self, url):
+        """ Returns httpx.Response of GET url, raises one of .Errors if there is none """
+        return await self.client.get(url)
+
+    async def fetch(self, url, trace=None):
+        """ Returns content of the report at url, raises falcon.HTTPBadRequest if it cannot be fetched """
+        try:
+            with tracing.timed(trace, "fetch"):
+                response = await self.get(url)
+            response.raise_for_status()
+            meter.count("fetched_bytes", len(response.content))
+        except self.Errors as e:
+            raise falcon.HTTPBadRequest(title='File fetching failed',
+                                        description=f'Failed to fetch report file from the provided URL: {str(e)}')
+
+        return response.content
+
+
+class VerifyEnd(serving.Resolver):
+    """ Awaitable report verification
+
+    Report pages and credential OOBIs are fetched with the awaitable client of the
+    fetcher and report parsing and digests run in the executor.  Credential
+    streams are handed to the resolver's parser, run by the background doers, and the
+    report waits for its credential chains to resolve.
+
+    """
+
+    Timeout = serving.ReportIterable.TimeoutReport
+
+    def __init__(self, hby, hab, kvy, rvy, tvy, vry, ttl=None, profiler=None, executor=None, reger=None,
+                 admitter=None, tracer=None, fetcher=None):
+        """ Create async verification resource
+
+        Parameters:
+            ttl (float): seconds to cache verification results
+            profiler (Profiler): optional on-demand request profiler
+            executor (Executor): executor for CPU bound report processing, the event loop default if None
+            reger (Reger): credential registry, that of vry if None
+            admitter (Admitter): optional admission control of verifications
+            tracer (Tracer): optional sampled request tracing
+            fetcher (Fetcher): client of page and OOBI fetches, created if None
+
+        """
+        self.profiler = profiler if profiler is not None else profiling.Profiler()
+        self.tracer = tracer if tracer is not None else tracing.Tracer()
+        self.admitter = admitter if admitter is not None else admitting.Admitter("verify")
+        self.executor = executor
+        self.fetcher = fetcher if fetcher is not None else Fetcher()
+        self.fetches = dict()
+        self.waiters = dict()
+
+        super(VerifyEnd, self).__init__(hby=hby, hab=hab, kvy=kvy, rvy=rvy, tvy=tvy, vry=vry, ttl=ttl, reger=reger)
+
+    async def on_get(self, req, rep):
+        """ Verify GET endpoint
+
+        Parameters:
+            req: falcon.asgi.Request HTTP request
+            rep: falcon.asgi.Response HTTP response
+
+       ---
+        summary:  Verify the report published at url
+        description:  Verify all ViRA credential links of the report published at url
+        tags:
+           - Verify
+        parameters:
+          - in: query
+            name: url
+            schema:
+              type: string
+            required: true
+            description: URL of iXBRL report
+        responses:
+           200:
+              description: ViRA attributes section with associated vLEI credentials
+           429:
+              description: Too many verifications in progress, retry after Retry-After seconds
+        """
+        url = req.get_param("url", required=True)
+        trace = self.tracer.trace(coring.randomNonce(), "verify", url=url)
+        try:
+            tracing.begin(trace, "held")
+            async with self.admitter.slot(req):
+                tracing.end(trace, "held")
+                rpt = await self.fetch(url, profile=self.profiler.profile(req), trace=trace)
+        except BaseException as ex:
+            tracing.close(trace, status="failed", msg=str(ex))
+            raise
+
+        serving.conclude(trace, rpt)
+        self.respond(rep, rpt)
+
+    async def on_post(self, req, rep):
+        """ Verify POST endpoint
+
+        Parameters:
+            req: falcon.asgi.Request HTTP request
+            rep: falcon.asgi.Response HTTP response
+
+       ---
+        summary:  Verify all ViRA credential links
+        description:  Verify all ViRA credential links of the uploaded report
+        tags:
+           - Verify
+        responses:
+           200:
+              description: ViRA attributes section with associated vLEI credentials
+           400:
+              description: No credentials found
+           429:
+              description: Too many verifications in progress, retry after Retry-After seconds
+        """
+        trace = self.tracer.trace(coring.randomNonce(), "verify", bytes=req.content_length)
+        try:
+            tracing.begin(trace, "held")
+            async with self.admitter.slot(req):
+                tracing.end(trace, "held")
+                tracing.begin(trace, "budget")
+                async with self.admitter.budget.reserve(req.content_length or 0) as hold:
+                    tracing.end(trace, "budget")
+                    with tracing.spanned(trace, "receive"):
+                        data = await compressing.receive(req)
+                    hold.resize(len(data))
+                    rpt = await self.digest(data, profile=self.profiler.profile(req), trace=trace)
+                    del data  # only the digests and links are needed to verify
+
+                if rpt is not None:
+                    rpt = await self.verify(rpt)
+        except BaseException as ex:
+            tracing.close(trace, status="failed", msg=str(ex))
+            raise
+
+        serving.conclude(trace, rpt)
+        if rpt is None:
+            rep.status = falcon.HTTP_400
+            rep.content_type = "application/json"
+            rep.data = json.dumps(dict(msg="No credential links found"), indent=2).encode("utf-8")
+            return
+
+        self.respond(rep, rpt)
+
+    @staticmethod
+    def respond(rep, rpt):
+        rep.status = falcon.HTTP_200
+        rep.content_type = "application/json"
+        rep.data = json.dumps(rpt.results if rpt.results is not None else rpt.result).encode("utf-8")
+        meter.count("results_served")
+
+    async def fetch(self, url, profile=None, trace=None):
+        """ Verify the report published at url
+
+        Parameters:
+            url (str): URL of iXBRL report page
+            profile (cProfile.Profile): optional profile capturing this report's processing
+            trace (Trace): optional trace of the verification
+
+        Returns:
+            Report: verified report with results or failed report with result
+
+        """
+        tracing.begin(trace, "budget")
+        async with self.admitter.budget.reserve(0) as hold:  # the page size is known once it is fetched
+            tracing.end(trace, "budget")
+            tracing.begin(trace, "page", url=url)
+            start = helping.nowUTC()
+            try:
+                response = await self.fetcher.get(url)
+            except Fetcher.Errors as ex:
+                tracing.end(trace, "page", error=str(ex))
+                return serving.Report(uuid=coring.randomNonce(), result=dict(msg="Invalid reponse from page"))
+
+            hold.resize(len(response.content))
+            meter.observe("fetch", (helping.nowUTC() - start).total_seconds())
+            meter.count("fetched_bytes", len(response.content))
+            tracing.end(trace, "page", status=response.status_code, bytes=len(response.content))
+            if response.status_code != 200:
+                return serving.Report(uuid=coring.randomNonce(), result=dict(msg="Invalid reponse from page"))
+
+            try:
+                rpt = await self.digest(response.content, profile=profile, trace=trace)
+            except falcon.HTTPBadRequest as ex:
+                return serving.Report(uuid=coring.randomNonce(), result=dict(msg=f"Invalid report: {ex.description}"))
+            del response
+
+        if rpt is None:
+            return serving.Report(uuid=coring.randomNonce(), result=dict(msg="No links found on page"))
+
+        return await self.verify(rpt)
+
+    async def upload(self, data, profile=None, trace=None):
+        """ Verify uploaded report, holding its bytes in the report budget until it is digested
+
+        Parameters:
+            data (bytes): iXBRL report, released once digested if the caller keeps no reference
+            profile (cProfile.Profile): optional profile capturing this report's processing
+            trace (Trace): optional trace of the verification
+
+        Returns:
+            Report: verified report with results, failed report with result or None if the
+                    report has no credential links
+
+        """
+        tracing.begin(trace, "budget")
+        async with self.admitter.budget.reserve(len(data)):
+            tracing.end(trace, "budget")
+            rpt = await self.digest(data, profile=profile, trace=trace)
+            del data
+
+        return await self.verify(rpt) if rpt is not None else None
+
+    async def digest(self, data, profile=None, trace=None):
+        """ Inspect report in the executor for its credential links and digests
+
+        Parameters:
+            data (bytes): iXBRL report
+            profile (cProfile.Profile): optional profile capturing this report's processing
+            trace (Trace): optional trace of the verification, its id is the uuid of the report
+
+        Returns:
+            Report: report to verify, holding its digests and credentials but not data, or None
+                    if the report has no credential links
+
+        Raises:
+            falcon.HTTPBadRequest: if the report cannot be parsed
+
+        """
+        loop = asyncio.get_running_loop()
+        with tracing.spanned(trace, "inspect"):
+            try:
+                links, digests = await loop.run_in_executor(self.executor, self.inspect, data, profile)
+            except Exception as ex:
+                raise falcon.HTTPBadRequest(title="Invalid report", description=str(ex)) from ex
+        if len(links) == 0:
+            return None
+
+        creds = [serving.Cred(link=link, said=serving.oobiSaid(link)) for link in links]
+        return serving.Report(uuid=trace.tid if trace is not None else coring.randomNonce(), said=digests.rd,
+                              digests=digests, start=helping.nowUTC(), creds=creds, profile=profile, trace=trace)
+
+    async def verify(self, rpt):
+        """ Verify report, joining an identical verification already in flight
+
+        Parameters:
+            rpt (Report): digested report with credential links
+
+        Returns:
+            Report: verified report with results or failed report with result
+
+        """
+        loop = asyncio.get_running_loop()
+        rpt.key = self.cacher.key(rpt.said, [cred.said for cred in rpt.creds])
+        if (results := self.cacher.get(rpt.key)) is not None:
+            rpt.results = results
+            if rpt.trace is not None:
+                rpt.trace.root.attrs.update(cached=True)
+            return rpt
+
+        if self.cacher.join(rpt.key, rpt.uuid):
+            waiter = self.waiters[rpt.uuid] = loop.create_future()
+            with tracing.spanned(rpt.trace, "joined"):
+                try:
+                    return await asyncio.wait_for(waiter, self.Timeout)
+                except asyncio.TimeoutError:
+                    rpt.result = dict(msg="Timed out waiting for verification")
+                    return rpt
+                finally:
+                    self.waiters.pop(rpt.uuid, None)
+
+        results, msg = None, "Verification cancelled"
+        try:
+            results, msg = await asyncio.wait_for(self.resolution(rpt), self.Timeout)
+        except asyncio.TimeoutError:
+            results, msg = None, "Timed out waiting for verification"
+        except Exception as ex:
+            results, msg = None, f"Verification failed: {ex}"
+        finally:  # land the verification, even when cancelled, so joined waiters are not left waiting
+            self.land(rpt, results, msg)
+
+        if rpt.profile is not None:
+            self.profiler.save(rpt.profile, rpt.said)
+
+        return rpt
+
+    def land(self, rpt, results, msg):
+        """ Land the verification of rpt in flight, completing the reports joined to it
+
+        Parameters:
+            rpt (Report): report verified
+            results (list): verification results or None if the verification failed
+            msg (str): failure message if results is None
+
+        """
+        if results is not None:
+            rpt.results = results
+            waiters = self.cacher.land(rpt.key, saids=[cred.said for cred in rpt.creds], results=results)
+        else:
+            rpt.result = dict(msg=msg)
+            waiters = self.cacher.land(rpt.key)
+
+        for uuid in waiters:
+            if (waiter := self.waiters.pop(uuid, None)) is not None and not waiter.done():
+                waiter.set_result(serving.Report(uuid=uuid, said=rpt.said, results=rpt.results, result=rpt.result))
+
+    @staticmethod
+    def inspect(data, profile=None):
+        with profiling.profiled(profile):
+            return serving.inspect(data)
+
+    async def resolution(self, rpt):
+        """ Fetch the credentials of report and wait for its credential chains to resolve
+
+        Parameters:
+            rpt (Report): report with credential links
+
+        Returns:
+            tuple: (results, msg) as returned by .resolve
+
+        """
+        fetches = []
+        with tracing.spanned(rpt.trace, "credentials", creds=len(rpt.creds)):
+            for cred in rpt.creds:
+                if (task := self.fetches.get(cred.said)) is None:  # share in-flight credential fetch
+                    if self.fresh(cred.said):
+                        continue
+
+                    task = self.fetches[cred.said] = asyncio.create_task(self.credential(cred, trace=rpt.trace))
+                    task.add_done_callback(lambda _, said=cred.said: self.fetches.pop(said, None))
+
+                fetches.append(task)
+
+            # shielded, a fetch shared with other reports survives this report's cancellation
+            errors = [error for error in await asyncio.gather(*[asyncio.shield(task) for task in fetches])
+                      if error is not None]
+        if errors:
+            return None, errors[0]
+
+        with tracing.spanned(rpt.trace, "resolve"):
+            while True:
+                with profiling.profiled(rpt.profile):
+                    results, msg = self.resolve(rpt)
+
+                if results is not None or msg is not None:
+                    return results, msg
+
+                await asyncio.sleep(Tock)
+
+    async def credential(self, cred, trace=None):
+        """ Fetch credential OOBI and queue its stream for parsing
+
+        Parameters:
+            cred (Cred): credential link
+            trace (Trace): optional trace of the report starting the fetch
+
+        Returns:
+            str: error message or None if the credential was fetched
+
+        """
+        start = time.perf_counter()
+        tracing.begin(trace, "oobi", key=cred.said, said=cred.said, link=cred.link)
+        try:
+            response = await self.fetcher.get(cred.link)
+        except Fetcher.Errors as ex:
+            tracing.end(trace, "oobi", key=cred.said, error=str(ex))
+            return f"Invalid reponse from credential link: {cred.link}"
+
+        meter.observe("oobi", time.perf_counter() - start)
+        meter.count("fetched_bytes", len(response.content))
+        tracing.end(trace, "oobi", key=cred.said, status=response.status_code, bytes=len(response.content))
+
+        if response.status_code != 200 or response.headers.get("Content-Type") != "application/acdc+json":
+            return f"Invalid reponse from credential link: {cred.link}"
+
+        self.parse(cred.said, response.content)
+        return None
+
+
+class BatchEnd:
+    """ Resource for verifying batches of reports through the async VerifyEnd """
+
+    def __init__(self, verifyEnd, parallelism=None):
+        """ Create batch verification resource
+
+        Parameters:
+            verifyEnd (VerifyEnd): async report verification
+            parallelism (int): maximum number of reports of one batch verified at once
+
+        """
+        self.verifyEnd = verifyEnd
+        self.parallelism = parallelism if parallelism is not None else serving.BatchEnd.Parallelism
+
+    async def on_post(self, req, rep):
+        """ Verify batch POST endpoint, streaming one JSON result line per report as each completes
+
+        Parameters:
+            req: falcon.asgi.Request HTTP request
+            rep: falcon.asgi.Response HTTP response
+
+        """
+        self.verifyEnd.admitter.limit(req)
+        items = serving.batchReports(await compressing.receiveMedia(req))
+
+        rep.content_type = "application/x-ndjson"
+        rep.stream = self.lines(items)
+
+    async def lines(self, items):
+        semaphore = asyncio.Semaphore(self.parallelism)
+
+        async def one(idx, report):
+            trace = self.verifyEnd.tracer.trace(coring.randomNonce(), "verify", batch=idx)
+            try:
+                async with semaphore, self.verifyEnd.admitter.slot(bounded=False):  # admitted batches wait
+                    if "url" in report:
+                        rpt = await self.verifyEnd.fetch(report["url"], trace=trace)
+                    else:
+                        rpt = await self.verifyEnd.upload(report.pop("report").encode("utf-8"), trace=trace)
+            except falcon.HTTPError as ex:
+                tracing.close(trace, status="failed", msg=str(ex))
+                return dict(i=idx, msg=f"{ex.title}: {ex.description}")
+            except Exception as ex:  # one report must not end the stream of the others' results
+                logger.exception("BatchEnd: verifying report %s of batch failed", idx)
+                tracing.close(trace, status="failed", msg=str(ex))
+                return dict(i=idx, msg=f"Verification failed: {ex}")
+            except BaseException as ex:
+                tracing.close(trace, status="failed", msg=str(ex))
+                raise
+
+            serving.conclude(trace, rpt)
+
+            if rpt is None:
+                return dict(i=idx, msg="No credential links found")
+            if rpt.results is not None:
+                return dict(i=idx, said=rpt.said, results=rpt.results)
+            return dict(i=idx, **rpt.result)
+
+        for done in asyncio.as_completed([one(idx, report) for idx, report in enumerate(items)]):
+            line = await done
+            meter.count("results_served")
+            yield json.dumps(line).encode("utf-8") + b"\n"
+
+
+class SaidifyEnd:
+    """ Resource extracting and saidifying report facts with Arelle in the executor """
+
+    def __init__(self, executor=None, profiler=None, admitter=None, tracer=None, fetcher=None):
+        """ Create async saidify resource
+
+        Parameters:
+            executor (Executor): executor for Arelle processing, the event loop default if None
+            profiler (Profiler): optional on-demand request profiler
+            admitter (Admitter): optional admission control of saidify requests
+            tracer (Tracer): optional sampled request tracing
+            fetcher (Fetcher): client of report page fetches, created if None
+
+        """
+        self.executor = executor
+        self.fetcher = fetcher if fetcher is not None else Fetcher()
+        self.profiler = profiler
+        self.admitter = admitter if admitter is not None else admitting.Admitter("saidify")
+        self.tracer = tracer if tracer is not None else tracing.Tracer()
+
+    async def on_post(self, req, rep):
+        """ Saidify facts POST endpoint
+
+        Parameters:
+            req: falcon.asgi.Request HTTP request
+            rep: falcon.asgi.Response HTTP response
+
+        """
+        profile = self.profiler.profile(req) if self.profiler is not None else None
+
+        url, factIds, merkle, block = reporting.params(await compressing.receiveMedia(req))
+        trace = self.tracer.trace(coring.randomNonce(), "saidify", url=url)
+        try:
+            tracing.begin(trace, "held")
+            async with self.admitter.slot(req), self.admitter.budget.reserve(0) as hold:
+                tracing.end(trace, "held")
+                content = await self.fetcher.fetch(url, trace)
+                hold.resize(len(content))  # held while Arelle loads the report
+
+                loop = asyncio.get_running_loop()
+                a, raw = await loop.run_in_executor(self.executor, functools.partial(
+                    self.attest, content, url, factIds, merkle, block, profile, trace))
+        except BaseException as ex:
+            tracing.close(trace, status="failed", msg=str(ex))
+            raise
+
+        tracing.close(trace, status="complete", rd=a['rd'], said=a['d'])
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = "application/json"
+        rep.data = raw
+        meter.count("results_served")
+
+        if profile is not None:
+            self.profiler.save(profile, a['rd'])
+
+    @staticmethod
+    def attest(content, url, factIds, merkle=False, block=0, profile=None, trace=None):
+        with profiling.profiled(profile):
+            return reporting.attest(content, url, factIds, merkle=merkle, block=block, trace=trace)
+
+
+class ProofEnd:
+    """ Resource returning Merkle inclusion proofs of attested facts, loading the report with Arelle in the executor """
+
+    def __init__(self, executor=None, admitter=None, fetcher=None):
+        """ Create async proof resource
+
+        Parameters:
+            executor (Executor): executor for Arelle processing, the event loop default if None
+            admitter (Admitter): optional admission control, shared with saidify
+            fetcher (Fetcher): client of report page fetches, created if None
+
+        """
+        self.executor = executor
+        self.fetcher = fetcher if fetcher is not None else Fetcher()
+        self.admitter = admitter if admitter is not None else admitting.Admitter("saidify")
+
+    async def on_post(self, req, rep):
+        """ Fact inclusion proof POST endpoint
+
+        Parameters:
+            req: falcon.asgi.Request HTTP request
+            rep: falcon.asgi.Response HTTP response
+
+        """
+        body = await compressing.receiveMedia(req)
+        url, factIds, _, _ = reporting.params(body)
+        async with self.admitter.slot(req), self.admitter.budget.reserve(0) as hold:
+            content = await self.fetcher.fetch(url)
+            hold.resize(len(content))  # held while Arelle loads the report
+
+            loop = asyncio.get_running_loop()
+            proof = await loop.run_in_executor(self.executor, functools.partial(
+                reporting.prove, url, factIds, body.get("fact_id"), content=content))
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = "application/json"
+        rep.data = json.dumps(proof).encode("utf-8")
+        meter.count("results_served")
+
+
+class ReportEnd:
+    async def on_get(self, req, rep):
+        rep.status = falcon.HTTP_200
+
+
+class MetricsEnd:
+    """ Resource exposing process metrics for Prometheus scraping """
+
+    def __init__(self, sharer=None):
+        self.metricsEnd = metering.MetricsEnd(sharer=sharer)
+
+    async def on_get(self, req, rep):
+        self.metricsEnd.on_get(req, rep)
+
+
+class ProfileEnd:
+    """ Resource for retrieving saved report profiles """
+
+    def __init__(self, profiler):
+        self.profileEnd = profiling.ProfileEnd(profiler=profiler)
+
+    async def on_get(self, req, rep, said):
+        self.profileEnd.on_get(req, rep, said)
+
+
+def setup(hby, alias, doers=None, ttl=None, parallelism=None, profiler=None, workers=None, limits=None,
+          compressor=None, oobis=None, tracer=None):
+    """ Returns falcon.asgi app serving the report endpoints
+
+    Parameters:
+        hby (Habery): keystore of the service
+        alias (str): alias of the service identifier
+        doers (list): additional hio doers to run in the background with the KERI doers
+        ttl (float): seconds to cache report verification results
+        parallelism (int): maximum number of reports of one batch verified at once
+        profiler (Profiler): optional on-demand request profiler
+        workers (int): number of executor threads for report parsing and Arelle processing
+        limits (Limits): admission limits of the endpoints, unlimited if None
+        compressor (Compressor): response compression middleware, defaults to compressing.Compressor()
+        oobis (Oobis): optional credential and issuer OOBIs to resolve in the background
+        tracer (Tracer): optional sampled request tracing
+
+    """
+    profiler = profiler if profiler is not None else profiling.Profiler()
+    executor = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="caxe")
+    hab, kvy, tvy, rvy, verfer = serving.components(hby, alias)
+    verifyAdmitter, saidifyAdmitter = (limits if limits is not None else admitting.Limits()).admitters()
+
+    verifyEnd = VerifyEnd(hby=hby, hab=hab, kvy=kvy, tvy=tvy, rvy=rvy, vry=verfer, ttl=ttl, profiler=profiler,
+                          executor=executor, admitter=verifyAdmitter, tracer=tracer)
+    if oobis is not None:
+        doers = (doers if doers is not None else []) + oobis.warmers(resolver=verifyEnd, hby=hby)
+
+    return application(verifyEnd, doers=doers, parallelism=parallelism, profiler=profiler, executor=executor,
+                       admitter=saidifyAdmitter, compressor=compressor, tracer=tracer)
+
+
+def application(verifyEnd, doers=None, parallelism=None, profiler=None, executor=None, admitter=None,
+                compressor=None, tracer=None, sharer=None):
+    """ Returns falcon.asgi app serving the report endpoints with verifyEnd
+
+    Parameters:
+        verifyEnd (VerifyEnd): async report verification, run in the background with doers
+        doers (list): additional hio doers to run in the background
+        parallelism (int): maximum number of reports of one batch verified at once
+        profiler (Profiler): on-demand request profiler
+        executor (Executor): executor for report parsing and Arelle processing
+        admitter (Admitter): admission control of saidify requests
+        compressor (Compressor): response compression middleware, defaults to compressing.Compressor()
+        tracer (Tracer): sampled tracing of saidify requests, verifications are traced by verifyEnd's
+        sharer (Sharer): exchange of meter states with the other processes serving the port, for /metrics
+
+    """
+    compressor = compressor if compressor is not None else compressing.Compressor()
+    doister = Doister(doers=(doers if doers is not None else []) + [verifyEnd])
+    app = falcon.asgi.App(middleware=[falcon.CORSMiddleware(
+        allow_origins='*', allow_credentials='*', expose_headers=['cesr-attachment', 'cesr-date', 'content-type']),
+        compressor, doister, verifyEnd.fetcher])
+
+    app.add_route("/verify", verifyEnd)
+    app.add_route("/verify/batch", BatchEnd(verifyEnd=verifyEnd, parallelism=parallelism))
+    app.add_route("/metrics", MetricsEnd(sharer=sharer))
+
+    if profiler.path is not None:
+        app.add_route("/profiles/{said}", ProfileEnd(profiler=profiler))
+
+    app.add_route("/report", ReportEnd())
+    saidifyEnd = SaidifyEnd(executor=executor, profiler=profiler, admitter=admitter,
+                            tracer=tracer if tracer is not None else verifyEnd.tracer, fetcher=verifyEnd.fetcher)
+    app.add_route("/report/saidify", saidifyEnd)
+    app.add_route("/report/proof", ProofEnd(executor=executor, admitter=saidifyEnd.admitter,
+                                            fetcher=verifyEnd.fetcher))
+
+    return app
+
+
+def run(app, host, port):
+    """ Serve ASGI app with uvicorn until interrupted
+
+    Requires the optional asgi dependencies, `pip install caxe[asgi]`.
+
+    """
+    try:
+        import uvicorn
+    except ImportError as ex:
+        raise ImportError("ASGI serving requires uvicorn, install it with `pip install caxe[asgi]`") from ex
+
+    uvicorn.run(app, host=host, port=port, lifespan="on", log_level="warning")
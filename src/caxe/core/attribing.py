@@ -10,7 +10,6 @@ import logging
 import re
 import math
 
-import pycountry
 from lxml import etree
 from arelle import XbrlConst
 from arelle.ModelValue import QName, INVALIDixVALUE
@@ -73,6 +72,7 @@ class Attiber:
             "facts": {},
         }
         self.footnoteRelationshipSet = ModelRelationshipSet(dts, "XBRL-footnotes")
+        self.numbered = False
 
     def lineWrap(self, s, n = 80):
         return "\n".join([s[i:i+n] for i in range(0, len(s), n)])
@@ -98,6 +98,8 @@ class Attiber:
         return s.replace("<","\\u003C").replace(">","\\u003E").replace("&","\\u0026")
 
     def makeLanguageName(self, langCode):
+        import pycountry  # loading the ISO databases is slow, only pay for it when viewing languages
+
         code = re.sub("-.*", "", langCode)
         try:
             language = pycountry.languages.lookup(code)
@@ -190,7 +192,8 @@ class Attiber:
 
         logHandler = dts.modelManager.cntlr.logHandler
         if not hasattr(logHandler, "logRecordBuffer"):
-            raise ValidationError("Logging is not configured to use a buffer.  Unable to retrieve validation messages")
+            raise ValidationError("Logging is not configured to use a buffer, create the controller with "
+                                  "validations=True.  Unable to retrieve validation messages")
 
         errors = []
         for logRec in getattr(logHandler, "logRecordBuffer"):
@@ -280,6 +283,57 @@ class Attiber:
         self.taxonomyData["facts"][f.id] = factData
         self.addConcept(f.concept)
 
+    def numberFacts(self):
+        """
+        Give every fact without an id the ixv-N id createViewer would, N its position in the facts
+        """
+        if self.numbered:
+            return
+
+        self.idGen = 0
+        for f in self.dts.facts:  # number facts up front, nested facts are part of the facts containing them
+            if f.id is None:
+                f.set("id", "ixv-%d" % (self.idGen))
+            self.idGen += 1
+        self.numbered = True
+
+    def primeNamespaces(self):
+        """
+        Register the namespace prefixes of every fact in the order addFact would meet them,
+        so slices of the facts added apart, even in other processes, name their aspects
+        exactly as adding every fact in order does
+        """
+        for f in self.dts.facts:
+            self.nsmap.qname(f.qname)
+            scheme, ident = f.context.entityIdentifier
+            self.nsmap.getPrefix(scheme, "e")
+
+            if not f.isNil and f.concept is not None and f.concept.isEnumeration:
+                qnEnums = f.xValue
+                for qn in (qnEnums if isinstance(qnEnums, list) else (qnEnums,)):
+                    self.nsmap.qname(qn)
+
+            if f.isNumeric and f.unit is not None and len(f.unit.measures[0]):
+                self.nsmap.qname(f.unit.measures[0][0])
+
+            for d, v in f.context.qnameDims.items():  # member before dimension, as addFact assigns them
+                if v.memberQname is not None:
+                    self.nsmap.qname(v.memberQname)
+                    self.nsmap.qname(v.dimensionQname)
+                elif v.typedMember is not None:
+                    self.nsmap.qname(v.dimensionQname)
+
+    def iterFacts(self, start=0, end=None):
+        """
+        Yield (fact, fact data) of every fact, or of the facts from start up to end, as
+        createViewer would add them, without retaining the fact data
+        """
+        self.numberFacts()
+        self.idGen = start
+        for f in self.dts.facts[start:end]:
+            self.addFact(f)
+            yield f, self.taxonomyData["facts"].pop(f.id)
+
     def addViewerToXMLDocument(self, xmlDocument, scriptUrl):
         taxonomyDataJSON = self.escapeJSONForScriptTag(json.dumps(self.taxonomyData, indent=1, allow_nan=False))
 
@@ -310,9 +364,12 @@ class Attiber:
                 return True
         return False
 
-    def createViewer(self, scriptUrl="js/dist/ixbrlviewer.js", showValidations = True):
+    def createViewer(self, scriptUrl="js/dist/ixbrlviewer.js", showValidations = False):
         """
         Create an iXBRL file with XBRL data as a JSON blob, and script tags added
+
+        Validation messages are added as taxonomyData["validation"] only with showValidations,
+        which requires a controller buffering its log records
         """
 
         dts = self.dts
@@ -331,3 +388,6 @@ class Attiber:
         self.taxonomyData["roles"] = self.roleMap.prefixmap
         self.taxonomyData["rels"] = self.getRelationships()
 
+        if showValidations:
+            self.taxonomyData["validation"] = self.validationErrors()
+
@@ -0,0 +1,259 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.benching module
+
+Benchmark harness timing the stages of report extraction
+
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import blake3
+from lxml import etree, html
+
+from keri.core import coring
+from keri.help import helping
+from arelle import FileSource, ModelManager
+
+import caxe
+from caxe.core import attribing, extracting, verifying
+
+STAGES = ("canonicalize", "load", "viewer", "digest", "saidify", "extract")
+
+
+class Bencher:
+    """ Times each stage of extracting the attestation of an iXBRL report
+
+    Stages are timed separately so a change to one stage is visible in its own
+    numbers.  .load, .viewer and .digest share a single Arelle model loaded before
+    they are timed, except for .load which loads a fresh model each run.  The
+    .extract stage runs the complete `cake extract` of the report with a new controller.
+
+    """
+
+    def __init__(self, path, runs=5, warmup=1, stages=STAGES, validations=False):
+        """ Create benchmark of one report
+
+        Parameters:
+            path (str): path of iXBRL report to benchmark
+            runs (int): number of timed runs of each stage
+            warmup (int): number of untimed runs of each stage before timing
+            stages (tuple): stages to run, a subset of STAGES
+            validations (bool): True to time the full load profile that buffers Arelle log
+                                records for validation messages instead of the fast profile
+
+        """
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"unknown benchmark stages {', '.join(sorted(unknown))}")
+
+        self.path = path
+        self.runs = runs
+        self.warmup = warmup
+        self.stages = stages
+        self.validations = validations
+
+        with open(path, "rb") as f:
+            self.data = f.read()
+
+        self.cntlr = None
+        self.modelXbrl = None
+        self.attestation = None
+
+    def run(self):
+        """ Run every stage and return results
+
+        Returns:
+            dict: run metadata under `meta` and timings of each stage under `stages`
+
+        """
+        results = dict()
+        for stage in self.stages:
+            results[stage] = self.time(getattr(self, stage))
+
+        facts = len(self.model().facts) if self.modelXbrl is not None else None
+        return dict(
+            meta=meta(report=os.path.basename(self.path), size=len(self.data), facts=facts, runs=self.runs,
+                      warmup=self.warmup, profile="validations" if self.validations else "fast"),
+            stages=results
+        )
+
+    def time(self, fn):
+        """ Returns summary statistics of timed runs of fn in seconds """
+        for _ in range(self.warmup):
+            fn()
+
+        times = []
+        for _ in range(self.runs):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+        return summarize(times)
+
+    def controller(self):
+        if self.cntlr is None:
+            self.cntlr = extracting.controller(validations=self.validations)
+
+        return self.cntlr
+
+    def model(self):
+        """ Returns loaded Arelle model of report shared by the viewer and digest stages """
+        if self.modelXbrl is None:
+            mmgr = ModelManager.initialize(self.controller())
+            self.modelXbrl = mmgr.load(FileSource.FileSource(self.path))
+
+        return self.modelXbrl
+
+    def canonicalize(self):
+        root = html.document_fromstring(self.data)
+        for link in root.xpath(".//link[@type='application/json+acdc']"):
+            link.getparent().remove(link)
+
+        xmld = etree.canonicalize(etree.tostring(root).decode("utf-8"))
+        return verifying.encode(blake3.blake3(xmld.encode("utf-8")).digest())
+
+    def load(self):
+        mmgr = ModelManager.initialize(self.controller())
+        modelXbrl = mmgr.load(FileSource.FileSource(self.path))
+        modelXbrl.close()
+
+    def viewer(self):
+        attriber = attribing.Attiber(dts=self.model())
+        attriber.createViewer()
+        return attriber
+
+    def digest(self):
+        return [verifying.encode(blake3.blake3(etree.tostring(fact)).digest()) for fact in self.model().facts]
+
+    def saidify(self):
+        if self.attestation is None:
+            attriber = self.viewer()
+            facts = attriber.taxonomyData['facts']
+            values = []
+            for fact, dig in zip(self.model().facts, self.digest()):
+                fad = facts[fact.id]
+                attr = dict(i=fact.id, t=fact.localName, d=dig, v=fad['v'], c=fad['a']['c'], e=fad['a']['e'],
+                            p=fad['a']['p'])
+                if 'f' in fad:
+                    attr['f'] = fad['f']
+                values.append(attr)
+
+            self.attestation = dict(d='', rd=self.canonicalize(), dt=helping.nowIso8601(), f=values)
+
+        return coring.Saider.saidify(sad=dict(self.attestation))
+
+    def extract(self):
+        return extracting.attest(extracting.controller(validations=self.validations), self.path)
+
+
+def startup(runs=5, warmup=1, names=None):
+    """ Time `cake <command> --help` of every command in a fresh interpreter
+
+    Each command only parses its arguments so the timing is the interpreter start plus
+    the imports of the command.  The `python` stage times a bare interpreter start.
+
+    Parameters:
+        runs (int): number of timed runs of each command
+        warmup (int): number of untimed runs of each command before timing
+        names (list): command name paths to time, every command when not provided
+
+    Returns:
+        dict: run metadata under `meta` and timings of each command under `stages`
+
+    """
+    from caxe.app.cli import cake
+
+    argvs = dict(python=[sys.executable, "-c", "pass"])
+    for path in names if names is not None else cake.walk():
+        argvs[" ".join(path)] = [sys.executable, "-m", "caxe.app.cli.cake", *path, "--help"]
+
+    results = dict()
+    for name, argv in argvs.items():
+        for _ in range(warmup):
+            subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            times.append(time.perf_counter() - start)
+
+        results[name] = summarize(times)
+
+    return dict(meta=meta(runs=runs, warmup=warmup), stages=results)
+
+
+def meta(**kwa):
+    """ Returns benchmark run metadata including kwa """
+    return dict(
+        version=caxe.__version__,
+        python=sys.version.split()[0],
+        platform=platform.platform(),
+        machine=platform.machine(),
+        dt=helping.nowIso8601(),
+        **kwa
+    )
+
+
+def summarize(times):
+    """ Returns run count and min, median, mean, max and standard deviation of times in seconds """
+    return dict(
+        runs=len(times),
+        min=min(times),
+        median=statistics.median(times),
+        mean=statistics.fmean(times),
+        max=max(times),
+        stdev=statistics.stdev(times) if len(times) > 1 else 0.0,
+    )
+
+
+def save(results, path):
+    """ Write benchmark results as JSON to path """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path):
+    """ Read benchmark results from JSON file path """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base, head, threshold=0.05):
+    """ Compare median stage timings of two benchmark results
+
+    Parameters:
+        base (dict): baseline benchmark results
+        head (dict): benchmark results to compare against the baseline
+        threshold (float): relative change of median below which a stage is unchanged
+
+    Returns:
+        list: one dict per stage present in both results with `stage`, `base` and `head`
+              medians, their `ratio` and a `change` of faster, slower or same
+
+    """
+    rows = []
+    for stage, stats in head["stages"].items():
+        if stage not in base["stages"]:
+            continue
+
+        b = base["stages"][stage]["median"]
+        h = stats["median"]
+        ratio = h / b if b else float("inf")
+        if ratio < 1 - threshold:
+            change = "faster"
+        elif ratio > 1 + threshold:
+            change = "slower"
+        else:
+            change = "same"
+
+        rows.append(dict(stage=stage, base=b, head=h, ratio=ratio, change=change))
+
+    return rows
@@ -0,0 +1,120 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.caching module
+
+Report verification result cache with single-flight coalescing
+
+"""
+import time
+
+from keri.help import ogler
+
+logger = ogler.getLogger()
+
+
+class Cacher:
+    """ Cache of report verification results keyed by report SAID and credential SAIDs
+
+    Identical verifications that arrive while one is already in flight join the
+    in-flight verification instead of starting a new pipeline run.  Successful
+    results are kept for .ttl seconds or until a credential in their chains is
+    revoked, whichever happens first.
+
+    """
+
+    TTL = 60.0
+
+    def __init__(self, ttl=None):
+        """ Create result cache
+
+        Parameters:
+            ttl (float): seconds to keep verification results, 0 disables result caching
+
+        """
+        self.ttl = ttl if ttl is not None else self.TTL
+        self.results = dict()
+        self.flights = dict()
+
+    @staticmethod
+    def key(said, saids):
+        """ Returns cache key for report SAID and the SAIDs of its credentials
+
+        Parameters:
+            said (str): qb64 SAID of report
+            saids (list): qb64 SAIDs of data attestation credentials linked from report
+
+        """
+        return f"{said}:{'.'.join(sorted(saids))}"
+
+    def get(self, key):
+        """ Returns unexpired verification results for key or None """
+        if (entry := self.results.get(key)) is None:
+            return None
+
+        expires, _, results = entry
+        if expires < time.monotonic():
+            del self.results[key]
+            return None
+
+        return results
+
+    def join(self, key, uuid):
+        """ Join in-flight verification of key if there is one
+
+        Parameters:
+            key (str): cache key of report verification
+            uuid (str): unique identifier of the report waiting for a result
+
+        Returns:
+            bool: True if uuid joined an in-flight verification, False if the caller
+                  is now the leader and must run the verification itself
+
+        """
+        if key in self.flights:
+            self.flights[key].append(uuid)
+            return True
+
+        self.flights[key] = []
+        return False
+
+    def land(self, key, saids=None, results=None):
+        """ End in-flight verification of key, caching results if successful
+
+        Parameters:
+            key (str): cache key of report verification
+            saids (list): qb64 SAIDs of data attestation credentials verified
+            results (dict): verification results or None if verification failed
+
+        Returns:
+            list: uuids of reports that joined the in-flight verification
+
+        """
+        waiters = self.flights.pop(key, [])
+        self.prune()
+        if results is not None and self.ttl > 0:
+            self.results[key] = (time.monotonic() + self.ttl, frozenset(saids or []), results)
+
+        return waiters
+
+    def prune(self):
+        """ Remove expired verification results """
+        now = time.monotonic()
+        for key in [key for key, (expires, _, _) in self.results.items() if expires < now]:
+            del self.results[key]
+
+    def evict(self, saids):
+        """ Remove cached results that depend on any of the credential SAIDs
+
+        Parameters:
+            saids (list): qb64 SAIDs of data attestation credentials with invalidated chains
+
+        """
+        if not saids:
+            return
+
+        saids = set(saids)
+        stale = [key for key, (_, creds, _) in self.results.items() if creds & saids]
+        for key in stale:
+            logger.info("Cacher: evicting verification result %s", key)
+            del self.results[key]
@@ -0,0 +1,270 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.cataloging module
+
+Local store of taxonomy packages and cached taxonomy files registered with every Arelle controller
+
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib import parse
+
+from keri.help import helping
+from arelle import CntlrCmdLine, FileSource, PackageManager
+
+Index = "index.json"
+
+
+def home():
+    """ Returns taxonomy store directory, CAXE_TAXONOMY_DIR or ~/.caxe/taxonomies """
+    return os.environ.get("CAXE_TAXONOMY_DIR", os.path.join(os.path.expanduser("~"), ".caxe", "taxonomies"))
+
+
+class Cataloger:
+    """ Store of taxonomy packages and of the taxonomy files fetched through Arelle's web cache
+
+    Taxonomy packages added to the store are remapped for every controller so their
+    schemas and linkbases resolve inside the package archives, and any other taxonomy
+    file is fetched once into the store's web cache.  Once `cake taxonomy prewarm` has
+    loaded every entry point from the store without the network the store is warm and
+    controllers work offline, so a cold container loads reports from the store as fast
+    as a warm one and never waits on the network.  Set CAXE_TAXONOMY_ONLINE to let a
+    warm store fetch taxonomies it does not hold yet.
+
+    Store layout:
+        packages/   taxonomy package archives
+        cache/      Arelle web cache of taxonomy files not in any package
+        index.json  parsed package metadata, prewarmed entry points and warm state
+
+    """
+
+    registered = None  # (path, index mtime) of the packages registered with Arelle's process wide package manager
+
+    def __init__(self, path=None):
+        """ Create taxonomy store
+
+        Parameters:
+            path (str): store directory, defaults to home()
+
+        """
+        self.path = path if path is not None else home()
+        self.packagesDir = os.path.join(self.path, "packages")
+        self.cacheDir = os.path.join(self.path, "cache")
+        self.indexPath = os.path.join(self.path, Index)
+
+    def index(self):
+        """ Returns store index with the parsed `packages`, prewarmed `entries` and `warm` state """
+        try:
+            with open(self.indexPath, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return dict(packages=[], entries=[], warm=False)
+
+    def save(self, index):
+        """ Atomically replace the store index with index """
+        os.makedirs(self.path, exist_ok=True)
+        tmp = f"{self.indexPath}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self.indexPath)
+
+    @property
+    def offline(self):
+        """ True if controllers must not fetch taxonomies, the store is warm and CAXE_TAXONOMY_ONLINE is not set """
+        return self.isOffline(self.index())
+
+    @staticmethod
+    def isOffline(index):
+        """ Returns True if controllers of a store with index must work offline """
+        return index.get("warm", False) and not os.environ.get("CAXE_TAXONOMY_ONLINE")
+
+    def register(self, cntlr, offline=None):
+        """ Register the store's packages and web cache with Arelle controller cntlr
+
+        Package remappings live in Arelle's process wide package manager so they are rebuilt
+        only when the index changes.
+
+        Parameters:
+            cntlr (Cntlr): Arelle controller
+            offline (bool): work offline, defaults to .offline
+
+        """
+        try:
+            mtime = os.path.getmtime(self.indexPath)
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime is not None:  # an empty store leaves Arelle's own web cache in place
+            os.makedirs(self.cacheDir, exist_ok=True)
+            cntlr.webCache.cacheDir = self.cacheDir
+
+        index = self.index()
+        cntlr.webCache.workOffline = offline if offline is not None else self.isOffline(index)
+
+        if Cataloger.registered == (self.path, mtime):
+            return
+
+        manager = PackageManager.getInstance()
+        config = manager.packagesConfig
+        config["packages"] = [info for info in config["packages"] if not self.holds(info["URL"])]
+        config["packages"].extend(self.relocate(info) for info in index["packages"])
+        manager.rebuildRemappings(cntlr)
+        Cataloger.registered = (self.path, mtime)
+
+    def holds(self, url):
+        return os.path.dirname(url) == self.packagesDir
+
+    def relocate(self, info):
+        """ Returns package info with its archive paths moved into .packagesDir, the store may be mounted anywhere """
+        url = os.path.join(self.packagesDir, os.path.basename(info["URL"]))
+        if url == info["URL"]:
+            return info
+
+        info = dict(info)
+        info["remappings"] = {prefix: url + remapping[len(info["URL"]):] if remapping.startswith(info["URL"])
+                              else remapping for prefix, remapping in info["remappings"].items()}
+        info["URL"] = url
+        return info
+
+    def controller(self, offline=False):
+        """ Returns Arelle controller using the store that buffers its log records """
+        cntlr = CntlrCmdLine.CntlrCmdLine()
+        cntlr.startLogging(logFileName='logToBuffer', logLevel='warning')
+        self.register(cntlr, offline=offline)
+        return cntlr
+
+    def add(self, source):
+        """ Copy the taxonomy package at path or URL source into the store and register it
+
+        Returns:
+            dict: Arelle package info of the package
+
+        Raises:
+            ValueError: if source is not a valid taxonomy package, a package whose catalog
+                        Arelle rejects would not remap any URL
+
+        """
+        os.makedirs(self.packagesDir, exist_ok=True)
+        name = os.path.basename(parse.urlparse(source).path) or "package.zip"
+        dest = os.path.join(self.packagesDir, name)
+
+        if parse.urlparse(source).scheme in ("http", "https"):
+            import requests
+
+            with requests.get(source, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                with open(f"{dest}.part", "wb") as f:
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        f.write(chunk)
+            os.replace(f"{dest}.part", dest)
+        elif os.path.abspath(source) != dest:
+            shutil.copyfile(source, dest)
+
+        cntlr = self.controller(offline=True)  # package schemas are in Arelle's built in cache
+        errors = []
+        info = PackageManager.getInstance().packageInfo(cntlr, dest, reload=True, errors=errors)
+        if not info or not info.get("identifier") or errors:
+            os.remove(dest)
+            raise ValueError(f"{source} is not a valid taxonomy package: {'; '.join(errors) or 'no metadata'}")
+
+        index = self.index()
+        index["packages"] = [pkg for pkg in index["packages"] if pkg["identifier"] != info["identifier"]]
+        index["packages"].append(info)
+        self.save(index)
+
+        return info
+
+    def prewarm(self, entries=()):
+        """ Load every entry point into the store and check that it loads without the network
+
+        Each entry point, a taxonomy entry schema or a report, is loaded once online to
+        fetch every taxonomy file of its DTS that is not in a package into the web cache
+        and then loaded again offline.  The store is warm when every entry point of the
+        store, including those prewarmed before, loads offline without errors.
+
+        Parameters:
+            entries (iterable): entry point URLs or paths to add to the store's entry points
+
+        Returns:
+            list: dicts of each entry point with its document count, online and offline load
+                  seconds and the errors of its offline load
+
+        """
+        index = self.index()
+        for entry in entries:
+            if parse.urlparse(entry).scheme not in ("http", "https"):
+                entry = os.path.abspath(entry)
+            if entry not in index["entries"]:
+                index["entries"].append(entry)
+
+        self.save(index)  # before the controller is registered so the store's web cache is used
+        cntlr = self.controller()
+        results = []
+        for entry in index["entries"]:
+            online = self.load(cntlr, entry, offline=False)
+            local = self.load(cntlr, entry, offline=True)
+            results.append(dict(entry=entry, documents=local["documents"], online=online["seconds"],
+                                offline=local["seconds"], errors=local["errors"]))
+
+        index["warm"] = bool(results) and not any(result["errors"] for result in results)
+        index["dt"] = helping.nowIso8601()
+        self.save(index)
+
+        return results
+
+    @staticmethod
+    def load(cntlr, entry, offline):
+        """ Returns document count, seconds and errors of loading entry point entry with buffering controller cntlr """
+        cntlr.webCache.workOffline = offline
+        start = time.perf_counter()
+        modelXbrl = cntlr.modelManager.load(FileSource.openFileSource(entry, cntlr))
+        seconds = time.perf_counter() - start
+        try:
+            documents = len(modelXbrl.urlDocs) if modelXbrl is not None else 0
+            errors = [record.getMessage() for record in cntlr.logHandler.logRecordBuffer
+                      if record.levelno >= logging.ERROR]
+        finally:
+            if modelXbrl is not None:
+                modelXbrl.close()
+            cntlr.logHandler.clearLogBuffer()
+            cntlr.webCache.saveUrlCheckTimes()
+
+        return dict(documents=documents, seconds=seconds, errors=errors)
+
+
+def store():
+    """ Returns the taxonomy store at home() """
+    return Cataloger()
+
+
+@contextmanager
+def mapped(cntlr, url, content):
+    """ Map report url of Arelle controller cntlr to a local file holding its content, fetched already
+
+    Arelle reads the report from the file but resolves the references of the report against
+    url, so a controller working offline with a warm store loads fetched reports as well as
+    their taxonomies.
+
+    Parameters:
+        cntlr (Cntlr): Arelle controller loading the report
+        url (str): URL of the report
+        content (bytes): fetched report
+
+    """
+    fd, path = tempfile.mkstemp(prefix="caxe-", suffix=os.path.splitext(parse.urlparse(url).path)[1])
+    mappedFiles = cntlr.modelManager.disclosureSystem.mappedFiles
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+
+        mappedFiles[url] = path
+        yield path
+    finally:
+        mappedFiles.pop(url, None)
+        os.remove(path)
@@ -0,0 +1,169 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.chaining module
+
+Memoized resolution of data attestation credential chains
+
+"""
+import time
+from dataclasses import dataclass, field
+
+from keri.help import ogler
+
+from caxe.core.metering import meter
+
+logger = ogler.getLogger()
+
+
+@dataclass(slots=True)
+class Chain:
+    """ Resolved credential chain of one data attestation credential
+
+    Attributes:
+        said (str): SAID of the data attestation credential
+        attrs (dict): attributes section of the data attestation credential
+        vira (dict): verification result of the credential and every chained credential
+        saids (list): SAIDs of every credential in the chain, starting with .said
+        revoked (str): SAID of the first revoked credential found in the chain, if any
+
+    """
+    said: str
+    attrs: dict = None
+    vira: dict = None
+    saids: list = field(default_factory=list)
+    revoked: str = None
+
+
+class Chainer:
+    """ Read through cache of resolved credential chains keyed by credential SAID
+
+    A data attestation credential is resolved once by walking every edge of the
+    credential and of each chained credential (OOR/ECR, QVI up to the GLEIF issuer)
+    in the registry.  The result is cached so subsequent verifications of reports
+    attested by the same credential cost a single dict lookup.
+
+    Cached chains are swept for revocations whenever new TEL events may have been
+    processed (.dirty) so a revoked credential anywhere in a chain invalidates it.
+
+    """
+
+    def __init__(self, reger):
+        """ Create credential chain cache
+
+        Parameters:
+            reger (Reger): credential registry database
+
+        """
+        self.reger = reger
+        self.chains = dict()
+        self.dirty = False
+
+    def resolve(self, said):
+        """ Return resolved credential chain for credential SAID
+
+        Parameters:
+            said (str): qb64 SAID of data attestation credential
+
+        Returns:
+            Chain: resolved chain or None if the credential or one of its chained
+                credentials has not been verified and saved yet
+
+        """
+        if (chain := self.chains.get(said)) is not None:
+            return chain
+
+        if self.reger.saved.get(keys=said) is None:
+            return None
+
+        start = time.perf_counter()
+        creder = self.reger.creds.get(keys=(said,))
+        chain = Chain(said=creder.said, attrs=creder.sad["a"])
+        edges = self.walk(creder, chain=chain)
+        meter.observe("resolve", time.perf_counter() - start)
+        if edges is None:
+            return None
+
+        vira = dict(
+            i=creder.issuer,
+        )
+
+        for label, node in edges.items():
+            vira[label] = node["a"]
+
+        vira['e'] = edges
+        vira['f'] = chain.attrs.get('f')
+        chain.vira = vira
+
+        if chain.revoked is None:
+            self.chains[said] = chain
+
+        return chain
+
+    def walk(self, creder, chain):
+        """ Recursively resolve every edge of credential
+
+        Parameters:
+            creder (Creder): credential to resolve edges of
+            chain (Chain): chain being resolved, accumulates SAIDs and revocation
+
+        Returns:
+            dict: chained credential nodes keyed by edge label or None if a chained
+                credential is not available yet
+
+        """
+        chain.saids.append(creder.said)
+        if chain.revoked is None and self.revoked(creder.said):
+            chain.revoked = creder.said
+
+        edges = dict()
+        for label, edge in creder.sad.get('e', dict()).items():
+            if not isinstance(edge, dict) or 'n' not in edge:
+                continue
+
+            said = edge['n']
+            if said in chain.saids:
+                continue
+
+            chained = self.reger.creds.get(keys=(said,))
+            if chained is None:
+                return None
+
+            nodes = self.walk(chained, chain=chain)
+            if nodes is None:
+                return None
+
+            edges[label] = dict(
+                d=chained.said,
+                i=chained.issuer,
+                a=chained.sad['a'],
+                e=nodes
+            )
+
+        return edges
+
+    def revoked(self, said):
+        """ Returns True if TEL of credential shows a revocation event
+
+        Parameters:
+            said (str): qb64 SAID of credential
+
+        """
+        return self.reger.cntTels(said) > 1
+
+    def sweep(self):
+        """ Invalidate every cached chain that now contains a revoked credential
+
+        Returns:
+            list: SAIDs of data attestation credentials whose chains were invalidated
+
+        """
+        stale = [said for said, chain in self.chains.items()
+                 if any(self.revoked(s) for s in chain.saids)]
+
+        for said in stale:
+            logger.info("Chainer: invalidating revoked credential chain %s", said)
+            del self.chains[said]
+
+        self.dirty = False
+        return stale
@@ -0,0 +1,292 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.clustering module
+
+Multi-process serving of the report endpoints on one port
+
+"""
+import multiprocessing
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+from hio.base import doing
+from keri import help
+from keri.vdr import viring
+
+from caxe.core import admitting, asyncing, metering, ogling, profiling, serving
+
+logger = help.ogler.getLogger()
+
+
+class Replica(asyncing.VerifyEnd):
+    """ Worker process report verification reading the keystore of the owner process
+
+    Credential streams fetched by the worker are sent to the owner process, the only
+    process that parses KERI messages and writes KEL/TEL events, and the worker waits
+    for the credential chains to appear in its read only view of the registry.  Cached
+    chains are swept for revocations periodically since revocations may arrive through
+    the fetches of any worker.
+
+    """
+
+    Sweep = 1.0  # seconds between revocation sweeps of cached credential chains
+
+    def __init__(self, reger, feed, ttl=None, profiler=None, executor=None, admitter=None, tracer=None):
+        """ Create worker verification resource
+
+        Parameters:
+            reger (Reger): credential registry opened read only
+            feed (multiprocessing.Queue): (said, body) credential streams for the owner process
+            ttl (float): seconds to cache verification results
+            profiler (Profiler): optional on-demand request profiler
+            executor (Executor): executor for CPU bound report processing
+            admitter (Admitter): optional admission control of verifications
+            tracer (Tracer): optional sampled request tracing
+
+        """
+        self.feed = feed
+        super(Replica, self).__init__(hby=None, hab=None, kvy=None, rvy=None, tvy=None, vry=None, ttl=ttl,
+                                      profiler=profiler, executor=executor, reger=reger, admitter=admitter,
+                                      tracer=tracer)
+
+    def parse(self, said, body):
+        """ Send credential OOBI response body to the owner process for parsing """
+        self.feed.put((said, bytes(body)))
+        self.fetched[said] = time.monotonic()
+
+    def msgDo(self, tymth=None, tock=0.0):
+        """ Returns doifiable Doist compatible generator method that ends at once, the owner parses messages """
+        self.wind(tymth)
+        self.tock = tock
+        _ = (yield self.tock)
+
+        return True
+
+    def escrowDo(self, tymth=None, tock=0.0):
+        """ Returns doifiable Doist compatible generator method sweeping cached chains for revocations
+
+        Parameters:
+            tymth (function): injected function wrapper closure returned by .tymen() of
+                Tymist instance. Calling tymth() returns associated Tymist .tyme.
+            tock (float): injected initial tock value
+
+        """
+        self.wind(tymth)
+        self.tock = tock
+        _ = (yield self.tock)
+
+        last = time.monotonic()
+        while True:
+            if time.monotonic() - last >= self.Sweep:
+                self.cacher.evict(self.chainer.sweep())
+                last = time.monotonic()
+
+            yield
+
+
+class Feeder(doing.Doer):
+    """ Owner process doer handing credential streams from the workers to the resolver's parser """
+
+    def __init__(self, resolver, feed, **kwa):
+        """ Create feeder
+
+        Parameters:
+            resolver (Resolver): owner process parser of KERI messages
+            feed (multiprocessing.Queue): (said, body) credential streams sent by the workers
+
+        """
+        self.resolver = resolver
+        self.feed = feed
+        super(Feeder, self).__init__(**kwa)
+
+    def recur(self, tyme):
+        while True:
+            try:
+                said, body = self.feed.get_nowait()
+            except queue.Empty:
+                break
+
+            self.resolver.parse(said, body)
+
+        return False
+
+
+class Publisher(doing.Doer):
+    """ Owner process doer publishing the owner's meter state to the workers' metrics """
+
+    def __init__(self, sharer, **kwa):
+        """ Create meter state publisher
+
+        Parameters:
+            sharer (Sharer): exchange of meter states with the workers, its directory is removed on exit
+
+        """
+        self.sharer = sharer
+        super(Publisher, self).__init__(**kwa)
+
+    def recur(self, tyme):
+        try:
+            self.sharer.publish()
+        except OSError as ex:
+            logger.error("Publisher: failed to publish metrics to %s: %s", self.sharer.path, ex)
+
+        return False
+
+    def exit(self):
+        shutil.rmtree(self.sharer.path, ignore_errors=True)
+
+
+class Supervisor(doing.Doer):
+    """ Owner process doer running the worker processes, restarting any worker that exits """
+
+    def __init__(self, count, target, args=(), **kwa):
+        """ Create worker supervisor
+
+        Parameters:
+            count (int): number of worker processes
+            target (callable): worker process entry point, called with the worker index and args
+            args (tuple): additional arguments of target
+
+        """
+        self.count = count
+        self.target = target
+        self.args = args
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = []
+        super(Supervisor, self).__init__(**kwa)
+
+    def start(self, index):
+        worker = self.context.Process(target=self.target, args=(index, *self.args), name=f"caxe-worker-{index}",
+                                      daemon=True)
+        worker.start()
+        return worker
+
+    def enter(self):
+        self.workers = [self.start(index) for index in range(self.count)]
+
+    def recur(self, tyme):
+        for index, worker in enumerate(self.workers):
+            if not worker.is_alive():
+                logger.error("Supervisor: worker %s exited with %s, restarting", index, worker.exitcode)
+                self.workers[index] = self.start(index)
+
+        return False
+
+    def exit(self):
+        for worker in self.workers:
+            worker.terminate()
+
+        for worker in self.workers:
+            worker.join()
+
+
+def bind(host, port, backlog=2048):
+    """ Returns listening socket on host and port that other processes may bind too with SO_REUSEPORT """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+def work(index, alias, host, port, feed, ttl=None, parallelism=None, profiler=None, workers=None, limits=None,
+         compressor=None, tracer=None, loglevel=None, logSample=100, metrics=None):
+    """ Worker process entry point serving the report endpoints on its own SO_REUSEPORT socket
+
+    Parameters:
+        index (int): worker index
+        alias (str): alias of the service identifier, names the credential registry
+        host (str): host address to bind
+        port (int): port to bind, shared by every worker
+        feed (multiprocessing.Queue): (said, body) credential streams for the owner process
+        ttl (float): seconds to cache report verification results
+        parallelism (int): maximum number of reports of one batch verified at once
+        profiler (Profiler): on-demand request profiler
+        workers (int): number of executor threads of the worker
+        limits (Limits): admission limits of the worker's endpoints
+        compressor (Compressor): response compression middleware of the worker
+        tracer (Tracer): sampled request tracing of the worker, appending to the file shared by every worker
+        loglevel (str): logging level of the worker, records are written by its own listener thread
+        logSample (int): sampling of the worker's high volume log records
+        metrics (str): directory of the meter states of the owner and the workers, summed by /metrics
+
+    """
+    import uvicorn
+    from concurrent import futures
+
+    ogling.start(level=loglevel, every=logSample)
+    reger = viring.Reger(name=alias, temp=False, reopen=False)
+    reger.reopen(readonly=True)
+
+    profiler = profiler if profiler is not None else profiling.Profiler()
+    executor = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"caxe-{index}")
+    verifyAdmitter, saidifyAdmitter = (limits if limits is not None else admitting.Limits()).admitters()
+    replica = Replica(reger=reger, feed=feed, ttl=ttl, profiler=profiler, executor=executor, admitter=verifyAdmitter,
+                      tracer=tracer)
+    sharer = metering.Sharer(path=metrics, name=f"worker-{index}") if metrics is not None else None
+    if sharer is not None:
+        threading.Thread(target=sharer.run, name="caxe-metrics", daemon=True).start()
+
+    app = asyncing.application(replica, parallelism=parallelism, profiler=profiler, executor=executor,
+                               admitter=saidifyAdmitter, compressor=compressor, sharer=sharer)
+
+    server = uvicorn.Server(uvicorn.Config(app, lifespan="on", log_level="warning"))
+    try:
+        server.run(sockets=[bind(host, port)])
+    finally:
+        reger.close()
+
+
+def setup(hby, alias, host, port, count, ttl=None, parallelism=None, profiler=None, workers=None, limits=None,
+          compressor=None, oobis=None, tracer=None, loglevel=None, logSample=100):
+    """ Returns owner process doers serving the report endpoints from count worker processes
+
+    The owner process keeps the keystore open read write and runs the only KERI message
+    parser and escrow processing.  Each worker binds host and port with SO_REUSEPORT so
+    the kernel spreads connections across the workers.  The owner and the workers publish
+    their meter states to a temporary directory so /metrics of any worker reports the totals
+    of every process.
+
+    Parameters:
+        hby (Habery): keystore of the service
+        alias (str): alias of the service identifier
+        host (str): host address to bind
+        port (int): port to bind
+        count (int): number of worker processes
+        ttl (float): seconds to cache report verification results
+        parallelism (int): maximum number of reports of one batch verified at once
+        profiler (Profiler): on-demand request profiler
+        workers (int): number of executor threads of each worker
+        limits (Limits): admission limits of the endpoints of each worker
+        compressor (Compressor): response compression middleware of each worker
+        oobis (Oobis): optional credential and issuer OOBIs to resolve into the owner's registry
+        tracer (Tracer): sampled request tracing of each worker
+        loglevel (str): logging level of each worker
+        logSample (int): sampling of the high volume log records of each worker
+
+    """
+    try:
+        import uvicorn  # noqa: F401  workers serve with uvicorn, fail before spawning them
+    except ImportError as ex:
+        raise ImportError("Multi-process serving requires uvicorn, install it with `pip install caxe[asgi]`") from ex
+
+    hab, kvy, tvy, rvy, verfer = serving.components(hby, alias)
+    resolver = serving.Resolver(hby=hby, hab=hab, kvy=kvy, tvy=tvy, rvy=rvy, vry=verfer, ttl=ttl)
+
+    feed = multiprocessing.get_context("spawn").Queue()
+    sharer = metering.Sharer(path=tempfile.mkdtemp(prefix="caxe-metrics-"), name="owner")
+    supervisor = Supervisor(count=count, target=work,
+                            args=(hab.name, host, port, feed, ttl, parallelism, profiler, workers, limits, compressor,
+                                  tracer, loglevel, logSample, sharer.path),
+                            tock=1.0)
+
+    warmers = oobis.warmers(resolver=resolver, hby=hby) if oobis is not None else []
+    return ([resolver, Feeder(resolver=resolver, feed=feed), Publisher(sharer=sharer, tock=metering.Sharer.Every),
+             supervisor] + warmers)
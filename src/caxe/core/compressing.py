@@ -0,0 +1,346 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.compressing module
+
+Content-Encoding decoding of uploaded reports and negotiated compression of responses
+
+"""
+import json
+import zlib
+
+import falcon
+from keri.help import ogler
+
+from caxe.core.metering import meter
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, `pip install caxe[brotli]`
+    brotli = None
+
+logger = ogler.getLogger()
+
+Chunk = 65536  # bytes of the request body read at once
+Limit = 1 << 28  # maximum decoded request body size, guards against decompression bombs
+Codings = 2  # maximum content codings of a request body
+Threshold = 1024  # minimum response body size worth compressing
+Level = 6  # zlib compression level of responses
+
+Windows = dict(gzip=zlib.MAX_WBITS | 16, deflate=zlib.MAX_WBITS)  # zlib wbits of the gzip and zlib formats
+
+
+def supported():
+    """ Returns the content codings that can be decoded and encoded, br only when brotli is installed """
+    return ("br", "gzip", "deflate") if brotli is not None else ("gzip", "deflate")
+
+
+class Decoder:
+    """ Incremental decoder of a request body with one or more content codings
+
+    Each chunk of the body is decoded as it is read so the compressed body is never held
+    in memory.  Every stage decodes at most Chunk bytes at a time, feeding them to the
+    next stage as they are decoded, and decoding stops with 413 Payload Too Large as soon
+    as the output of any stage exceeds .limit, so a decompression bomb never expands in
+    memory past the limit.
+
+    """
+
+    def __init__(self, encodings, limit=Limit):
+        """ Create decoder
+
+        Parameters:
+            encodings (list): content codings in the order they were applied, as in the Content-Encoding header
+            limit (int): maximum decoded size in bytes of each coding
+
+        Raises:
+            falcon.HTTPUnsupportedMediaType: for a content coding that cannot be decoded or more than
+                                             Codings content codings
+
+        """
+        if len(encodings) > Codings:
+            raise falcon.HTTPUnsupportedMediaType(title="Unsupported Content-Encoding",
+                                                  description=f"At most {Codings} content codings are supported")
+
+        self.limit = limit
+        self.stages = [self.stage(encoding) for encoding in reversed(encodings)]
+        self.sizes = [0] * len(self.stages)
+
+    @property
+    def size(self):
+        """ Decoded size in bytes of the body so far """
+        return self.sizes[-1]
+
+    @staticmethod
+    def stage(encoding):
+        """ Returns (decode, finish) generator functions of one content coding
+
+        decode(data) yields the bytes decoded from data and finish() the last decoded
+        bytes, each at most Chunk bytes at a time.
+
+        """
+        if encoding in Windows:
+            decompressor = zlib.decompressobj(Windows[encoding])
+
+            def decode(data):
+                while data:
+                    piece = decompressor.decompress(data, Chunk)
+                    data = decompressor.unconsumed_tail
+                    if piece:
+                        yield piece
+
+            def finish():
+                piece = decompressor.flush()  # all input is consumed, at most the window is left
+                if not decompressor.eof:
+                    raise falcon.HTTPBadRequest(title="Invalid body", description="Body is truncated")
+                if piece:
+                    yield piece
+
+            return decode, finish
+
+        if encoding == "br" and brotli is not None:
+            decompressor = brotli.Decompressor()
+
+            def decode(data):
+                piece = decompressor.process(data, output_buffer_limit=Chunk)
+                while True:
+                    if piece:
+                        yield piece
+                    if decompressor.can_accept_more_data():
+                        return
+                    piece = decompressor.process(b'', output_buffer_limit=Chunk)
+
+            def finish():
+                while not decompressor.is_finished():  # output held back by the buffer limit
+                    if not (piece := decompressor.process(b'', output_buffer_limit=Chunk)):
+                        raise falcon.HTTPBadRequest(title="Invalid body", description="Body is truncated")
+                    yield piece
+
+            return decode, finish
+
+        raise falcon.HTTPUnsupportedMediaType(title="Unsupported Content-Encoding",
+                                              description=f"Content-Encoding {encoding} is not supported, use one "
+                                                          f"of {', '.join(supported())}")
+
+    def decode(self, chunk):
+        """ Returns decoded bytes of the next chunk of the body """
+        decode, _ = self.stages[0]
+        return self.run(0, decode(chunk))
+
+    def flush(self):
+        """ Returns the remaining decoded bytes once the whole body has been decoded """
+        return b''.join(self.run(index, finish()) for index, (_, finish) in enumerate(self.stages))
+
+    def run(self, index, pieces):
+        """ Returns the bytes decoded by the stages after stage index from the pieces decoded by stage index """
+        try:
+            return b''.join(self.pipe(index, pieces))
+        except (zlib.error, getattr(brotli, "error", zlib.error)) as ex:
+            raise falcon.HTTPBadRequest(title="Invalid body", description=f"Body is not validly encoded: {ex}")
+
+    def pipe(self, index, pieces):
+        for piece in pieces:
+            self.check(index, piece)
+            if index + 1 == len(self.stages):
+                yield piece
+                continue
+
+            decode, _ = self.stages[index + 1]
+            yield from self.pipe(index + 1, decode(piece))
+
+    def check(self, index, data):
+        self.sizes[index] += len(data)
+        if self.sizes[index] > self.limit:
+            meter.count("decoded_oversize")
+            raise falcon.HTTPPayloadTooLarge(title="Payload Too Large",
+                                             description=f"Decoded body exceeds {self.limit} bytes")
+
+
+def encodings(req):
+    """ Returns content codings of the request body, empty for an identity encoded body """
+    header = req.get_header("Content-Encoding") or ""
+    return [encoding for encoding in (coding.strip().lower() for coding in header.split(","))
+            if encoding and encoding != "identity"]
+
+
+def read(req, limit=Limit):
+    """ Returns the request body decoded as it is read from the request stream
+
+    Raises:
+        falcon.HTTPUnsupportedMediaType: for a content coding that cannot be decoded
+        falcon.HTTPPayloadTooLarge: if the decoded body exceeds limit bytes
+
+    """
+    if not (codings := encodings(req)):
+        return req.bounded_stream.read()
+
+    decoder = Decoder(codings, limit=limit)
+    chunks = []
+    while chunk := req.bounded_stream.read(Chunk):
+        chunks.append(decoder.decode(chunk))
+    chunks.append(decoder.flush())
+
+    meter.count("requests_decoded")
+    return b''.join(chunks)
+
+
+async def receive(req, limit=Limit):
+    """ Returns the falcon.asgi request body decoded as it is received, as read() """
+    if not (codings := encodings(req)):
+        return await req.bounded_stream.read()
+
+    decoder = Decoder(codings, limit=limit)
+    chunks = []
+    while chunk := await req.bounded_stream.read(Chunk):
+        chunks.append(decoder.decode(chunk))
+    chunks.append(decoder.flush())
+
+    meter.count("requests_decoded")
+    return b''.join(chunks)
+
+
+def media(req):
+    """ Returns the JSON request body, decoding a compressed body """
+    if not encodings(req):
+        return req.get_media()
+
+    return loads(read(req))
+
+
+async def receiveMedia(req):
+    """ Returns the JSON falcon.asgi request body, decoding a compressed body """
+    if not encodings(req):
+        return await req.get_media()
+
+    return loads(await receive(req))
+
+
+def loads(data):
+    try:
+        return json.loads(data)
+    except ValueError as ex:
+        raise falcon.HTTPBadRequest(title="Invalid JSON", description=f"Could not parse JSON body: {ex}")
+
+
+class Encoder:
+    """ Incremental encoder of a response body with one content coding """
+
+    def __init__(self, encoding, level=Level):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=min(level, 11))
+        else:
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, Windows[encoding])
+
+    def encode(self, chunk, flush=True):
+        """ Returns encoded bytes of chunk, flushed so the client can decode every chunk as it arrives """
+        if self.encoding == "br":
+            return self.compressor.process(chunk) + (self.compressor.flush() if flush else b'')
+
+        return self.compressor.compress(chunk) + (self.compressor.flush(zlib.Z_SYNC_FLUSH) if flush else b'')
+
+    def finish(self):
+        """ Returns the final encoded bytes ending the body """
+        if self.encoding == "br":
+            return self.compressor.finish()
+
+        return self.compressor.flush()
+
+
+class Compressor:
+    """ falcon middleware compressing responses with the best coding the client accepts
+
+    Buffered bodies smaller than .threshold are sent as is since compressing them costs
+    more than it saves.  Streamed bodies, whose size is not known when the headers are
+    sent, are compressed chunk by chunk with each chunk flushed so results are delivered
+    as they are produced.  Both the WSGI and the falcon.asgi apps use it.
+
+    """
+
+    def __init__(self, threshold=Threshold, level=Level):
+        """ Create response compression middleware
+
+        Parameters:
+            threshold (int): minimum size in bytes of buffered bodies to compress
+            level (int): compression level, 0 disables compression
+
+        """
+        self.threshold = threshold
+        self.level = level
+
+    def negotiate(self, req, rep):
+        """ Returns content coding to compress the response with, None to send it as is """
+        if self.level <= 0 or rep.get_header("Content-Encoding") is not None or req.method == "HEAD":
+            return None
+
+        rep.append_header("Vary", "Accept-Encoding")
+
+        accepted = dict()
+        for item in (req.get_header("Accept-Encoding") or "").split(","):
+            coding, _, params = item.strip().lower().partition(";")
+            if not coding:
+                continue
+            q = 1.0
+            for param in params.split(";"):
+                name, _, value = param.strip().partition("=")
+                if name == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            accepted[coding.strip()] = q
+
+        for coding in supported():
+            if accepted.get(coding, accepted.get("*", 0.0)) > 0.0:
+                return coding
+
+        return None
+
+    def process_response(self, req, rep, resource, req_succeeded):
+        if (encoding := self.negotiate(req, rep)) is None:
+            return
+
+        if rep.stream is not None:
+            rep.stream = self.stream(rep.stream, Encoder(encoding, level=self.level))
+            rep.set_header("Content-Encoding", encoding)
+            return
+
+        data = rep.render_body()
+        if data is not None and len(data) >= self.threshold:
+            self.compress(rep, data, encoding)
+
+    async def process_response_async(self, req, rep, resource, req_succeeded):
+        if (encoding := self.negotiate(req, rep)) is None:
+            return
+
+        if rep.stream is not None:
+            rep.stream = self.streamAsync(rep.stream, Encoder(encoding, level=self.level))
+            rep.set_header("Content-Encoding", encoding)
+            return
+
+        data = await rep.render_body()
+        if data is not None and len(data) >= self.threshold:
+            self.compress(rep, data, encoding)
+
+    def compress(self, rep, data, encoding):
+        encoder = Encoder(encoding, level=self.level)
+        rep.data = encoder.encode(data, flush=False) + encoder.finish()
+        rep.text = None
+        rep.media = None
+        rep.set_header("Content-Encoding", encoding)
+        meter.count("responses_compressed")
+
+    @staticmethod
+    def stream(chunks, encoder):
+        for chunk in chunks:
+            yield encoder.encode(chunk) if chunk else chunk  # empty chunks are the hio server polling for results
+        yield encoder.finish()
+        meter.count("responses_compressed")
+
+    @staticmethod
+    async def streamAsync(chunks, encoder):
+        async for chunk in chunks:
+            if chunk:
+                yield encoder.encode(chunk)
+        yield encoder.finish()
+        meter.count("responses_compressed")
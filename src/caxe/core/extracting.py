@@ -0,0 +1,404 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.extracting module
+
+Extraction of report attestations, singly or in parallel batches
+
+"""
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import time
+
+import blake3
+from lxml import etree, html
+
+from keri import help
+from keri.core import coring
+from arelle import CntlrCmdLine, FileSource, ValidateDuplicateFactsConst
+from arelle.ModelFormulaObject import FormulaOptions
+from arelle.logging.formatters.LogFormatter import LogFormatter
+from arelle.logging.handlers.LogToPrintHandler import LogToPrintHandler
+
+from caxe.core import attribing, cataloging, merkling, saiding
+
+Extensions = (".xhtml", ".html", ".htm")
+Chunk = 1 << 20  # bytes of memory mapped report fed to the parser at a time
+Fork = 20000  # facts of the smallest report whose facts are extracted by forked workers
+Slices = 4  # slices of the facts given to each forked worker, bounding the records held by stream()
+
+Errors = LogToPrintHandler("logToStdErr")  # Arelle error log handler of fast profile controllers
+Errors.setFormatter(LogFormatter("%(asctime)s [%(messageCode)s] %(message)s - %(file)s\n"))
+
+
+def controller(cacheDir=None, validations=False):
+    """ Returns Arelle controller with the fast load profile using the taxonomy store
+
+    Only facts, contexts, units and labels are extracted so the validation and formula
+    options of the model manager are turned off, see fast(), and only errors are logged,
+    to stderr, through one handler shared by every controller of the process instead of a
+    buffer keeping every log record for the life of the controller.  Taxonomies resolve
+    through the packages and web cache of the taxonomy store, see cataloging.Cataloger.
+
+    Parameters:
+        cacheDir (str): optional Arelle web cache directory overriding that of the taxonomy store
+        validations (bool): True to buffer log records so Attiber.validationErrors() can
+                            report them, the buffer grows until its handler's
+                            clearLogBuffer() is called
+
+    """
+    cntlr = CntlrCmdLine.CntlrCmdLine()
+    if validations:
+        cntlr.startLogging(logFileName='logToBuffer')
+    else:
+        cntlr.startLogging(logHandler=Errors, logLevel='error')
+    fast(cntlr.modelManager)
+    cataloging.store().register(cntlr)
+
+    if cacheDir is not None:
+        os.makedirs(cacheDir, exist_ok=True)
+        cntlr.webCache.cacheDir = cacheDir
+
+    return cntlr
+
+
+def fast(mmgr):
+    """ Turn off the validation passes and formula processing of Arelle model manager mmgr
+
+    Loading a report never runs them, but user configuration and plugins may enable them
+    on the shared model manager, so every option is reset to do no more than load.
+
+    """
+    mmgr.validateDisclosureSystem = False
+    mmgr.validateCalcs = 0
+    mmgr.validateInfoset = False
+    mmgr.validateUtr = False
+    mmgr.validateDuplicateFacts = ValidateDuplicateFactsConst.DuplicateType.NONE
+    mmgr.validateXmlOim = False
+    mmgr.formulaOptions = FormulaOptions()
+    mmgr.formulaOptions.formulaAction = "none"
+    return mmgr
+
+
+def attest(cntlr, path, merkle=False, workers=1):
+    """ Extract and saidify the data attestation of every fact of an iXBRL report
+
+    Parameters:
+        cntlr (Cntlr): Arelle controller, reused across reports
+        path (str): path of iXBRL report
+        merkle (bool): True to attest the Merkle root `mr` of the fact records
+        workers (int): processes extracting the facts of a report of at least Fork facts, see fork()
+
+    Returns:
+        dict: saidified attestation with report digest `rd` and fact attributes `f`
+
+    """
+    with open(path, mode="r", encoding="utf-8") as f:
+        data = f.read()
+
+    root = html.document_fromstring(data.encode("utf-8"))
+    links = root.xpath(".//link[@type='application/json+acdc']")
+
+    for link in links:
+        link.getparent().remove(link)
+
+    data = etree.tostring(root)
+    xmld = etree.canonicalize(data.decode("utf-8"))
+    raw = blake3.blake3(xmld.encode("utf-8")).digest()
+    diger = coring.Diger(raw=raw)
+
+    a = dict(
+        d='',
+        rd=diger.qb64,
+        dt=help.nowIso8601()
+    )
+
+    modelXbrl = cntlr.modelManager.load(FileSource.FileSource(path))
+    try:
+        attriber = attribing.Attiber(dts=modelXbrl)
+        if forks(modelXbrl, workers):
+            values = list(fork(attriber, workers))
+        else:
+            attriber.createViewer()
+
+            facts = attriber.taxonomyData['facts']
+            values = [record(fact, facts[fact.id]) for fact in modelXbrl.facts]
+    finally:
+        modelXbrl.close()
+
+    a['f'] = values
+    if merkle:
+        a['mr'] = merkling.Merkler(values).root
+
+    _, a = coring.Saider.saidify(sad=a)
+
+    return a
+
+
+def stream(cntlr, path, out, merkle=False, workers=1):
+    """ Extract the attestation of an iXBRL report, writing fact records as they are produced
+
+    Produces the same attestation as attest() while holding at most one parse of the
+    report in memory at a time.  The report is still parsed twice: the memory mapped
+    report is parsed as HTML for the report digest, streaming its canonical form into the
+    hash, and that parse is released before Arelle parses the report again into its own
+    model for the facts, since the report digest is defined over the HTML parse.  Fact
+    records are serialized to out one at a time and the SAID of the attestation is patched
+    in once the last fact is written.
+
+    Parameters:
+        cntlr (Cntlr): Arelle controller, reused across reports
+        path (str): path of iXBRL report
+        out (file): seekable binary file the compact JSON attestation is written to
+        merkle (bool): True to attest the Merkle root `mr` of the fact records
+        workers (int): processes extracting the facts of a report of at least Fork facts, see fork()
+
+    Returns:
+        str: qb64 SAID of the attestation
+
+    """
+    hasher = blake3.blake3()
+
+    class Sink:
+        @staticmethod
+        def write(chunk):
+            hasher.update(chunk.encode("utf-8"))
+
+    with open(path, mode="rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        parser = html.HTMLParser()
+        for offset in range(0, len(mm), Chunk):
+            parser.feed(mm[offset:offset + Chunk])
+        root = parser.close()
+
+    for link in root.xpath(".//link[@type='application/json+acdc']"):
+        link.getparent().remove(link)
+
+    data = etree.tostring(root)
+    del root
+    etree.canonicalize(from_file=io.BytesIO(data), out=Sink)
+    del data
+
+    saidifier = saiding.Saidifier(out)
+    saidifier.open(dict(d='', rd=coring.Diger(raw=hasher.digest()).qb64, dt=help.nowIso8601()))
+
+    merkler = merkling.Merkler() if merkle else None
+    modelXbrl = cntlr.modelManager.load(FileSource.FileSource(path))
+    try:
+        attriber = attribing.Attiber(dts=modelXbrl)
+        if forks(modelXbrl, workers):
+            records = fork(attriber, workers)
+        else:
+            records = (record(fact, fad) for fact, fad in attriber.iterFacts())
+        saidifier.array('f', records if merkler is None else (merkler.add(value) for value in records))
+    finally:
+        modelXbrl.close()
+
+    if merkler is not None:
+        saidifier.field('mr', merkler.root)
+
+    return saidifier.close()
+
+
+def record(fact, fad):
+    """ Returns attestation record of Arelle fact with its Attiber fact data fad """
+    raw = blake3.blake3(etree.tostring(fact)).digest()
+    diger = coring.Diger(raw=raw)
+    attr = dict(
+        i=fact.id,
+        t=fact.localName,
+        d=diger.qb64,
+        v=fad['v'],
+    )
+    attr['c'] = fad['a']['c']
+    attr['e'] = fad['a']['e']
+    attr['p'] = fad['a']['p']
+
+    if 'f' in fad:
+        attr['f'] = fad['f']
+
+    return attr
+
+
+_attriber = None  # Attiber of the loaded report shared with forked fact workers
+
+
+def forks(modelXbrl, workers):
+    """ Returns True if the facts of loaded report modelXbrl are extracted by workers forked processes """
+    return (workers is not None and workers > 1 and len(modelXbrl.facts) >= Fork
+            and "fork" in multiprocessing.get_all_start_methods())
+
+
+def fork(attriber, workers):
+    """ Yield the attestation record of every fact of a loaded report, extracted by forked workers
+
+    Arelle spends most of the extraction of a large report formatting the aspects and
+    values of its facts and digesting them, one fact at a time.  Once the report is
+    loaded the facts are numbered and their namespace prefixes registered in document
+    order, then worker processes are forked and share the loaded model copy-on-write.
+    Each worker extracts slices of the facts and the records are yielded in document
+    order, the same records extracting every fact in one process yields.
+
+    Parameters:
+        attriber (Attiber): Attiber of the loaded report, no facts added yet
+        workers (int): number of worker processes
+
+    """
+    global _attriber
+
+    attriber.numberFacts()
+    attriber.primeNamespaces()
+
+    count = len(attriber.dts.facts)
+    size = -(-count // (workers * Slices))
+    slices = [(start, min(start + size, count)) for start in range(0, count, size)]
+
+    _attriber = attriber
+    try:
+        with multiprocessing.get_context("fork").Pool(processes=workers) as pool:
+            for values in pool.imap(_records, slices):
+                yield from values
+    finally:
+        _attriber = None
+
+
+def _records(bounds):
+    start, end = bounds
+    return [record(fact, fad) for fact, fad in _attriber.iterFacts(start, end)]
+
+
+def scan(path):
+    """ Returns sorted paths of every iXBRL report below directory path """
+    paths = []
+    for dirpath, _, filenames in os.walk(path):
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.lower().endswith(Extensions))
+
+    return sorted(paths)
+
+
+def manifest(path):
+    """ Returns report paths listed one per line in manifest file path
+
+    Blank lines and lines starting with # are ignored, relative paths are relative to
+    the directory of the manifest.
+
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    paths = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(os.path.join(base, line))
+
+    return paths
+
+
+_cntlr = None  # long lived Arelle controller of a batch worker process
+_merkle = False  # batch attests Merkle roots
+
+
+def _initialize(cacheDir, merkle=False):
+    global _cntlr, _merkle
+    _cntlr = controller(cacheDir=cacheDir)
+    _merkle = merkle
+
+
+def _attest(path):
+    start = time.perf_counter()
+    try:
+        a = attest(_cntlr, path, merkle=_merkle)
+    except Exception as ex:
+        return dict(path=path, error=f"{type(ex).__name__}: {ex}", elapsed=time.perf_counter() - start)
+
+    return dict(path=path, said=a['d'], elapsed=time.perf_counter() - start, a=a)
+
+
+class Batcher:
+    """ Extracts the attestations of many reports with a pool of long lived Arelle workers
+
+    Each worker process creates one Arelle controller when it starts and reuses it, and
+    the taxonomies it has already loaded, for every report it is given.  All workers
+    share one taxonomy web cache directory.  Every report produces one JSON line in the
+    output, either its attestation or the error that stopped it, written as soon as the
+    report is done so a crashed or interrupted batch resumes with the reports that have
+    no successful record yet.
+
+    """
+
+    def __init__(self, paths, out, workers=None, cacheDir=None, merkle=False):
+        """ Create batch
+
+        Parameters:
+            paths (list): paths of reports to extract
+            out (str): JSONL output file, appended to
+            workers (int): number of worker processes, defaults to the number of CPUs
+            cacheDir (str): optional shared Arelle web cache directory
+            merkle (bool): True to attest the Merkle root `mr` of the fact records of each report
+
+        """
+        self.paths = paths
+        self.out = out
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.cacheDir = cacheDir
+        self.merkle = merkle
+
+    def done(self):
+        """ Returns set of report paths with a successful record in the output """
+        done = set()
+        if not os.path.exists(self.out):
+            return done
+
+        with open(self.out, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:  # line cut short by a crash
+                    continue
+
+                if "error" not in record:
+                    done.add(record["path"])
+
+        return done
+
+    def run(self, progress=None):
+        """ Extract every report without a successful record in the output
+
+        Parameters:
+            progress (callable): optional, called with each record as it is written
+
+        Returns:
+            tuple: (extracted, failed, skipped) report counts
+
+        """
+        done = self.done()
+        pending = [path for path in self.paths if path not in done]
+        extracted = failed = 0
+
+        truncated = False
+        if os.path.exists(self.out) and os.path.getsize(self.out) > 0:
+            with open(self.out, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                truncated = f.read(1) != b"\n"
+
+        with open(self.out, "a", encoding="utf-8") as out:
+            if truncated:  # terminate a line cut short by a crash so the next record starts cleanly
+                out.write("\n")
+
+            with multiprocessing.Pool(processes=self.workers, initializer=_initialize,
+                                      initargs=(self.cacheDir, self.merkle)) as pool:
+                for record in pool.imap_unordered(_attest, pending):
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+
+                    if "error" in record:
+                        failed += 1
+                    else:
+                        extracted += 1
+
+                    if progress is not None:
+                        progress(record)
+
+        return extracted, failed, len(self.paths) - len(pending)
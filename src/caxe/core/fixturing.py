@@ -0,0 +1,186 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.fixturing module
+
+Offline load test fixture of reports, attesting credentials and a prebuilt keystore
+
+"""
+import json
+import os
+
+from keri.app import habbing
+from keri.app.signing import serialize
+from keri.core import coring, eventing, scheming
+from keri.help import helping
+from keri.vc import proving
+from keri.vdr import eventing as veventing
+
+from caxe.core import generating, verifying
+
+Manifest = "manifest.json"
+
+
+def schema():
+    """ Returns Schemer of the permissive data attestation schema used by fixture credentials """
+    sad = {
+        "$id": "",
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "title": "Benchmark Data Attestation",
+        "description": "Data attestation of a synthetic benchmark report",
+        "type": "object",
+        "credentialType": "BenchDataAttestation",
+        "version": "1.0.0",
+        "properties": {
+            "v": {"type": "string"},
+            "d": {"type": "string"},
+            "u": {"type": "string"},
+            "i": {"type": "string"},
+            "ri": {"type": "string"},
+            "s": {"type": "string"},
+            "a": {"oneOf": [{"type": "string"}, {"type": "object"}]},
+        },
+        "additionalProperties": True,
+        "required": ["v", "d", "i", "ri", "s", "a"]
+    }
+    _, sad = coring.Saider.saidify(sad=sad, label=coring.Saids.dollar)
+    return scheming.Schemer(sed=sad)
+
+
+class Fixturer:
+    """ Builds a self contained load test fixture directory
+
+    The fixture contains generated reports, one data attestation credential per report
+    issued by a throwaway issuer, and the credential OOBI response of each credential
+    (issuer KEL, registry TEL and credential CESR stream) ready to be served by the
+    stub server.  The caxe keystore is prebuilt with its identifier and the attestation
+    schema so the server verifies fixture credentials without any network access.
+
+    """
+
+    def __init__(self, path, stub="http://127.0.0.1:8724", reports=4, facts=1000, **kwa):
+        """ Create fixture builder
+
+        Parameters:
+            path (str): fixture directory, created if needed
+            stub (str): base URL the stub server is reached at, embedded in report credential links
+            reports (int): number of reports to generate
+            facts (int): number of facts in each report
+            **kwa: additional generating.Generator parameters
+
+        """
+        self.path = path
+        self.stub = stub.rstrip("/")
+        self.reports = reports
+        self.facts = facts
+        self.kwa = kwa
+
+    def build(self, name, alias, base="", bran=None):
+        """ Write fixture and prebuild the caxe keystore
+
+        Parameters:
+            name (str): name of caxe keystore to prebuild, passed to `cake server --name`
+            alias (str): alias of caxe identifier, passed to `cake server --alias`
+            base (str): optional prefix to file location of caxe keystore
+            bran (str): optional passcode of caxe keystore
+
+        Returns:
+            dict: fixture manifest
+
+        """
+        reportsDir = os.path.join(self.path, "reports")
+        oobisDir = os.path.join(self.path, "oobis")
+        os.makedirs(oobisDir, exist_ok=True)
+
+        schemer = schema()
+        with open(os.path.join(oobisDir, f"{schemer.said}.json"), "wb") as f:
+            f.write(schemer.raw)
+
+        hby = habbing.Habery(name="caxe-bench-issuer", temp=True)
+        try:
+            hab = hby.makeHab(name="issuer", transferable=True)
+            regser = veventing.incept(hab.pre, baks=[], toad="0", nonce=coring.randomNonce(),
+                                      cnfg=[veventing.TraitDex.NoBackers], code=coring.MtrDex.Blake3_256)
+            tel = bytearray(self.anchor(hab, regser))
+
+            entries = []
+            creds = []
+            for idx in range(self.reports):
+                report = f"report-{idx}"
+                kwa = dict(self.kwa, facts=self.facts, seed=idx, oobi=self.stub)
+                path = generating.Generator(**kwa).generate(reportsDir, name=report)
+                with open(path, "rb") as f:
+                    digests = verifying.digest(f.read())
+
+                data = dict(dt=helping.nowIso8601(), rd=digests.rd,
+                            f=[dict(i=fid, d=dig) for fid, dig in digests.facts.items()])
+                creder = proving.credential(schema=schemer.said, issuer=hab.pre, data=data, status=regser.pre)
+                iss = veventing.issue(vcdig=creder.said, regk=regser.pre, dt=data["dt"])
+                issMsg = self.anchor(hab, iss)
+                credMsg = serialize(creder, coring.Prefixer(qb64=iss.pre), coring.Seqner(sn=iss.sn),
+                                    coring.Saider(qb64=iss.said))
+                creds.append((creder.said, issMsg, credMsg))
+
+                # credential links are excluded from the report digest so linking the credential keeps rd intact
+                generating.Generator(**kwa, saids=[creder.said]).generate(reportsDir, name=report)
+                entries.append(dict(name=report, path=os.path.relpath(path, self.path), rd=digests.rd,
+                                    credential=creder.said, facts=len(digests.facts)))
+
+            kel = bytearray()
+            for msg in hab.db.clonePreIter(pre=hab.pre):
+                kel.extend(msg)
+
+            for said, issMsg, credMsg in creds:
+                with open(os.path.join(oobisDir, f"{said}.cesr"), "wb") as f:
+                    f.write(kel + tel + issMsg + credMsg)
+
+        finally:
+            hby.close(clear=True)
+
+        self.keystore(name=name, alias=alias, base=base, bran=bran, schemer=schemer)
+
+        manifest = dict(stub=self.stub, schema=schemer.said, keystore=dict(name=name, alias=alias, base=base),
+                        reports=entries)
+        with open(os.path.join(self.path, Manifest), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        return manifest
+
+    @staticmethod
+    def anchor(hab, serder):
+        """ Anchor registry event in issuer KEL
+
+        Parameters:
+            hab (Hab): issuer environment
+            serder (SerderKERI): registry TEL event to anchor
+
+        Returns:
+            bytes: TEL event with its anchoring seal source couple attached
+
+        """
+        seal = eventing.SealEvent(i=serder.pre, s=serder.snh, d=serder.said)
+        hab.interact(data=[seal._asdict()])
+
+        msg = bytearray(serder.raw)
+        msg.extend(coring.Counter(code=coring.CtrDex.SealSourceCouples, count=1).qb64b)
+        msg.extend(coring.Seqner(sn=hab.kever.sn).qb64b)
+        msg.extend(coring.Saider(qb64=hab.kever.serder.said).qb64b)
+        return bytes(msg)
+
+    @staticmethod
+    def keystore(name, alias, base, bran, schemer):
+        """ Prebuild caxe keystore with its identifier and the fixture schema """
+        hby = habbing.Habery(name=name, base=base, bran=bran)
+        try:
+            if hby.habByName(name=alias) is None:
+                hby.makeHab(name=alias, transferable=True)
+
+            hby.db.schema.pin(keys=(schemer.said,), val=schemer)
+        finally:
+            hby.close()
+
+
+def load(path):
+    """ Returns manifest of fixture directory path """
+    with open(os.path.join(path, Manifest), "r", encoding="utf-8") as f:
+        return json.load(f)
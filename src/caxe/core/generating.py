@@ -0,0 +1,303 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.generating module
+
+Synthetic inline XBRL report generator for benchmarking
+
+"""
+import math
+import os
+import random
+from xml.sax.saxutils import escape
+
+import arelle
+import blake3
+
+from caxe.core import verifying
+
+XHTML = "http://www.w3.org/1999/xhtml"
+BENCH_NS = "http://caxe.example.com/bench/2024"
+LEI_SCHEME = "http://standards.iso.org/iso/17442"
+
+XBRL_ORG = "http://www.xbrl.org/"
+# XBRL 2.1 and XDT schemas of Arelle's built in cache copied next to the taxonomy, by path under XBRL_ORG
+STANDARDS = ("2003/xbrl-instance-2003-12-31.xsd", "2003/xbrl-linkbase-2003-12-31.xsd", "2003/xl-2003-12-31.xsd",
+             "2003/xlink-2003-12-31.xsd", "2005/xbrldt-2005.xsd")
+
+WORDS = ("revenue", "assets", "liabilities", "equity", "cash", "income", "expense", "provision",
+         "segment", "goodwill", "lease", "inventory", "receivable", "payable", "tax", "dividend")
+
+
+class Generator:
+    """ Generates valid inline XBRL reports with a small local taxonomy at configurable scale
+
+    The taxonomy schema, label and definition linkbases are written next to the report,
+    with the XBRL 2.1 and dimensions schemas they import, so the report loads in Arelle
+    without network access.
+
+    """
+
+    def __init__(self, facts=1000, dimensions=2, members=4, footnotes=10, languages=("en",), links=1,
+                 oobi="http://127.0.0.1:5642", seed=0, saids=None):
+        """ Create generator
+
+        Parameters:
+            facts (int): number of facts in the report
+            dimensions (int): number of explicit dimensions in the taxonomy
+            members (int): number of domain members of each dimension
+            footnotes (int): number of footnotes, each linked to a run of facts
+            languages (tuple): language codes cycled over text facts, footnotes and labels
+            links (int): number of embedded ACDC credential links
+            oobi (str): base URL of embedded credential OOBI links
+            seed (int): random seed, the same parameters and seed generate the same report
+            saids (list): SAIDs of the credentials linked from the report, overrides links
+
+        """
+        self.facts = facts
+        self.dimensions = dimensions
+        self.members = members
+        self.footnotes = footnotes
+        self.languages = tuple(languages) if languages else ("en",)
+        self.links = len(saids) if saids is not None else links
+        self.saids = saids
+        self.oobi = oobi.rstrip("/")
+        self.rand = random.Random(seed)
+
+        self.contexts = 1 + dimensions * members
+        self.concepts = max(2, math.ceil(facts / self.contexts))
+
+    def generate(self, path, name="report"):
+        """ Write taxonomy and report to directory path
+
+        Parameters:
+            path (str): output directory, created if needed
+            name (str): base file name of the report
+
+        Returns:
+            str: path of the generated report
+
+        """
+        tax = os.path.join(path, "taxonomy")
+        os.makedirs(tax, exist_ok=True)
+
+        standards(tax)
+        with open(os.path.join(tax, "bench.xsd"), "w", encoding="utf-8") as f:
+            f.write(self.schema())
+        with open(os.path.join(tax, "bench-lab.xml"), "w", encoding="utf-8") as f:
+            f.write(self.labels())
+        with open(os.path.join(tax, "bench-def.xml"), "w", encoding="utf-8") as f:
+            f.write(self.definitions())
+
+        report = os.path.join(path, f"{name}.xhtml")
+        with open(report, "w", encoding="utf-8") as f:
+            for chunk in self.report():
+                f.write(chunk)
+
+        return report
+
+    def concept(self, idx):
+        """ Returns (name, numeric) of concept idx, even concepts are monetary, odd are text """
+        return (f"Amount{idx}", True) if idx % 2 == 0 else (f"Text{idx}", False)
+
+    def schema(self):
+        elements = []
+        for idx in range(self.concepts):
+            name, numeric = self.concept(idx)
+            kind = "xbrli:monetaryItemType" if numeric else "xbrli:stringItemType"
+            elements.append(f'  <xs:element id="bench_{name}" name="{name}" type="{kind}" '
+                            f'substitutionGroup="xbrli:item" xbrli:periodType="duration" nillable="true"/>')
+
+        abstracts = ["LineItems", "Table"] + [f"Axis{d}" for d in range(self.dimensions)] + \
+                    [f"Domain{d}" for d in range(self.dimensions)] + \
+                    [f"Member{d}_{m}" for d in range(self.dimensions) for m in range(self.members)]
+        for name in abstracts:
+            if name == "Table":
+                group = "xbrldt:hypercubeItem"
+            elif name.startswith("Axis"):
+                group = "xbrldt:dimensionItem"
+            else:
+                group = "xbrli:item"
+            elements.append(f'  <xs:element id="bench_{name}" name="{name}" type="xbrli:stringItemType" '
+                            f'substitutionGroup="{group}" abstract="true" xbrli:periodType="duration" nillable="true"/>')
+
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" xmlns:xbrli="http://www.xbrl.org/2003/instance"
+  xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink"
+  xmlns:xbrldt="http://xbrl.org/2005/xbrldt" xmlns:bench="{BENCH_NS}"
+  targetNamespace="{BENCH_NS}" elementFormDefault="qualified">
+  <xs:annotation>
+    <xs:appinfo>
+      <link:linkbaseRef xlink:type="simple" xlink:href="bench-lab.xml" xlink:role="http://www.xbrl.org/2003/role/labelLinkbaseRef" xlink:arcrole="http://www.w3.org/1999/xlink/properties/linkbase"/>
+      <link:linkbaseRef xlink:type="simple" xlink:href="bench-def.xml" xlink:role="http://www.xbrl.org/2003/role/definitionLinkbaseRef" xlink:arcrole="http://www.w3.org/1999/xlink/properties/linkbase"/>
+    </xs:appinfo>
+  </xs:annotation>
+  <xs:import namespace="http://www.xbrl.org/2003/instance" schemaLocation="xbrl-instance-2003-12-31.xsd"/>
+  <xs:import namespace="http://xbrl.org/2005/xbrldt" schemaLocation="xbrldt-2005.xsd"/>
+{chr(10).join(elements)}
+</xs:schema>
+"""
+
+    def labels(self):
+        locs, labels, arcs = [], [], []
+        names = [self.concept(idx)[0] for idx in range(self.concepts)]
+        for name in names:
+            locs.append(f'    <link:loc xlink:type="locator" xlink:href="bench.xsd#bench_{name}" xlink:label="loc_{name}"/>')
+            for lang in self.languages:
+                text = f"{name} ({lang})"
+                labels.append(f'    <link:label xlink:type="resource" xlink:label="lab_{name}" '
+                              f'xlink:role="http://www.xbrl.org/2003/role/label" xml:lang="{lang}">{text}</link:label>')
+            arcs.append(f'    <link:labelArc xlink:type="arc" xlink:arcrole="http://www.xbrl.org/2003/arcrole/concept-label" '
+                        f'xlink:from="loc_{name}" xlink:to="lab_{name}"/>')
+
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink">
+  <link:labelLink xlink:type="extended" xlink:role="http://www.xbrl.org/2003/role/link">
+{chr(10).join(locs + labels + arcs)}
+  </link:labelLink>
+</link:linkbase>
+"""
+
+    def definitions(self):
+        def loc(name, prefix="loc"):
+            return f'    <link:loc xlink:type="locator" xlink:href="bench.xsd#bench_{name}" xlink:label="{prefix}_{name}"/>'
+
+        def arc(role, frm, to, extra="", prefix="loc"):
+            return (f'    <link:definitionArc xlink:type="arc" xlink:arcrole="{role}" '
+                    f'xlink:from="loc_{frm}" xlink:to="{prefix}_{to}"{extra}/>')
+
+        dm = "http://xbrl.org/int/dim/arcrole/domain-member"
+        names = [self.concept(idx)[0] for idx in range(self.concepts)]
+        lines = [loc("LineItems"), loc("Table")] + [loc(name) for name in names]
+        lines.append(arc("http://xbrl.org/int/dim/arcrole/all", "LineItems", "Table",
+                         ' xbrldt:contextElement="segment" xbrldt:closed="false"'))
+        lines.extend(arc(dm, "LineItems", name) for name in names)
+
+        for d in range(self.dimensions):
+            # the default arc needs its own locator, arcs between the same locators are duplicates
+            lines.extend([loc(f"Axis{d}"), loc(f"Domain{d}"), loc(f"Domain{d}", prefix="default")])
+            lines.append(arc("http://xbrl.org/int/dim/arcrole/hypercube-dimension", "Table", f"Axis{d}"))
+            lines.append(arc("http://xbrl.org/int/dim/arcrole/dimension-domain", f"Axis{d}", f"Domain{d}"))
+            lines.append(arc("http://xbrl.org/int/dim/arcrole/dimension-default", f"Axis{d}", f"Domain{d}",
+                             prefix="default"))
+            for m in range(self.members):
+                lines.append(loc(f"Member{d}_{m}"))
+                lines.append(arc(dm, f"Domain{d}", f"Member{d}_{m}"))
+
+        arcroleRefs = [f'  <link:arcroleRef arcroleURI="http://xbrl.org/int/dim/arcrole/{role}" xlink:type="simple" '
+                       f'xlink:href="xbrldt-2005.xsd#{role}"/>'
+                       for role in ("all", "domain-member", "hypercube-dimension", "dimension-domain",
+                                    "dimension-default")]
+
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<link:linkbase xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink"
+  xmlns:xbrldt="http://xbrl.org/2005/xbrldt">
+{chr(10).join(arcroleRefs)}
+  <link:definitionLink xlink:type="extended" xlink:role="http://www.xbrl.org/2003/role/link">
+{chr(10).join(lines)}
+  </link:definitionLink>
+</link:linkbase>
+"""
+
+    def contextRefs(self):
+        refs = ["c"]
+        refs.extend(f"c{d}_{m}" for d in range(self.dimensions) for m in range(self.members))
+        return refs
+
+    def resources(self):
+        lei = "5493001KJTIIGC8Y1R12"
+        for ref in self.contextRefs():
+            segment = ""
+            if ref != "c":
+                d, m = ref[1:].split("_")
+                segment = (f'<xbrli:segment><xbrldi:explicitMember dimension="bench:Axis{d}">'
+                           f'bench:Member{d}_{m}</xbrldi:explicitMember></xbrli:segment>')
+            yield (f'<xbrli:context id="{ref}"><xbrli:entity>'
+                   f'<xbrli:identifier scheme="{LEI_SCHEME}">{lei}</xbrli:identifier>{segment}</xbrli:entity>'
+                   f'<xbrli:period><xbrli:startDate>2023-01-01</xbrli:startDate>'
+                   f'<xbrli:endDate>2023-12-31</xbrli:endDate></xbrli:period></xbrli:context>\n')
+
+        yield '<xbrli:unit id="EUR"><xbrli:measure>iso4217:EUR</xbrli:measure></xbrli:unit>\n'
+
+        per = max(1, self.facts // max(1, self.footnotes))
+        for fn in range(min(self.footnotes, self.facts)):
+            refs = " ".join(f"f{idx}" for idx in range(fn * per, min(self.facts, fn * per + 3)))
+            yield f'<ix:relationship fromRefs="{refs}" toRefs="fn{fn}"/>\n'
+
+    def fact(self, idx, refs):
+        concept = idx // len(refs)
+        ref = refs[idx % len(refs)]
+        name, numeric = self.concept(concept)
+        if numeric:
+            value = self.rand.randint(0, 10 ** 9)
+            sign = ' sign="-"' if self.rand.random() < 0.1 else ""
+            return (f'<tr><td>{name}</td><td><ix:nonFraction id="f{idx}" name="bench:{name}" contextRef="{ref}" '
+                    f'unitRef="EUR" decimals="0" scale="0" format="ixt:num-dot-decimal"{sign}>{value:,}'
+                    f'</ix:nonFraction></td></tr>\n')
+
+        lang = self.languages[idx % len(self.languages)]
+        text = " ".join(self.rand.choice(WORDS) for _ in range(self.rand.randint(3, 12)))
+        return (f'<tr><td>{name}</td><td><ix:nonNumeric id="f{idx}" name="bench:{name}" contextRef="{ref}" '
+                f'xml:lang="{lang}">{escape(text)}</ix:nonNumeric></td></tr>\n')
+
+    def report(self):
+        """ Generate report XHTML in chunks """
+        yield f"""<?xml version="1.0" encoding="UTF-8"?>
+<html xmlns="{XHTML}" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"
+  xmlns:ixt="http://www.xbrl.org/inlineXBRL/transformation/2020-02-12"
+  xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:link="http://www.xbrl.org/2003/linkbase"
+  xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:xbrldi="http://xbrl.org/2006/xbrldi"
+  xmlns:iso4217="http://www.xbrl.org/2003/iso4217" xmlns:bench="{BENCH_NS}" xml:lang="{self.languages[0]}">
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=utf-8"/>
+<title>CAXE benchmark report</title>
+"""
+        for idx in range(self.links):
+            if self.saids is not None:
+                said = self.saids[idx]
+            else:
+                said = verifying.encode(blake3.blake3(f"caxe-bench-link-{idx}".encode("utf-8")).digest())
+            yield f'<link rel="prefetch author" type="application/json+acdc" href="{self.oobi}/oobi/{said}"/>\n'
+
+        yield """</head>
+<body>
+<div style="display:none">
+<ix:header>
+<ix:references><link:schemaRef xlink:type="simple" xlink:href="taxonomy/bench.xsd"/></ix:references>
+<ix:resources>
+"""
+        yield from self.resources()
+        yield """</ix:resources>
+</ix:header>
+</div>
+<table>
+"""
+        refs = self.contextRefs()
+        for idx in range(self.facts):
+            yield self.fact(idx, refs)
+
+        yield "</table>\n"
+        for fn in range(min(self.footnotes, self.facts)):
+            lang = self.languages[fn % len(self.languages)]
+            yield f'<p><ix:footnote id="fn{fn}" xml:lang="{lang}">Footnote {fn} {self.rand.choice(WORDS)}</ix:footnote></p>\n'
+
+        yield "</body>\n</html>\n"
+
+
+def standards(path):
+    """ Copy the XBRL 2.1 and dimensions schemas from Arelle's built in cache into directory path
+
+    Their imports of each other are made relative so every schema of the taxonomy loads
+    from path.
+
+    """
+    cache = os.path.join(os.path.dirname(arelle.__file__), "resources", "cache", "http", "www.xbrl.org")
+    for name in STANDARDS:
+        with open(os.path.join(cache, *name.split("/")), "r", encoding="utf-8") as f:
+            schema = f.read()
+
+        for other in STANDARDS:
+            schema = schema.replace(f'"{XBRL_ORG}{other}"', f'"{os.path.basename(other)}"')
+
+        with open(os.path.join(path, os.path.basename(name)), "w", encoding="utf-8") as f:
+            f.write(schema)
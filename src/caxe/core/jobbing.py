@@ -0,0 +1,140 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.jobbing module
+
+LMDB store of report verification jobs
+
+"""
+import zlib
+from dataclasses import dataclass
+
+from keri.db import dbing, koming
+from keri.help import helping
+
+Pending = "pending"
+Complete = "complete"
+Failed = "failed"
+
+
+@dataclass
+class JobRecord:  # jobber.jobs
+    """
+    Verification job state keyed by job id (jobber.jobs)
+
+    Attributes:
+        status (str): pending, complete or failed
+        dt (str): ISO8601 datetime the job was created
+        url (str | None): URL of the report page, None for an uploaded report held in jobber.reps
+        said (str | None): SAID of the verified report
+        results (dict | None): ViRA attributes keyed by credential SAID of a complete job
+        msg (str | None): reason a failed job failed
+        done (str | None): ISO8601 datetime the job finished, its retention period starts then
+
+    """
+    status: str = Pending
+    dt: str = ""
+    url: str | None = None
+    said: str | None = None
+    results: dict | None = None
+    msg: str | None = None
+    done: str | None = None
+
+
+class Jobber(dbing.LMDBer):
+    """ Report verification jobs kept next to the keystore databases
+
+    Jobs outlive the request that created them and the process running them, the
+    results of finished jobs are kept until pruned and pending jobs are resumed when
+    the service restarts.
+
+    Named sub databases:
+        jobs.   JobRecord of each job keyed by job id
+        reps.   zlib compressed uploaded report of each pending job keyed by job id,
+                removed when the job finishes
+
+    """
+
+    TailDirPath = "keri/jobs"
+    AltTailDirPath = ".keri/jobs"
+    TempPrefix = "caxe_jobs_"
+    MapSize = 1 << 32  # LMDBer opens with 100MB, too small for a queue of uploaded reports
+
+    def __init__(self, headDirPath=None, perm=None, reopen=False, **kwa):
+        self.jobs = None
+        self.reps = None
+
+        super(Jobber, self).__init__(headDirPath=headDirPath, perm=perm, reopen=reopen, **kwa)
+
+    def reopen(self, **kwa):
+        """ Open sub databases """
+        opened = super(Jobber, self).reopen(**kwa)
+        if not self.readonly:
+            self.env.set_mapsize(self.MapSize)
+
+        self.jobs = koming.Komer(db=self, subkey='jobs.', schema=JobRecord)
+        self.reps = self.env.open_db(key=b'reps.')
+
+        return opened
+
+    def create(self, jid, url=None, data=None):
+        """ Store new pending job jid, an existing job is left as is
+
+        Parameters:
+            jid (str): job id
+            url (str): URL of the report page to verify
+            data (bytes): uploaded report to verify
+
+        """
+        if self.jobs.put(jid, JobRecord(dt=helping.nowIso8601(), url=url)) and data is not None:
+            self.setVal(self.reps, jid.encode("utf-8"), zlib.compress(data, 1))
+
+    def get(self, jid):
+        """ Returns JobRecord of job jid or None """
+        return self.jobs.get(jid)
+
+    def report(self, jid):
+        """ Returns uploaded report of pending job jid or None """
+        data = self.getVal(self.reps, jid.encode("utf-8"))
+        return zlib.decompress(data) if data is not None else None
+
+    def finish(self, jid, said=None, results=None, msg=None):
+        """ Complete job jid with results or fail it with msg, dropping its uploaded report
+
+        Parameters:
+            jid (str): job id
+            said (str): SAID of the report
+            results (dict): verification results keyed by credential SAID
+            msg (str): reason for failure when results is None
+
+        """
+        if (rec := self.jobs.get(jid)) is None:
+            return
+
+        rec.status = Complete if results is not None else Failed
+        rec.said = said
+        rec.results = results
+        rec.msg = msg
+        rec.done = helping.nowIso8601()
+        self.jobs.pin(jid, rec)
+        self.delVal(self.reps, jid.encode("utf-8"))
+
+    def pending(self):
+        """ Returns list of (jid, JobRecord) of every unfinished job, oldest first """
+        jobs = [(keys[0], rec) for keys, rec in self.jobs.getItemIter() if rec.status == Pending]
+        return sorted(jobs, key=lambda item: item[1].dt)
+
+    def prune(self, ttl):
+        """ Remove jobs finished more than ttl seconds ago
+
+        Returns:
+            int: number of jobs removed
+
+        """
+        now = helping.nowUTC()
+        expired = [keys[0] for keys, rec in self.jobs.getItemIter()
+                   if rec.done is not None and (now - helping.fromIso8601(rec.done)).total_seconds() > ttl]
+        for jid in expired:
+            self.jobs.rem(jid)
+
+        return len(expired)
@@ -0,0 +1,207 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.loading module
+
+Concurrent load generator for the verify and saidify endpoints
+
+"""
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from keri.help import helping
+
+import caxe
+from caxe.core import fixturing
+
+MODES = ("get", "post", "saidify")
+Close = {"Connection": "close"}  # headers of every request, each is sent on its own connection
+
+
+def percentile(values, pct):
+    """ Returns nearest rank percentile pct (0-100) of sorted values, None if values is empty """
+    if not values:
+        return None
+
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class Loader:
+    """ Drives concurrent requests at a caxe server using the reports of a load test fixture
+
+    Requests cycle through the configured modes and the fixture reports.  Each of
+    .concurrency threads sends its next request as soon as the previous one completes,
+    until .requests have been sent or .duration seconds have passed.
+
+        get      GET /verify?url= with the stub URL of a report
+        post     POST /verify with the report uploaded in the body
+        saidify  POST /report/saidify with the stub URL of a report and some of its fact ids
+
+    """
+
+    def __init__(self, url, fixture, modes=MODES, concurrency=8, requests=100, duration=None, timeout=30.0,
+                 facts=10):
+        """ Create load generator
+
+        Parameters:
+            url (str): base URL of caxe server
+            fixture (str): load test fixture directory
+            modes (tuple): request modes to cycle through, a subset of MODES
+            concurrency (int): number of concurrent clients
+            requests (int): total number of requests to send, ignored when duration is set
+            duration (float): seconds to keep sending requests
+            timeout (float): seconds to wait for each response
+            facts (int): number of fact ids sent with each saidify request
+
+        """
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise ValueError(f"unknown load test modes {', '.join(sorted(unknown))}")
+
+        self.url = url.rstrip("/")
+        self.path = fixture
+        self.manifest = fixturing.load(fixture)
+        self.modes = modes
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.timeout = timeout
+        self.facts = facts
+
+        self.reports = []
+        for entry in self.manifest["reports"]:
+            with open(os.path.join(fixture, entry["path"]), "rb") as f:
+                self.reports.append((entry, f.read()))
+
+        self.work = itertools.cycle([(mode, report) for report in self.reports for mode in modes])
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.samples = {mode: [] for mode in modes}
+
+    def next(self, deadline):
+        """ Returns next (mode, report) to send or None when the run is over """
+        with self.lock:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return None
+            elif self.sent >= self.requests:
+                return None
+
+            self.sent += 1
+            return next(self.work)
+
+    def send(self, mode, report):
+        """ Send one request on a new connection
+
+        The hio server ends streamed responses on reused connections only by closing them,
+        a session would send the next request on a connection the server has closed.
+
+        Returns:
+            str: None if the request succeeded, otherwise the reason it failed
+
+        """
+        entry, data = report
+        reportUrl = f"{self.manifest['stub']}/{entry['path']}"
+        if mode == "get":
+            rep = requests.get(f"{self.url}/verify", params=dict(url=reportUrl), timeout=self.timeout,
+                               headers=Close)
+        elif mode == "post":
+            rep = requests.post(f"{self.url}/verify", data=data, timeout=self.timeout,
+                                headers=dict(Close, **{"Content-Type": "application/xhtml+xml"}))
+        else:
+            factIds = [f"f{idx}" for idx in range(min(self.facts, entry["facts"]))]
+            rep = requests.post(f"{self.url}/report/saidify", json=dict(report_url=reportUrl, fact_ids=factIds),
+                                timeout=self.timeout, headers=Close)
+
+        if rep.status_code != 200:
+            return f"HTTP {rep.status_code}"
+
+        if not rep.content:
+            return "empty response"
+
+        body = rep.json()
+        if mode == "saidify":
+            return None if body.get("rd") == entry["rd"] else "report digest mismatch"
+
+        if "msg" in body:
+            return body["msg"]
+
+        return None if entry["credential"] in body else "credential missing from results"
+
+    def client(self, deadline):
+        while (work := self.next(deadline)) is not None:
+            mode, report = work
+            start = time.perf_counter()
+            try:
+                error = self.send(mode, report)
+            except (requests.RequestException, ValueError) as ex:
+                error = type(ex).__name__
+
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.samples[mode].append((elapsed, error))
+
+    def run(self):
+        """ Run load test and return results
+
+        Returns:
+            dict: run metadata under `meta` and throughput, error counts and latency
+                  percentiles in seconds of each mode under `modes`
+
+        """
+        start = time.perf_counter()
+        deadline = start + self.duration if self.duration is not None else None
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for future in [pool.submit(self.client, deadline) for _ in range(self.concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        modes = dict()
+        for mode, samples in self.samples.items():
+            latencies = sorted(sample[0] for sample in samples)
+            errors = dict()
+            for _, error in samples:
+                if error is not None:
+                    errors[error] = errors.get(error, 0) + 1
+
+            modes[mode] = dict(
+                requests=len(samples),
+                ok=len(samples) - sum(errors.values()),
+                errors=errors,
+                throughput=len(samples) / elapsed if elapsed else 0.0,
+                p50=percentile(latencies, 50),
+                p95=percentile(latencies, 95),
+                p99=percentile(latencies, 99),
+                max=latencies[-1] if latencies else None,
+            )
+
+        return dict(
+            meta=dict(
+                version=caxe.__version__,
+                python=sys.version.split()[0],
+                platform=platform.platform(),
+                url=self.url,
+                reports=len(self.reports),
+                concurrency=self.concurrency,
+                elapsed=elapsed,
+                throughput=sum(mode["requests"] for mode in modes.values()) / elapsed if elapsed else 0.0,
+                dt=helping.nowIso8601(),
+            ),
+            modes=modes
+        )
+
+
+def save(results, path):
+    """ Write load test results as JSON to path """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
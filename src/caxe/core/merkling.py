@@ -0,0 +1,177 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.merkling module
+
+Blake3 Merkle trees over the ordered facts of an attestation with per-fact inclusion proofs
+
+"""
+import base64
+
+import blake3
+
+from keri.core import coring
+
+from caxe.core import saiding, verifying
+
+Leaf = b"\x00"  # domain separation prefix of leaf hashes
+Node = b"\x01"  # domain separation prefix of interior node hashes
+Root = b"\x02"  # domain separation prefix of the root hash, binding the leaf count
+
+
+def leaf(fact):
+    """ Returns raw leaf hash of attested fact record fact """
+    return blake3.blake3(Leaf + saiding.dumps(fact)).digest()
+
+
+def node(left, right):
+    """ Returns raw hash of the interior node with raw child hashes left and right """
+    return blake3.blake3(Node + left + right).digest()
+
+
+def seal(count, top):
+    """ Returns raw root hash of a tree of count leaves with raw top node hash top """
+    return blake3.blake3(Root + count.to_bytes(8, "big") + top).digest()
+
+
+def decode(qb64):
+    """ Returns raw 32 byte digest of qb64 Blake3-256 digest, the inverse of verifying.encode """
+    if not qb64.startswith(coring.MtrDex.Blake3_256) or len(qb64) != 44:
+        raise ValueError(f"invalid Blake3-256 digest {qb64}")
+
+    return base64.urlsafe_b64decode("A" + qb64[1:])[1:]
+
+
+class Merkler:
+    """ Merkle tree over the ordered fact records of an attestation
+
+    Leaves are the blake3 hashes of the compact JSON fact records, in attestation
+    order, and interior nodes hash their two children, each prefixed with its own
+    domain separation byte so a leaf can never be passed off as a node.  A node
+    without a sibling at the end of a level is promoted to the next level unchanged.
+    The root hashes the leaf count with the top node, so a proof cannot claim another
+    count, and the count fixes the shape of the tree so the order of the siblings on
+    a path fixes the index of the leaf.  The root is attested as the `mr` field and an
+    inclusion proof of one fact needs only the log2(n) sibling hashes on its path to
+    the root.
+
+    """
+
+    def __init__(self, facts=None):
+        """ Create Merkle tree
+
+        Parameters:
+            facts (iterable): optional fact records to add
+
+        """
+        self.leaves = []
+        self.levels = None
+        for fact in facts if facts is not None else []:
+            self.add(fact)
+
+    def add(self, fact):
+        """ Add leaf of fact record fact and return it, facts may be added as they are produced """
+        self.leaves.append(leaf(fact))
+        self.levels = None
+        return fact
+
+    def build(self):
+        """ Returns every level of the tree from the leaves up to the root """
+        if self.levels is None:
+            levels = [self.leaves]
+            while len(levels[-1]) > 1:
+                level = levels[-1]
+                levels.append([node(level[idx], level[idx + 1]) if idx + 1 < len(level) else level[idx]
+                               for idx in range(0, len(level), 2)])
+            self.levels = levels
+
+        return self.levels
+
+    @property
+    def root(self):
+        """ qb64 root digest of the tree, the digest of an empty leaf for an empty tree """
+        if not self.leaves:
+            return verifying.encode(seal(0, blake3.blake3(Leaf).digest()))
+
+        return verifying.encode(seal(len(self.leaves), self.build()[-1][0]))
+
+    def proof(self, index, fact):
+        """ Returns inclusion proof of the fact record at index
+
+        Parameters:
+            index (int): position of the fact in the attestation
+            fact (dict): attested fact record at index
+
+        Returns:
+            dict: proof with the tree root `mr`, fact id `i`, fact index `x`, leaf count `n`,
+                  the fact record `f` and the qb64 sibling hashes `p` from the leaf up
+
+        """
+        if not 0 <= index < len(self.leaves) or leaf(fact) != self.leaves[index]:
+            raise ValueError(f"fact {fact.get('i')} is not leaf {index} of the tree")
+
+        path = []
+        idx = index
+        for level in self.build()[:-1]:
+            if idx % 2:
+                path.append(verifying.encode(level[idx - 1]))
+            elif idx + 1 < len(level):
+                path.append(verifying.encode(level[idx + 1]))
+            idx //= 2
+
+        return dict(mr=self.root, i=fact["i"], x=index, n=len(self.leaves), f=fact, p=path)
+
+
+def prove(facts, fid):
+    """ Returns inclusion proof of fact id fid in the ordered fact records facts, or their blocks
+
+    Raises:
+        ValueError: if no fact has id fid or facts are blocks that cannot be expanded
+
+    """
+    facts = saiding.expand(facts)
+    merkler = Merkler(facts)
+    for index, fact in enumerate(facts):
+        if isinstance(fact, dict) and fact.get("i") == fid:
+            return merkler.proof(index, fact)
+
+    raise ValueError(f"no fact {fid} in attestation")
+
+
+def verify(proof, mr=None):
+    """ Check inclusion proof without the rest of the report
+
+    Parameters:
+        proof (dict): inclusion proof returned by Merkler.proof
+        mr (str): optional trusted qb64 root, such as the `mr` of a verified attestation
+                  credential, the root in the proof must equal it
+
+    Returns:
+        bool: True if the fact record in the proof is the leaf at its index of a tree with
+              the proof's root
+
+    """
+    try:
+        fact, index, count, path = proof["f"], proof["x"], proof["n"], proof["p"]
+        if fact.get("i") != proof["i"] or not 0 <= index < count:
+            return False
+
+        digest = leaf(fact)
+        siblings = iter(decode(sibling) for sibling in path)
+        idx, width = index, count
+        while width > 1:
+            if idx % 2:
+                digest = node(next(siblings), digest)
+            elif idx + 1 < width:
+                digest = node(digest, next(siblings))
+            idx //= 2
+            width = (width + 1) // 2
+
+        if next(siblings, None) is not None:
+            return False
+
+        root = verifying.encode(seal(count, digest))
+    except (KeyError, TypeError, ValueError, StopIteration, AttributeError, OverflowError):
+        return False
+
+    return root == proof.get("mr") and (mr is None or root == mr)
@@ -0,0 +1,269 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.metering module
+
+Prometheus text format metrics for the report pipelines
+
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import falcon
+from keri import help
+
+logger = help.ogler.getLogger()
+
+STAGES = dict(
+    fetch="report fetch",
+    parse="HTML parse",
+    canonicalize="canonicalize and hash",
+    load="Arelle load",
+    viewer="createViewer",
+    digest="per-fact digest",
+    saidify="saidify",
+    oobi="credential OOBI fetch",
+    cesr="CESR parse",
+    resolve="credential chain resolve",
+    warm="configured credential OOBI warm",
+)
+
+
+class Histogram:
+    """ Cumulative latency histogram in seconds """
+
+    Buckets = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets=None):
+        self.buckets = buckets if buckets is not None else self.Buckets
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def state(self):
+        """ Returns JSON serializable bucket bounds, non cumulative bucket counts, sum and count """
+        with self.lock:
+            return dict(buckets=list(self.buckets), counts=list(self.counts), sum=self.sum, count=self.count)
+
+
+class Meter:
+    """ Registry of pipeline stage histograms, deck depth gauges and counters
+
+    A single process wide instance, .meter, is shared by every module that
+    measures a pipeline stage.
+
+    """
+
+    def __init__(self):
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.counters = dict(fetched_bytes=0, results_served=0)
+        self.depths = dict()
+        self.lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """ Record latency of one execution of pipeline stage
+
+        Parameters:
+            stage (str): pipeline stage, one of STAGES
+            seconds (float): elapsed time
+
+        """
+        self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def timed(self, stage):
+        """ Context manager recording the latency of the enclosed block as pipeline stage """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[stage].observe(time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        """ Increment counter
+
+        Parameters:
+            name (str): counter name without the caxe_ prefix and _total suffix
+            n (int): amount to add
+
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def depth(self, deck, fn):
+        """ Register gauge callable returning the current depth of a deck
+
+        Parameters:
+            deck (str): deck name
+            fn (callable): returns current depth when called
+
+        """
+        self.depths[deck] = fn
+
+    def state(self):
+        """ Returns JSON serializable state of every metric, gauges read at the time of the call """
+        with self.lock:
+            counters = dict(self.counters)
+
+        return dict(stages={stage: hist.state() for stage, hist in self.stages.items()},
+                    counters=counters,
+                    depths={deck: fn() for deck, fn in self.depths.items()})
+
+    @staticmethod
+    def add(state, other):
+        """ Add meter state other, from .state(), into meter state in place """
+        for stage, hist in other.get("stages", {}).items():
+            mine = state["stages"].setdefault(stage, dict(buckets=hist["buckets"], counts=[0] * len(hist["counts"]),
+                                                            sum=0.0, count=0))
+            mine["counts"] = [a + b for a, b in zip(mine["counts"], hist["counts"])]
+            mine["sum"] += hist["sum"]
+            mine["count"] += hist["count"]
+        for name, value in other.get("counters", {}).items():
+            state["counters"][name] = state["counters"].get(name, 0) + value
+        for deck, value in other.get("depths", {}).items():
+            state["depths"][deck] = state["depths"].get(deck, 0) + value
+
+    def render(self, states=()):
+        """ Returns all metrics in Prometheus text exposition format
+
+        Parameters:
+            states (iterable): states of the meters of other processes, from .state(), added to this meter's
+
+        """
+        state = self.state()
+        for other in states:
+            self.add(state, other)
+
+        lines = ["# HELP caxe_stage_seconds Latency of report pipeline stages",
+                 "# TYPE caxe_stage_seconds histogram"]
+
+        for stage, hist in state["stages"].items():
+            cumulative = 0
+            for le, count in zip(hist["buckets"], hist["counts"]):
+                cumulative += count
+                lines.append(f'caxe_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'caxe_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'caxe_stage_seconds_sum{{stage="{stage}"}} {hist["sum"]}')
+            lines.append(f'caxe_stage_seconds_count{{stage="{stage}"}} {hist["count"]}')
+
+        lines.extend(["# HELP caxe_deck_depth Number of reports waiting in each verification deck",
+                      "# TYPE caxe_deck_depth gauge"])
+        for deck, value in state["depths"].items():
+            lines.append(f'caxe_deck_depth{{deck="{deck}"}} {value}')
+
+        for name, value in sorted(state["counters"].items()):
+            lines.append(f"# TYPE caxe_{name}_total counter")
+            lines.append(f"caxe_{name}_total {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+meter = Meter()
+
+
+class Sharer:
+    """ Exchange of meter states between the processes serving one port
+
+    Every process publishes the state of its meter to its own file of a directory shared
+    by the processes and renders its metrics summed with the states published by the
+    others, so a scrape of any one process reports the totals of all of them.  A process
+    restarted under the same name carries the counters and histograms its predecessor
+    published forward, keeping the totals monotonic.
+
+    """
+
+    Every = 1.0  # seconds between publications of the meter state
+
+    def __init__(self, path, name):
+        """ Create meter state exchange
+
+        Parameters:
+            path (str): directory shared by the processes
+            name (str): name of this process, unique among the processes
+
+        """
+        self.path = path
+        self.name = name
+        self.base = self.read(self.filename(name))
+        if self.base is not None:
+            self.base["depths"] = dict()  # gauges of the previous process are gone with it
+
+    def filename(self, name):
+        return os.path.join(self.path, f"{name}.json")
+
+    @staticmethod
+    def read(filename):
+        """ Returns state published to filename, None if missing or unreadable """
+        try:
+            with open(filename) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def publish(self):
+        """ Write the state of the meter, including the predecessor's, atomically to this process's file """
+        state = meter.state()
+        if self.base is not None:
+            Meter.add(state, self.base)
+
+        temp = self.filename(f".{self.name}")
+        with open(temp, "w") as f:
+            json.dump(state, f)
+        os.replace(temp, self.filename(self.name))
+
+    def states(self):
+        """ Returns states published by the other processes and the predecessor's state of this process """
+        states = [self.base] if self.base is not None else []
+        for entry in sorted(os.listdir(self.path)):
+            if not entry.endswith(".json") or entry.startswith(".") or entry == f"{self.name}.json":
+                continue
+            state = self.read(os.path.join(self.path, entry))
+            if state is not None:
+                states.append(state)
+
+        return states
+
+    def run(self):
+        """ Publish the meter state every .Every seconds, run in a daemon thread """
+        while True:
+            try:
+                self.publish()
+            except OSError as ex:
+                logger.error("Sharer: failed to publish metrics to %s: %s", self.path, ex)
+            time.sleep(self.Every)
+
+
+class MetricsEnd:
+    """ Resource exposing process metrics for Prometheus scraping """
+
+    def __init__(self, sharer=None):
+        """ Create metrics resource
+
+        Parameters:
+            sharer (Sharer): optional exchange of the meter states of the processes serving one port
+
+        """
+        self.sharer = sharer
+
+    def on_get(self, req, rep):
+        """ Metrics GET endpoint
+
+        Parameters:
+            req: falcon.Request HTTP request
+            rep: falcon.Response HTTP response
+
+        """
+        rep.status = falcon.HTTP_200
+        rep.content_type = "text/plain; version=0.0.4"
+        rep.text = meter.render(self.sharer.states() if self.sharer is not None else ())
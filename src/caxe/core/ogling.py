@@ -0,0 +1,113 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.ogling module
+
+Asynchronous, sampled handling of the log records of keri's ogler logger
+
+"""
+import atexit
+import logging
+import os
+import queue
+from logging import handlers
+
+import hio
+from keri.help import ogler
+
+Levels = ("CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG")
+
+Sampled = dict(sampled=True)  # extra of high volume records, logged once every Sampler.every records
+
+Muted = (os.path.dirname(hio.__file__),)  # packages whose records below WARNING are dropped, hio logs request bodies
+
+
+class Queuer(handlers.QueueHandler):
+    """ Queue handler passing records to the listener thread unformatted
+
+    QueueHandler formats each record before queueing it, in the thread that logged it.
+    Records stay in this process, so the message is left for the listener thread to
+    format and logging a large argument costs the caller nothing more than a reference.
+    Arguments must not be mutated once logged.
+
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class Sampler(logging.Filter):
+    """ Passes only one of every .every records logged with extra=Sampled from the same line
+
+    Records at WARNING or above always pass.
+
+    """
+
+    def __init__(self, every=100):
+        """ Create sampling filter
+
+        Parameters:
+            every (int): records of each sampled call site per record passed, 1 passes all
+
+        """
+        super(Sampler, self).__init__()
+        self.every = max(1, every)
+        self.counts = dict()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not getattr(record, "sampled", False):
+            return True
+
+        site = (record.pathname, record.lineno)
+        count = self.counts.get(site, 0)
+        self.counts[site] = count + 1
+        return count % self.every == 0
+
+
+class Muter(logging.Filter):
+    """ Drops records below WARNING logged by the modules of the Muted packages
+
+    hio's HTTP server logs every request, with its body, at INFO through the ogler's logger.
+
+    """
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or not record.pathname.startswith(Muted)
+
+
+def start(level=None, every=100):
+    """ Move the handlers of keri's ogler behind a queue drained by a background listener thread
+
+    Every caxe and keri module logs through the logger returned by ogler.getLogger(),
+    which sets the ogler's console, syslog and file handlers on it each time it is
+    called.  The handlers are replaced on the ogler itself so modules imported later
+    log through the queue too.  The listener is stopped, flushing the queue, at exit.
+
+    Parameters:
+        level (str | int): logging level name or number of the ogler, unchanged if None
+        every (int): sampling of records logged with extra=Sampled
+
+    Returns:
+        QueueListener: listener writing queued records to the ogler's original handlers
+
+    """
+    if level is not None:
+        ogler.level = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+
+    targets = []
+    queuer = Queuer(queue.SimpleQueue())
+    queuer.addFilter(Muter())
+    queuer.addFilter(Sampler(every=every))
+    used = dict(baseConsoleHandler=ogler.consoled, baseSysLogHandler=ogler.syslogged,
+                baseFileHandler=ogler.filed and ogler.opened)
+    for name, enabled in used.items():
+        if enabled and not isinstance(handler := getattr(ogler, name), Queuer):
+            targets.append(handler)
+            setattr(ogler, name, queuer)
+
+    listener = handlers.QueueListener(queuer.queue, *targets, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    ogler.getLogger()  # replaces the handlers of the logger of modules imported so far
+    return listener
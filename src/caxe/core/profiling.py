@@ -0,0 +1,141 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.profiling module
+
+On-demand profile capture of individual saidify and verify requests
+
+"""
+import cProfile
+import hmac
+import os
+from contextlib import contextmanager
+
+import falcon
+
+from keri.help import ogler
+
+logger = ogler.getLogger()
+
+
+class Profiler:
+    """ Opt-in cProfile capture of single report requests
+
+    Profiling is off unless a profile directory is configured, along with the admin
+    token profiles are retrieved with.  With a directory, every request is profiled
+    when .always is set, otherwise only requests that present the admin token in the
+    CAXE-Profile header.  Each profile is saved to the profile directory named by the
+    SAID of the report.
+
+    """
+
+    Header = "CAXE-PROFILE"
+
+    def __init__(self, path=None, token=None, always=False):
+        """ Create profiler
+
+        Parameters:
+            path (str): directory to save profiles in, None disables profiling
+            token (str): admin token required in CAXE-Profile header to profile a request
+            always (bool): profile every request regardless of header
+
+        Raises:
+            ValueError: if path is given without a token, its profiles could never be retrieved
+
+        """
+        if path is not None and not token:
+            raise ValueError("a profile directory requires an admin token to retrieve its profiles with")
+
+        self.path = path
+        self.token = token
+        self.always = always
+
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+
+    def authorized(self, req):
+        """ Returns True if request carries the admin profiling token """
+        if self.path is None or self.token is None:
+            return False
+
+        value = req.get_header(self.Header)
+        return value is not None and hmac.compare_digest(value, self.token)
+
+    def profile(self, req):
+        """ Returns new cProfile.Profile if profiling is requested for req, otherwise None """
+        if self.path is None:
+            return None
+
+        if self.always or self.authorized(req):
+            return cProfile.Profile()
+
+        return None
+
+    def save(self, profile, said):
+        """ Save captured profile named by report SAID
+
+        Parameters:
+            profile (cProfile.Profile): captured profile
+            said (str): qb64 SAID of profiled report
+
+        Returns:
+            str: path of saved profile
+
+        """
+        path = os.path.join(self.path, f"{said}.prof")
+        profile.dump_stats(path)
+        logger.info("Profiler: saved profile of report %s to %s", said, path)
+        return path
+
+
+@contextmanager
+def profiled(profile):
+    """ Context manager enabling profile, if any, for the enclosed block """
+    if profile is None:
+        yield
+        return
+
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+
+
+class ProfileEnd:
+    """ Resource for retrieving saved report profiles """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def on_get(self, req, rep, said):
+        """ Profile GET endpoint
+
+        Parameters:
+            req: falcon.Request HTTP request
+            rep: falcon.Response HTTP response
+            said (str): qb64 SAID of profiled report
+
+       ---
+        summary:  Retrieve saved pstats profile of a report request
+        tags:
+           - Profile
+        responses:
+           200:
+              description: pstats profile data
+           403:
+              description: Missing or invalid admin token
+           404:
+              description: No profile saved for report
+        """
+        if not self.profiler.authorized(req):
+            raise falcon.HTTPForbidden(title="Forbidden", description="Admin token required to retrieve profiles")
+
+        path = os.path.join(self.profiler.path, f"{os.path.basename(said)}.prof")
+        if not os.path.exists(path):
+            raise falcon.HTTPNotFound(title="Not Found", description=f"No profile for report {said}")
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = "application/octet-stream"
+        with open(path, "rb") as f:
+            rep.data = f.read()
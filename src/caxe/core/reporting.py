@@ -6,29 +6,37 @@ caxe.core.reporting module
 """
 
 import json
+import threading
+import time
+
 import falcon
 import requests
 import blake3
 
 from lxml import etree, html
-from arelle import ModelManager, CntlrCmdLine, FileSource
+from arelle import FileSource, ModelDocument
 
 from keri.core import coring
 from keri.help import ogler
 from keri import help
 
-from caxe.core import attribing
+from caxe.core import admitting, attribing, cataloging, compressing, extracting, merkling, profiling, saiding, tracing
+from caxe.core.metering import meter
 
 logger = ogler.getLogger()
 
-def loadEnds(app):
+_local = threading.local()  # per thread Arelle controller
+
+def loadEnds(app, profiler=None, admitter=None, tracer=None):
 
     reportEnd = ReportResourceEnd()
     app.add_route("/report", reportEnd)
 
-    saidifyEnd = SaidifyResource()
+    saidifyEnd = SaidifyResource(profiler=profiler, admitter=admitter, tracer=tracer)
     app.add_route("/report/saidify", saidifyEnd)
 
+    app.add_route("/report/proof", ProofResource(admitter=saidifyEnd.admitter))
+
     return reportEnd
 
 class ReportResourceEnd:
@@ -39,8 +47,20 @@ class ReportResourceEnd:
 class SaidifyResource:
     """ Resource class for extract and saidify facts """
 
-    @staticmethod
-    def on_post(req, rep):
+    def __init__(self, profiler=None, admitter=None, tracer=None):
+        """ Create saidify resource
+
+        Parameters:
+            profiler (Profiler): optional on-demand request profiler
+            admitter (Admitter): optional admission control, requests beyond its concurrency are rejected
+            tracer (Tracer): optional sampled request tracing
+
+        """
+        self.profiler = profiler
+        self.admitter = admitter if admitter is not None else admitting.Admitter("saidify")
+        self.tracer = tracer if tracer is not None else tracing.Tracer()
+
+    def on_post(self, req, rep):
         """ Saidify facts POST endpoint
 
         Parameters:
@@ -48,98 +68,271 @@ class SaidifyResource:
             rep (Response): falcon.Response HTTP response object
 
         """
-        
-        print(f"request to saidify report file and facts...")
+        profile = self.profiler.profile(req) if self.profiler is not None else None
+        trace = self.tracer.trace(coring.randomNonce(), "saidify")
+        try:
+            with self.admitter.running(req), profiling.profiled(profile):
+                a = self.saidify(req, rep, trace=trace)
+        except Exception as ex:
+            tracing.close(trace, status="failed", msg=str(ex))
+            raise
 
-        body = req.get_media()
+        tracing.close(trace, status="complete", rd=a['rd'], said=a['d'])
+        if profile is not None:
+            self.profiler.save(profile, a['rd'])
 
-        report_url = body.get("report_url")
-        print(f"report file: {report_url}")
-        if not report_url:
-            raise falcon.HTTPBadRequest(title='Missing URL', description='The request must include an ixbrl report_url field.')
+    @staticmethod
+    def saidify(req, rep, trace=None):
+        """ Extract and saidify report facts, setting the attestation as the response
 
-        fact_ids = body.get('fact_ids', None)
-        print(f"facts to saidify: {fact_ids}")
+        Parameters:
+            req (Request): falcon.Request HTTP request object
+            rep (Response): falcon.Response HTTP response object
+            trace (Trace): optional trace of the request
 
-        try:
+        Returns:
+            dict: saidified attestation, in its most compact form if its facts are blocked
+
+        """
+        report_url, fact_ids, merkle, block = params(compressing.media(req))
+        a, raw = attest(fetch(report_url, trace=trace), report_url, fact_ids, merkle=merkle, block=block, trace=trace)
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = "application/json"
+        rep.data = raw
+        meter.count("results_served")
+
+        return a
+
+
+class ProofResource:
+    """ Resource returning Merkle inclusion proofs of attested facts """
+
+    def __init__(self, admitter=None):
+        """ Create proof resource
+
+        Parameters:
+            admitter (Admitter): optional admission control, shared with saidify as both load the report with Arelle
+
+        """
+        self.admitter = admitter if admitter is not None else admitting.Admitter("saidify")
+
+    def on_post(self, req, rep):
+        """ Fact inclusion proof POST endpoint
+
+        Parameters:
+            req (Request): falcon.Request HTTP request object
+            rep (Response): falcon.Response HTTP response object
+
+        The body holds the report_url and fact_ids of the saidify request that attested the
+        report, or no fact_ids for an attestation of every fact as by `cake extract`, and
+        the fact_id to prove.
+
+        """
+        body = compressing.media(req)
+        report_url, fact_ids, _, _ = params(body)
+        with self.admitter.running(req):
+            proof = prove(report_url, fact_ids, body.get("fact_id"))
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = "application/json"
+        rep.data = json.dumps(proof).encode("utf-8")
+        meter.count("results_served")
+
+
+def params(body):
+    """ Returns (report_url, fact_ids, merkle, block) of saidify request body
+
+    Raises falcon.HTTPBadRequest without a report_url or with a block size that is not a
+    positive number of facts.
+
+    """
+    report_url = body.get("report_url")
+    if not report_url:
+        raise falcon.HTTPBadRequest(title='Missing URL', description='The request must include an ixbrl report_url field.')
+
+    fact_ids = body.get('fact_ids', None)
+    logger.debug("Saidify: report %s facts %s", report_url, fact_ids)
+
+    block = body.get('block', 0)
+    if not isinstance(block, int) or isinstance(block, bool) or block < 0:
+        raise falcon.HTTPBadRequest(title='Invalid block', description='The block field must be a number of facts.')
+
+    return report_url, fact_ids, bool(body.get('merkle', False)), block
+
+
+def fetch(report_url, trace=None):
+    """ Returns content of the report at report_url, raises falcon.HTTPBadRequest if it cannot be fetched """
+    try:
+        with tracing.timed(trace, "fetch"):
             response = requests.get(report_url)
-            response.raise_for_status()
-        except requests.exceptions.RequestException as e:
-            raise falcon.HTTPBadRequest('File fetching failed', f'Failed to fetch report file from the provided URL: {str(e)}')
+        response.raise_for_status()
+        meter.count("fetched_bytes", len(response.content))
+    except requests.exceptions.RequestException as e:
+        raise falcon.HTTPBadRequest('File fetching failed', f'Failed to fetch report file from the provided URL: {str(e)}')
 
-        try:
-            file_content = response.content
+    return response.content
+
+
+def attest(file_content, report_url, fact_ids=None, merkle=False, block=0, trace=None):
+    """ Returns saidified attestation of report digest and the facts with ids in fact_ids
+
+    CPU bound, safe to run in a worker thread.
 
+    Parameters:
+        file_content (bytes): fetched iXBRL report
+        report_url (str): URL of the report Arelle loads the facts from
+        fact_ids (list): optional ids of facts to attest
+        merkle (bool): True to attest the Merkle root `mr` of the attested fact records
+        block (int): facts of each block of `f`, a nested section with its own SAID, so the SAID
+                     of the attestation covers only the block SAIDs, 0 attests the facts unblocked
+        trace (Trace): optional trace recording a span of each stage
+
+    Returns:
+        tuple: (a, raw) saidified attestation, in its most compact form holding the block SAIDs
+               as `f` if blocked, and its JSON serialization with every block expanded
+
+    """
+    try:
+        with tracing.timed(trace, "parse"):
             root = html.document_fromstring(file_content)
 
-            links = root.xpath(".//link[@type='application/json+acdc']")
-            print(f"acdc credential links: {links}")
-            for link in links:
-                link.getparent().remove(link)
+        links = root.xpath(".//link[@type='application/json+acdc']")
+        logger.debug("Saidify: removing %d credential links of report %s", len(links), report_url)
+        for link in links:
+            link.getparent().remove(link)
 
+        with tracing.timed(trace, "canonicalize"):
             data = etree.tostring(root)
             xmld = etree.canonicalize(data.decode("utf-8"))
 
             raw = blake3.blake3(xmld.encode("utf-8")).digest()
             diger = coring.Diger(raw=raw)
-            print(f"canonicalized data said: {diger.qb64}")
+        logger.debug("Saidify: canonicalized report %s to %s", report_url, diger.qb64)
 
-            a = dict(
-                d='',
-                rd=diger.qb64,
-                dt=help.nowIso8601()
-            )
+        a = dict(
+            d='',
+            rd=diger.qb64,
+            dt=help.nowIso8601()
+        )
 
-            if fact_ids is not None and len(fact_ids) > 0:
+        if fact_ids is not None and len(fact_ids) > 0:
+            a['f'] = records(report_url, fact_ids, trace=trace, content=file_content)
+            if merkle:
+                a['mr'] = merkling.Merkler(a['f']).root
 
-                try:
-                    cntlr = CntlrCmdLine.CntlrCmdLine()
-                    cntlr.startLogging(logFileName='logToBuffer')
-                    mmgr = ModelManager.initialize(cntlr)
-                    filesource = FileSource.FileSource(report_url)
-                    mmgr.load(filesource)
+        with tracing.timed(trace, "saidify"):
+            if block and 'f' in a:
+                _, a, raw = saiding.blocks(a, 'f', block)
+                return a, raw
 
-                    attriber = attribing.Attiber(dts=mmgr.modelXbrl)
-                    attriber.createViewer()
+            _, a = coring.Saider.saidify(sad=a)
 
-                except Exception as e:
-                    raise falcon.HTTPBadRequest('Processing Error', f'Failed to process the iXBRL file with Arelle: {str(e)}')
+        return a, json.dumps(a).encode("utf-8")
 
-                values = []
+    except falcon.HTTPBadRequest:
+        raise  # Re-raise Falcon's HTTPBadRequest exceptions to be handled by Falcon itself
+    except Exception as e:
+        raise falcon.HTTPInternalServerError('Internal Server Error', f'An unexpected error occurred while processing iXBRL file: {str(e)}')
 
-                filtered_facts = [fact for fact in mmgr.modelXbrl.facts if fact.id in fact_ids]
 
-                for fact in filtered_facts:
-                    raw = blake3.blake3(etree.tostring(fact)).digest()
-                    diger = coring.Diger(raw=raw)
-                    fad = attriber.taxonomyData['facts'][fact.id]
-                    attr = dict(
-                        i=fact.id,
-                        t=fact.localName,
-                        d=diger.qb64,
-                        v=fad['v'],
-                    )
-                    attr['c'] = fad['a']['c']
-                    attr['e'] = fad['a']['e']
-                    attr['p'] = fad['a']['p']
+def controller():
+    """ Returns the Arelle controller of the current thread, created once with the fast load profile
 
-                    if 'f' in fad:
-                        attr['f'] = fad['f']
+    Arelle controllers add their log handler to the process wide `arelle` logger so one
+    controller is reused by every request of a thread rather than one created per request.
 
-                    values.append(attr)
+    """
+    if (cntlr := getattr(_local, "cntlr", None)) is None:
+        cntlr = _local.cntlr = extracting.controller()
 
-                a['f'] = values
+    return cntlr
+
+
+def records(report_url, fact_ids=None, trace=None, content=None):
+    """ Returns attested fact records of the report at report_url, loaded with Arelle
+
+    The report is fetched here rather than by Arelle, whose controllers work offline once
+    the taxonomy store is warm.
+
+    Parameters:
+        report_url (str): URL of the report
+        fact_ids (list): optional ids of the facts to return, every fact if None
+        trace (Trace): optional trace recording a span of each stage
+        content (bytes): the report already fetched from report_url, fetched if None
+
+    Raises:
+        falcon.HTTPBadRequest: if the report cannot be fetched or Arelle cannot load it
+
+    """
+    if content is None:
+        content = fetch(report_url, trace=trace)
+
+    cntlr = controller()
+    modelXbrl = None
+    try:
+        with tracing.timed(trace, "load"), cataloging.mapped(cntlr, report_url, content):
+            modelXbrl = cntlr.modelManager.load(FileSource.FileSource(report_url))
+
+        if modelXbrl is None or modelXbrl.modelDocument is None or "IOerror" in modelXbrl.errors:
+            errors = modelXbrl.errors if modelXbrl is not None else []
+            raise ValueError(f"report not loadable: {', '.join(dict.fromkeys(errors)) or 'no model'}")
+
+        if modelXbrl.modelDocument.type not in (ModelDocument.Type.INLINEXBRL,
+                                                ModelDocument.Type.INLINEXBRLDOCUMENTSET):
+            raise ValueError("not an inline XBRL report")
+
+        attriber = attribing.Attiber(dts=modelXbrl)
+        with tracing.timed(trace, "viewer"):
+            attriber.createViewer()
+
+    except Exception as e:
+        if modelXbrl is not None:
+            modelXbrl.close()
+        raise falcon.HTTPBadRequest('Processing Error', f'Failed to process the iXBRL file with Arelle: {str(e)}')
+
+    values = []
+
+    try:
+        filtered_facts = [fact for fact in modelXbrl.facts if fact_ids is None or fact.id in fact_ids]
+
+        with tracing.spanned(trace, "digest", facts=len(filtered_facts)):
+            for fact in filtered_facts:
+                start = time.perf_counter()
+                raw = blake3.blake3(etree.tostring(fact)).digest()
+                diger = coring.Diger(raw=raw)
+                meter.observe("digest", time.perf_counter() - start)
+                fad = attriber.taxonomyData['facts'][fact.id]
+                attr = dict(
+                    i=fact.id,
+                    t=fact.localName,
+                    d=diger.qb64,
+                    v=fad['v'],
+                )
+                attr['c'] = fad['a']['c']
+                attr['e'] = fad['a']['e']
+                attr['p'] = fad['a']['p']
+
+                if 'f' in fad:
+                    attr['f'] = fad['f']
+
+                values.append(attr)
+    finally:
+        modelXbrl.close()
+
+    return values
 
-            _, a = coring.Saider.saidify(sad=a)
 
-            rep.status = falcon.HTTP_200
-            rep.content_type = "application/json"
-            rep.data = json.dumps(a).encode("utf-8")
-        
-        except falcon.HTTPBadRequest:
-            raise  # Re-raise Falcon's HTTPBadRequest exceptions to be handled by Falcon itself
-        except Exception as e:
-            raise falcon.HTTPInternalServerError('Internal Server Error', f'An unexpected error occurred while processing iXBRL file: {str(e)}')
+def prove(report_url, fact_ids, fact_id, content=None):
+    """ Returns Merkle inclusion proof of fact fact_id in the attestation of fact_ids of the report at report_url
 
+    CPU bound, safe to run in a worker thread.  The report is fetched unless its content is given.
 
+    """
+    if not fact_id:
+        raise falcon.HTTPBadRequest(title='Missing fact', description='The request must include a fact_id field.')
 
+    try:
+        return merkling.prove(records(report_url, fact_ids, content=content), fact_id)
+    except ValueError as e:
+        raise falcon.HTTPNotFound(title='Unknown fact', description=str(e))
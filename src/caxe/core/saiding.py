@@ -0,0 +1,222 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.saiding module
+
+Incremental and blocked SAID calculation of large attestations serialized once
+
+"""
+import json
+
+import blake3
+
+from keri.core import coring
+
+
+def dumps(value):
+    """ Returns compact JSON serialization of value, the serialization coring.Saider hashes """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def placeholder(code=coring.MtrDex.Blake3_256):
+    """ Returns dummy SAID field value of digest code, as coring.Saider fills it before hashing """
+    return coring.Saider.Dummy * coring.Matter.Sizes[code].fs
+
+
+def section(sad, label=coring.Saids.d):
+    """ Saidify SAD serializing it once, the SAID patched into the serialization in place
+
+    Parameters:
+        sad (dict): SAD with SAID field label first
+        label (str): SAID field label
+
+    Returns:
+        tuple: (said, raw) qb64 Blake3-256 SAID and compact JSON serialization of the
+               saidified SAD, the SAD coring.Saider.saidify returns serialized
+
+    """
+    if next(iter(sad), None) != label:
+        raise ValueError(f"SAID field {label} must be the first field of the SAD")
+
+    raw = bytearray(dumps({**sad, label: placeholder()}))
+    said = coring.Diger(raw=blake3.blake3(raw).digest()).qb64
+    offset = len(b"{" + dumps(label) + b':"')
+    raw[offset:offset + len(said)] = said.encode("utf-8")
+
+    return said, bytes(raw)
+
+
+def blocks(sad, name, size, label=coring.Saids.d):
+    """ Saidify SAD with its list field name split into blocks of size values, serializing it once
+
+    Each block is a nested section {label: SAID, name: values} with its own SAID and the
+    SAID of the SAD is calculated over its most compact form, the list field holding only
+    the SAIDs of the blocks, as the SAID of an ACDC covers its compacted sections.  The
+    blocks are serialized once, for their SAIDs, and the expanded SAD is assembled from
+    those serializations instead of serializing every value again.
+
+    Parameters:
+        sad (dict): SAD with SAID field label first and list field name
+        name (str): label of the list field to split
+        size (int): number of values in each block
+        label (str): SAID field label of the SAD and of each block
+
+    Returns:
+        tuple: (said, compact, raw) qb64 SAID of the SAD, the saidified SAD in its most compact
+               form and the compact JSON serialization of the expanded SAD
+
+    """
+    values = sad[name]
+    saids = []
+    raws = []
+    for start in range(0, len(values), size):
+        said, raw = section({label: "", name: values[start:start + size]}, label=label)
+        saids.append(said)
+        raws.append(raw)
+
+    said, _ = section({**sad, name: saids}, label=label)
+    compact = {**sad, label: said, name: saids}
+
+    fields = [dumps(field) + b":" + (b"[" + b",".join(raws) + b"]" if field == name else dumps(value))
+              for field, value in compact.items()]
+
+    return said, compact, b"{" + b",".join(fields) + b"}"
+
+
+def expand(values, name="f", label=coring.Saids.d):
+    """ Returns the values of list field name, those of every block if the list is split into blocks
+
+    A list split by .blocks holds either its blocks, nested sections {label: SAID, name:
+    values}, or only their SAIDs in its most compact form.  The SAID of each block is
+    checked against its values.  The SAIDs alone cannot be expanded without the blocks.
+
+    Parameters:
+        values (list): values of the list field or its blocks
+        name (str): label of the list field of each block
+        label (str): SAID field label of each block
+
+    Returns:
+        list: values of the list field, unchanged if it is not split into blocks
+
+    Raises:
+        ValueError: if the list holds only block SAIDs or a block SAID does not match its values
+
+    """
+    if not isinstance(values, list) or not values:
+        return values
+
+    if all(isinstance(value, str) for value in values):
+        raise ValueError(f"{name} holds only the SAIDs of its blocks, the blocks must be expanded")
+
+    if not all(isinstance(value, dict) and set(value) == {label, name} for value in values):
+        return values
+
+    expanded = []
+    for value in values:
+        if not isinstance(value[name], list) or section({label: "", name: value[name]}, label=label)[0] != value[label]:
+            raise ValueError(f"SAID {value[label]} of block does not match its {name} values")
+        expanded.extend(value[name])
+
+    return expanded
+
+
+class Saidifier:
+    """ Writes a SAD to a seekable binary file while calculating its SAID
+
+    The SAD is serialized exactly as coring.Saider.saidify serializes it, with the SAID
+    field first holding a dummy placeholder, and hashed as it is written so the SAD
+    never has to exist in memory all at once.  .close() patches the placeholder in the
+    file with the SAID, leaving the file holding the serialized saidified SAD.
+
+    Usage:
+        saidifier = Saidifier(out)
+        saidifier.open(dict(d="", rd=rd, dt=dt))
+        saidifier.array("f", facts)
+        said = saidifier.close()
+
+    """
+
+    def __init__(self, out, label=coring.Saids.d, code=coring.MtrDex.Blake3_256):
+        """ Create incremental saidifier
+
+        Parameters:
+            out (file): seekable binary file to write the SAD to
+            label (str): SAID field label, must be the first field of the SAD
+            code (str): digest code of the SAID, Blake3_256 only
+
+        """
+        if code != coring.MtrDex.Blake3_256:
+            raise ValueError(f"unsupported SAID digest code {code}")
+
+        self.out = out
+        self.label = label
+        self.code = code
+        self.hasher = blake3.blake3()
+        self.offset = None
+        self.fields = 0
+
+    def write(self, raw):
+        self.out.write(raw)
+        self.hasher.update(raw)
+
+    def open(self, head):
+        """ Write opening of the SAD with its leading fields
+
+        Parameters:
+            head (dict): leading fields of the SAD starting with the SAID field
+
+        """
+        if next(iter(head), None) != self.label:
+            raise ValueError(f"SAID field {self.label} must be the first field of the SAD")
+
+        self.write(b"{")
+        for name, value in head.items():
+            if name == self.label:
+                self.write(self.separator() + dumps(name) + b':"')
+                self.offset = self.out.tell()
+                self.write(placeholder(self.code).encode("utf-8"))
+                self.write(b'"')
+            else:
+                self.field(name, value)
+
+    def separator(self):
+        sep = b"," if self.fields else b""
+        self.fields += 1
+        return sep
+
+    def field(self, name, value):
+        """ Write field name with value """
+        self.write(self.separator() + dumps(name) + b":" + dumps(value))
+
+    def array(self, name, values):
+        """ Write field name holding the values of iterable values, serializing one value at a time
+
+        Returns:
+            int: number of values written
+
+        """
+        self.write(self.separator() + dumps(name) + b":[")
+        count = 0
+        for value in values:
+            self.write((b"," if count else b"") + dumps(value))
+            count += 1
+
+        self.write(b"]")
+        return count
+
+    def close(self):
+        """ Close the SAD and patch its SAID field
+
+        Returns:
+            str: qb64 SAID of the SAD
+
+        """
+        self.write(b"}")
+        said = coring.Diger(raw=self.hasher.digest(), code=self.code).qb64
+
+        end = self.out.tell()
+        self.out.seek(self.offset)
+        self.out.write(said.encode("utf-8"))
+        self.out.seek(end)
+
+        return said
@@ -4,50 +4,74 @@ KERI
 caxe.core.serving module
 
 """
+import cProfile
 import json
+import logging
 import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
 from urllib import parse
 
-import blake3
 import falcon
 from hio.base import doing
 from hio.core import http
 from hio.help import decking
-from caxe.core import reporting
+from caxe.core import (admitting, compressing, reporting, chaining, caching, verifying, metering, profiling, jobbing,
+                       ogling, tracing)
+from caxe.core.metering import meter
 from keri import help
 from keri.core import coring, routing, eventing, parsing
+from keri.db import basing
 from keri.help import helping
-from keri.vdr import viring, verifying
+from keri.vdr import viring
+from keri.vdr import verifying as vdrverifying
 from keri.vdr.eventing import Tevery
-from lxml import html, etree
+from lxml import html
 
 logger = help.ogler.getLogger()
 
 
-@dataclass
+@dataclass(slots=True)
 class Report:
+    """ Report in the verification pipeline, only its digests and links are kept once the body is inspected """
     uuid: str
-    data: bytes = None
+    url: str = None
     said: str = None
+    digests: verifying.Digests = None
     start: datetime = None
     creds: list = None
     saids: list = None
+    key: str = None
     result: dict = None
+    results: dict = None
+    profile: cProfile.Profile = None
     clientDoer: http.ClientDoer = None
+    job: bool = False
+    trace: tracing.Trace = None
+    hold: admitting.Hold = None  # report budget bytes of the page being fetched
 
 
-@dataclass
+@dataclass(slots=True)
 class Cred:
     link: str
     clientDoer: http.ClientDoer = None
     said: str = ""
+    error: str = None
+    start: float = None
+    expiry: float = None
+    trace: tracing.Trace = None  # trace of the report that started the fetch
 
 
-class VerifyEnd(doing.DoDoer):
+class Resolver(doing.DoDoer):
+    """ Parses fetched credential streams and resolves report credential chains
 
-    def __init__(self, hby, hab, kvy, rvy, tvy, vry):
+    Base of the report verification endpoints, owning the KERI message parser, escrow
+    processing, the credential chain cache and the verification result cache.
+
+    """
+
+    def __init__(self, hby, hab, kvy, rvy, tvy, vry, ttl=None, doers=None, reger=None):
         self.ims = bytearray()
         self.hby = hby
         self.hab = hab
@@ -55,12 +79,9 @@ class VerifyEnd(doing.DoDoer):
         self.tvy = tvy
         self.rvy = rvy
         self.vry = vry
-        self.pages = decking.Deck()
-        self.requests = decking.Deck()
-        self.requested = decking.Deck()
-        self.parsed = decking.Deck()
-        self.complete = decking.Deck()
-        self.failed = decking.Deck()
+        self.chainer = chaining.Chainer(reger=reger if reger is not None else vry.reger)
+        self.cacher = caching.Cacher(ttl=ttl)
+        self.fetched = dict()
 
         self.parser = parsing.Parser(ims=self.ims,
                                      framed=True,
@@ -69,10 +90,179 @@ class VerifyEnd(doing.DoDoer):
                                      rvy=rvy,
                                      vry=vry)
 
+        doers = (doers if doers is not None else []) + [doing.doify(self.msgDo), doing.doify(self.escrowDo)]
+
+        super(Resolver, self).__init__(doers=doers)
+
+    def parse(self, said, body):
+        """ Queue credential OOBI response body for parsing
+
+        Parameters:
+            said (str): qb64 SAID of the fetched credential
+            body (bytes): CESR stream of credential, its chain and KEL/TEL events
+
+        """
+        self.ims.extend(bytearray(body))
+        self.chainer.dirty = True
+        self.fetched[said] = time.monotonic()
+
+    def fresh(self, said):
+        """ Returns True if credential chain is resolved and its credential was fetched within cache TTL
+
+        Parameters:
+            said (str): qb64 SAID of data attestation credential
+
+        """
+        if said not in self.chainer.chains or said not in self.fetched:
+            return False
+
+        return time.monotonic() - self.fetched[said] < self.cacher.ttl
+
+    def resolve(self, report):
+        """ Resolve credential chains of report and verify report and fact digests against them
+
+        Parameters:
+            report (Report): report with all credentials fetched
+
+        Returns:
+            tuple: (results, msg) verification results keyed by credential SAID and None if verified,
+                   (None, msg) with reason if verification failed or (None, None) if any credential
+                   chain is not resolved yet
+
+        """
+        results = dict()
+        complete = True
+        for cred in report.creds:
+            chain = self.chainer.resolve(cred.said)
+            if chain is None:
+                complete = False
+                continue
+
+            if chain.revoked is not None:
+                return None, f"Credential {chain.revoked} in chain of {cred.said} has been revoked"
+
+            if "rd" not in chain.attrs:
+                return None, f"Invalid data attestation {cred.said}"
+
+            if chain.attrs["rd"] != report.said:
+                return None, (f"Report SAID in credential {chain.attrs['rd']} does not match "
+                              f"actual SAID {report.said} for credential {chain.said}")
+
+            try:
+                verification = verifying.verify(report.digests, chain.attrs.get("f", []))
+            except ValueError as ex:
+                return None, f"Malformed data attestation {cred.said}: {ex}"
+
+            if verification["mismatched"] or verification["missing"]:
+                return None, (f"Facts attested in credential {chain.said} do not match report, "
+                              f"mismatched: {verification['mismatched']}, missing: {verification['missing']}")
+
+            results[chain.said] = chain.vira
+
+        return (results, None) if complete else (None, None)
+
+    def msgDo(self, tymth=None, tock=0.0):
+        """
+        Returns doifiable Doist compatibile generator method (doer dog) to process
+            incoming message stream of .kevery
+
+        Parameters:
+            tymth (function): injected function wrapper closure returned by .tymen() of
+                Tymist instance. Calling tymth() returns associated Tymist .tyme.
+            tock (float): injected initial tock value
+
+        Usage:
+            add result of doify on this method to doers list
+        """
+        self.wind(tymth)
+        self.tock = tock
+        _ = (yield self.tock)
+
+        if self.parser.ims:
+            if logger.isEnabledFor(logging.DEBUG):  # slicing copies the stream
+                logger.debug("Client %s received:\n%s\n...\n", self.kvy, self.parser.ims[:1024],
+                             extra=ogling.Sampled)
+
+        parsator = self.parser.parsator()  # process messages continuously
+        while True:
+            pending = len(self.ims)
+            start = time.perf_counter()
+            try:
+                tock = next(parsator)
+            except StopIteration as ex:
+                return ex.value  # should nover get here except forced close
+
+            if pending:
+                meter.observe("cesr", time.perf_counter() - start)
+
+            yield tock
+
+    def escrowDo(self, tymth=None, tock=0.0):
+        """
+         Returns doifiable Doist compatibile generator method (doer dog) to process
+            .kevery and .tevery escrows.
+
+        Parameters:
+            tymth (function): injected function wrapper closure returned by .tymen() of
+                Tymist instance. Calling tymth() returns associated Tymist .tyme.
+            tock (float): injected initial tock value
+
+        Usage:
+            add result of doify on this method to doers list
+        """
+        self.wind(tymth)
+        self.tock = tock
+        _ = (yield self.tock)
+
+        while True:
+            self.kvy.processEscrows()
+            self.rvy.processEscrowReply()
+            self.tvy.processEscrows()
+            self.vry.processEscrows()
+
+            if self.chainer.dirty and not self.ims:
+                self.cacher.evict(self.chainer.sweep())
+
+            yield
+
+
+class VerifyEnd(Resolver):
+
+    Expiry = 10.0  # seconds a report may spend fetching its page or resolving its credentials
+    JobExpiry = 300.0  # seconds a report verified as a job may spend, no client connection waits on it
+    JobTtl = 3600.0  # seconds the results of finished jobs are kept
+    Prune = 60.0  # seconds between removals of expired job results
+
+    def __init__(self, hby, hab, kvy, rvy, tvy, vry, ttl=None, profiler=None, admitter=None, jobber=None,
+                 jobTtl=None, tracer=None):
+        self.profiler = profiler if profiler is not None else profiling.Profiler()
+        self.tracer = tracer if tracer is not None else tracing.Tracer()
+        self.admitter = admitter if admitter is not None else admitting.Admitter("verify")
+        self.jobber = jobber
+        self.jobTtl = jobTtl if jobTtl is not None else self.JobTtl
+        self.jobs = set()
+        self.resumes = deque()
+        self.held = decking.Deck()
+        self.spent = decking.Deck()  # reports waiting for the report budget to fetch their pages
+        self.pages = decking.Deck()
+        self.requests = decking.Deck()
+        self.requested = decking.Deck()
+        self.parsed = decking.Deck()
+        self.complete = decking.Deck()
+        self.failed = decking.Deck()
+        self.fetches = dict()
+        self.joined = dict()  # traces of sampled reports waiting on an identical verification, by uuid
+        self.waiting = dict()  # expiry of the requests waiting on the results of their reports, by uuid
+
+        for name in ("held", "spent", "pages", "requests", "requested", "parsed", "complete", "failed", "jobs", "waiting"):
+            meter.depth(name, getattr(self, name).__len__)
+
         doers = [doing.doify(self.getDo), doing.doify(self.requestDo), doing.doify(self.requestedDo),
-                 doing.doify(self.parsedDo), doing.doify(self.msgDo), doing.doify(self.escrowDo)]
+                 doing.doify(self.parsedDo)]
+        if jobber is not None:
+            doers.append(doing.doify(self.jobDo))
 
-        super(VerifyEnd, self).__init__(doers=doers)
+        super(VerifyEnd, self).__init__(hby=hby, hab=hab, kvy=kvy, rvy=rvy, tvy=tvy, vry=vry, ttl=ttl, doers=doers)
 
     def on_get(self, req, rep):
         """ Verify GET endpoint
@@ -93,29 +283,31 @@ class VerifyEnd(doing.DoDoer):
               type: string
             required: true
             description: ViRA ACDC Credential OOBI URL
+          - in: header
+            name: Prefer
+            schema:
+              type: string
+            required: false
+            description: respond-async to verify as a job polled at GET /verify/{jid}
         responses:
            200:
               description: ViRA attributes section with associated vLEI credentials
+           202:
+              description: Verification job accepted, poll its Location for the results
            404:
               description: No credentials found
+           429:
+              description: Too many verifications in progress, retry after Retry-After seconds
         """
         url = req.params.get("url")
-        purl = parse.urlparse(url)
-        client = http.clienting.Client(hostname=purl.hostname, port=purl.port)
-        clientDoer = http.clienting.ClientDoer(client=client)
-        self.extend([clientDoer])
+        jid = self.job(req)
+        run = self.admitter.admit(req)
+        uuid = self.fetch(url, profile=self.profiler.profile(req), held=not run, job=jid)
+        if jid is not None:
+            self.accepted(req, rep, jid)
+            return
 
-        client.request(
-            method="GET",
-            path=purl.path,
-            qargs=parse.parse_qs(purl.query),
-        )
-
-        uuid = coring.randomNonce()
-        rpt = Report(uuid=uuid, clientDoer=clientDoer)
-        self.pages.append(rpt)
-
-        rep.stream = ReportIterable(uuid=uuid, complete=self.complete, failed=self.failed)
+        rep.stream = ReportIterable(uuid=uuid, verifyEnd=self)
 
     def on_post(self, req, rep):
         """ Verify POST endpoint
@@ -129,31 +321,422 @@ class VerifyEnd(doing.DoDoer):
         description:  Verify all ViRA credential links
         tags:
            - Verify
+        parameters:
+          - in: header
+            name: Prefer
+            schema:
+              type: string
+            required: false
+            description: respond-async to verify as a job polled at GET /verify/{jid}
         responses:
            200:
               description: ViRA attributes section with associated vLEI credentials
+           202:
+              description: Verification job accepted, poll its Location for the results
            404:
               description: No credentials found
+           413:
+              description: Decoded report exceeds the upload limit
+           415:
+              description: Unsupported Content-Encoding, the report may be gzip, deflate or br encoded
+           429:
+              description: Too many verifications in progress, retry after Retry-After seconds
         """
-        data = req.bounded_stream.read()
-        root = html.document_fromstring(data)
-        links = root.xpath(".//link[@type='application/json+acdc']")
-        if len(links) == 0:
+        data = compressing.read(req)  # before admission so an invalid encoding cannot leak its slot
+        jid = self.job(req)
+        run = self.admitter.admit(req)
+        uuid = self.upload(data, profile=self.profiler.profile(req), held=not run, job=jid)
+        if uuid is None:
             rep.status = falcon.HTTP_400
             rep.content_type = "application/json"
             msg = dict(msg="No credential links found")
-            rep.data = json.dumps(msg, indent=2)
+            rep.data = json.dumps(msg, indent=2).encode("utf-8")
+            return
+
+        if jid is not None:
+            self.accepted(req, rep, jid)
+            return
+
+        rep.stream = ReportIterable(uuid=uuid, verifyEnd=self)
+
+    def on_get_job(self, req, rep, jid):
+        """ Verification job GET endpoint
+
+        Parameters:
+            req: falcon.Request HTTP request
+            rep: falcon.Response HTTP response
+            jid (str): job id
+
+       ---
+        summary:  Get status or results of a verification job
+        description:  Get status of a pending verification job or results of a finished one
+        tags:
+           - Verify
+        parameters:
+          - in: path
+            name: jid
+            schema:
+              type: string
+            required: true
+            description: job id returned when the job was accepted
+        responses:
+           200:
+              description: finished job, with ViRA attributes keyed by credential SAID or the reason it failed
+           202:
+              description: job is pending, retry after Retry-After seconds
+           404:
+              description: No such job, or its results have expired
+        """
+        if (rec := self.jobber.get(jid)) is None:
+            raise falcon.HTTPNotFound(title="Unknown job", description=f"No verification job {jid}")
+
+        body = dict(id=jid, status=rec.status, dt=rec.dt)
+        if rec.status == jobbing.Pending:
+            rep.status = falcon.HTTP_202
+            rep.set_header("Retry-After", str(self.admitter.retry))
+        else:
+            body.update(said=rec.said, done=rec.done)
+            if rec.results is not None:
+                body["results"] = rec.results
+            else:
+                body["msg"] = rec.msg
+            meter.count("results_served")
+
+        rep.content_type = "application/json"
+        rep.data = json.dumps(body).encode("utf-8")
+
+    def job(self, req):
+        """ Returns new job id if req asks to be answered before verification completes, otherwise None """
+        if self.jobber is None:
+            return None
+
+        prefer = [pref.strip().lower() for pref in (req.get_header("Prefer") or "").split(",")]
+        return coring.randomNonce() if "respond-async" in prefer else None
+
+    def accepted(self, req, rep, jid):
+        """ Respond 202 Accepted pointing at the status of job jid """
+        rep.status = falcon.HTTP_202
+        rep.content_type = "application/json"
+        rep.location = f"{req.path.rstrip('/')}/{jid}"
+        rep.set_header("Preference-Applied", "respond-async")
+        rep.data = json.dumps(dict(id=jid, status=jobbing.Pending)).encode("utf-8")
+        meter.count("jobs_accepted")
+
+    def fetch(self, url, profile=None, held=False, job=None):
+        """ Start verification of the report published at url
+
+        Parameters:
+            url (str): URL of iXBRL report page
+            profile (cProfile.Profile): optional profile capturing this report's processing
+            held (bool): True if the report holds a queue slot of .admitter and waits for a running slot
+            job (str): job id to store the results under in .jobber, None if a request waits for them
+
+        Returns:
+            str: uuid of report verification, the job id of a job
+
+        """
+        uuid = job if job is not None else coring.randomNonce()
+        rpt = Report(uuid=uuid, url=url, start=helping.nowUTC(), profile=profile, job=job is not None,
+                     trace=self.tracer.trace(uuid, "verify", url=url, job=job is not None))
+        if rpt.job:
+            self.jobber.create(job, url=url)
+            self.jobs.add(job)
+        else:
+            self.waiting[uuid] = time.perf_counter() + ReportIterable.TimeoutReport
+
+        if held:
+            tracing.begin(rpt.trace, "held")
+            self.held.append(rpt)
+        else:
+            self.page(rpt)
+
+        return uuid
+
+    def page(self, rpt):
+        """ Start fetching the page of report rpt, or hold it in .spent while the report budget is spent """
+        if self.spent or (hold := self.admitter.budget.take(0)) is None:  # page size is known once fetched
+            meter.count("report_bytes_delayed")
+            tracing.begin(rpt.trace, "budget")
+            self.spent.append(rpt)
+            return
+
+        self.download(rpt, hold)
+
+    def download(self, rpt, hold):
+        """ Fetch the page of report rpt, holding its bytes in the report budget until it is inspected
+
+        Parameters:
+            rpt (Report): report with the URL of its page
+            hold (Hold): report budget bytes of the page
+
+        """
+        purl = parse.urlparse(rpt.url)
+        client = http.clienting.Client(hostname=purl.hostname, port=purl.port)
+        clientDoer = http.clienting.ClientDoer(client=client)
+        self.extend([clientDoer])
+
+        client.request(
+            method="GET",
+            path=purl.path,
+            qargs=parse.parse_qs(purl.query),
+        )
+
+        rpt.start = helping.nowUTC()
+        rpt.clientDoer = clientDoer
+        rpt.hold = hold
+        tracing.begin(rpt.trace, "page", url=rpt.url)
+        self.pages.append(rpt)
+
+    def upload(self, data, profile=None, held=False, job=None):
+        """ Start verification of an uploaded report
+
+        Parameters:
+            data (bytes): iXBRL report
+            profile (cProfile.Profile): optional profile capturing this report's processing
+            held (bool): True if the report holds a queue slot of .admitter and waits for a running slot
+            job (str): job id to store the results under in .jobber, None if a request waits for them
+
+        Returns:
+            str: uuid of report verification, the job id of a job, or None if the report has no
+                 credential links
+
+        Raises:
+            falcon.HTTPBadRequest: if the report cannot be parsed
+            falcon.HTTPTooManyRequests: if the report budget cannot hold the report while it is inspected
+
+        """
+        uuid = job if job is not None else coring.randomNonce()
+        trace = self.tracer.trace(uuid, "verify", bytes=len(data), job=job is not None)
+        if (hold := self.admitter.budget.take(len(data))) is None:  # the server cannot wait for bytes to free
+            self.admitter.release(held=held)
+            meter.count("report_bytes_rejected")
+            tracing.close(trace, status="failed", msg="Report budget spent")
+            raise falcon.HTTPTooManyRequests(title="Too Many Requests",
+                                             description="Too many report bytes in progress",
+                                             retry_after=self.admitter.retry)
+
+        with profiling.profiled(profile), tracing.spanned(trace, "inspect"):
+            try:
+                links, digests = inspect(data)
+            except Exception as ex:
+                self.admitter.release(held=held)
+                tracing.close(trace, status="failed", msg=str(ex))
+                raise falcon.HTTPBadRequest(title="Invalid report", description=str(ex)) from ex
+            finally:
+                hold.release()
+
+        if len(links) == 0:
+            self.admitter.release(held=held)
+            conclude(trace, None)
+            return None
+
+        creds = [Cred(link=link, said=oobiSaid(link)) for link in links]
+        rpt = Report(uuid=uuid, said=digests.rd, digests=digests, start=helping.nowUTC(), creds=creds,
+                     profile=profile, job=job is not None, trace=trace)
+        if rpt.job:
+            self.jobber.create(job, data=data)
+            self.jobs.add(job)
+        else:
+            self.waiting[uuid] = time.perf_counter() + ReportIterable.TimeoutReport
+
+        if held:
+            tracing.begin(rpt.trace, "held")
+            self.held.append(rpt)
+        else:
+            self.admit(rpt)
+
+        return uuid
+
+    def admit(self, rpt):
+        """ Queue report for credential resolution unless its verification is cached or in flight
+
+        Parameters:
+            rpt (Report): report with SAID and credential links
+
+        """
+        rpt.key = self.cacher.key(rpt.said, [cred.said for cred in rpt.creds])
+        if (results := self.cacher.get(rpt.key)) is not None:
+            rpt.results = results
+            if rpt.trace is not None:
+                rpt.trace.root.attrs.update(cached=True)
+            self.deliver(rpt, self.complete)
+            self.release()
+        elif self.cacher.join(rpt.key, rpt.uuid):
+            if rpt.trace is not None:
+                rpt.trace.begin("joined")
+                self.joined[rpt.uuid] = rpt.trace
+        else:
+            tracing.begin(rpt.trace, "requests")
+            self.requests.append(rpt)
+
+    def finish(self, rpt):
+        """ Complete report verification and every identical verification that joined it
+
+        Parameters:
+            rpt (Report): verified report with results
+
+        """
+        waiters = []
+        if rpt.key is not None:
+            waiters = self.cacher.land(rpt.key, saids=[cred.said for cred in rpt.creds], results=rpt.results)
+
+        if rpt.profile is not None:
+            self.profiler.save(rpt.profile, rpt.said)
+
+        tracing.end(rpt.trace, "resolve")
+        self.deliver(rpt, self.complete)
+        for uuid in waiters:
+            self.deliver(Report(uuid=uuid, said=rpt.said, results=rpt.results, trace=self.joined.pop(uuid, None)),
+                         self.complete)
+
+        self.release(1 + len(waiters))
+
+    def fail(self, rpt, msg):
+        """ Fail report verification and every identical verification that joined it
 
-        xmld = etree.canonicalize(data.decode("utf-8"))
-        raw = blake3.blake3(xmld.encode("utf-8")).digest()
-        diger = coring.Diger(raw=raw)
+        Parameters:
+            rpt (Report): report that failed verification
+            msg (str): reason for failure returned to client
+
+        """
+        rpt.result = dict(msg=msg)
+        waiters = self.cacher.land(rpt.key) if rpt.key is not None else []
+
+        if rpt.profile is not None:
+            self.profiler.save(rpt.profile, rpt.said if rpt.said is not None else rpt.uuid)
+
+        self.deliver(rpt, self.failed)
+        for uuid in waiters:
+            self.deliver(Report(uuid=uuid, said=rpt.said, result=rpt.result, trace=self.joined.pop(uuid, None)),
+                         self.failed)
+
+        self.release(1 + len(waiters))
+
+    def deliver(self, rpt, deck):
+        """ Hand finished report to the request waiting on it through deck or store the results of its job
+
+        Reports no request waits for any longer, their client gone or timed out, are dropped.
+
+        Parameters:
+            rpt (Report): verified report with results or failed report with result
+            deck (Deck): .complete or .failed
+
+        """
+        tracing.end(rpt.trace, "joined")
+        if rpt.uuid in self.jobs:
+            self.jobs.remove(rpt.uuid)
+            self.jobber.finish(rpt.uuid, said=rpt.said, results=rpt.results,
+                               msg=rpt.result["msg"] if rpt.result is not None else None)
+            meter.count("jobs_finished")
+            served(rpt)
+            return
+
+        expiry = self.waiting.pop(rpt.uuid, None)
+        if expiry is None or expiry < time.perf_counter():
+            meter.count("results_dropped")
+            served(rpt)
+            return
+
+        tracing.begin(rpt.trace, "respond")
+        deck.append(rpt)
+
+    def abandon(self, uuid):
+        """ Drop report uuid, in flight or delivered, once the request waiting on it stops waiting
+
+        Parameters:
+            uuid (str): uuid of report verification
+
+        """
+        self.waiting.pop(uuid, None)
+        for deck in (self.complete, self.failed):
+            for _ in range(len(deck)):
+                rpt = deck.popleft()
+                if rpt.uuid != uuid:
+                    deck.append(rpt)
+                    continue
 
-        creds = [Cred(link=link.attrib["href"]) for link in links]
-        uuid = coring.randomNonce()
-        rpt = Report(uuid=uuid, data=data, said=diger.qb64, start=helping.nowUTC(), creds=creds)
-        self.requests.append(rpt)
+                meter.count("results_dropped")
+                served(rpt)
 
-        rep.stream = ReportIterable(uuid=uuid, complete=self.complete, failed=self.failed)
+    def resume(self, jid, rec):
+        """ Restart verification of pending job jid left unfinished by a previous run, holding a running slot
+
+        Parameters:
+            jid (str): job id
+            rec (JobRecord): job state
+
+        """
+        if rec.url is not None:
+            self.fetch(rec.url, job=jid)
+            return
+
+        if (data := self.jobber.report(jid)) is None:
+            self.release()
+            self.jobber.finish(jid, msg="Uploaded report of job was lost")
+            return
+
+        try:
+            uuid = self.upload(data, job=jid)
+        except falcon.HTTPTooManyRequests:  # report budget spent, resumed again once a slot frees up
+            self.resumes.appendleft((jid, rec))
+            return
+        except Exception as ex:
+            self.jobber.finish(jid, msg=f"Verification failed: {ex}")
+            return
+
+        if uuid is None:
+            self.jobber.finish(jid, msg="No credential links found")
+
+    def release(self, n=1):
+        """ Free the admission slots of n finished reports and start held reports in their place """
+        for _ in range(n):
+            self.admitter.release()
+
+        while self.held and self.admitter.resume():
+            rpt = self.held.popleft()
+            tracing.end(rpt.trace, "held")
+            if rpt.digests is None:
+                self.page(rpt)
+            else:
+                self.admit(rpt)
+
+    def expired(self, rpt):
+        """ Returns True if report has been in the pipeline longer than .Expiry, or .JobExpiry for a job """
+        return (helping.nowUTC() - rpt.start).total_seconds() > (self.JobExpiry if rpt.job else self.Expiry)
+
+    def jobDo(self, tymth=None, tock=0.0):
+        """
+        Returns doifiable Doist for resuming pending jobs and removing expired job results
+
+        Jobs left pending by a previous run are resumed as running slots of .admitter free up.
+
+        Parameters:
+            tymth (function): injected function wrapper closure returned by .tymen() of
+                Tymist instance. Calling tymth() returns associated Tymist .tyme.
+            tock (float): injected initial tock value
+
+        Usage:
+            add result of doify on this method to doers list
+        """
+        self.wind(tymth)
+        self.tock = tock
+        _ = (yield self.tock)
+
+        self.resumes.extend(self.jobber.pending())
+        if self.resumes:
+            logger.info("VerifyEnd: resuming %d verification jobs", len(self.resumes))
+
+        pruned = time.monotonic()
+        while True:
+            while self.resumes and self.admitter.acquire():
+                self.resume(*self.resumes.popleft())
+                yield self.tock
+
+            if time.monotonic() - pruned > self.Prune:
+                meter.count("jobs_expired", self.jobber.prune(self.jobTtl))
+                pruned = time.monotonic()
+
+            yield self.tock
 
     def getDo(self, tymth=None, tock=0.0):
         """
@@ -174,6 +757,20 @@ class VerifyEnd(doing.DoDoer):
         _ = (yield self.tock)
 
         while True:
+            while self.spent:
+                if self.expired(self.spent[0]):
+                    rpt = self.spent.popleft()
+                    tracing.end(rpt.trace, "budget")
+                    self.fail(rpt, msg="Timed out waiting to fetch page")
+                    continue
+
+                if (hold := self.admitter.budget.take(0)) is None:
+                    break
+
+                rpt = self.spent.popleft()
+                tracing.end(rpt.trace, "budget")
+                self.download(rpt, hold)
+
             if not self.pages:
                 yield self.tock
 
@@ -182,31 +779,43 @@ class VerifyEnd(doing.DoDoer):
                 if rpt.clientDoer.client.responses:
                     response = rpt.clientDoer.client.responses.popleft()
                     self.remove([rpt.clientDoer])
+                    rpt.hold.resize(len(response["body"]))
+                    meter.observe("fetch", (helping.nowUTC() - rpt.start).total_seconds())
+                    meter.count("fetched_bytes", len(response["body"]))
+                    tracing.end(rpt.trace, "page", status=response["status"], bytes=len(response["body"]))
+
+                    try:
+                        if not response["status"] == 200:
+                            self.fail(rpt, msg="Invalid reponse from page")
+                            continue
 
-                    if not response["status"] == 200:
-                        rpt.result = dict(msg="Invalid reponse from page")
-                        self.failed.append(rpt)
-                        continue
-
-                    data = response['body']
-                    root = html.document_fromstring(bytes(data))
-                    links = root.xpath(".//link[@type='application/json+acdc']")
-                    if len(links) == 0:
-                        rpt.result = dict(msg="No links found on page")
-                        self.failed.append(rpt)
-                        continue
-
-                    xmld = etree.canonicalize(data.decode("utf-8"))
-                    raw = blake3.blake3(xmld.encode("utf-8")).digest()
-                    diger = coring.Diger(raw=raw)
-
-                    creds = [Cred(link=link.attrib["href"]) for link in links]
-                    rpt.data = data
-                    rpt.said = diger.qb64
+                        with profiling.profiled(rpt.profile), tracing.spanned(rpt.trace, "inspect"):
+                            try:
+                                links, digests = inspect(bytes(response.pop("body")))
+                            except Exception as ex:
+                                self.fail(rpt, msg=f"Invalid report: {ex}")
+                                continue
+
+                            if len(links) == 0:
+                                self.fail(rpt, msg="No links found on page")
+                                continue
+                    finally:
+                        rpt.hold.release()
+                        rpt.hold = None
+
+                    creds = [Cred(link=link, said=oobiSaid(link)) for link in links]
+                    rpt.said = digests.rd
+                    rpt.digests = digests
                     rpt.creds = creds
 
-                    self.requests.append(rpt)
+                    self.admit(rpt)
+                elif self.expired(rpt):
+                    self.remove([rpt.clientDoer])
+                    rpt.hold.release()
+                    rpt.hold = None
+                    self.fail(rpt, msg="Timed out fetching page")
                 else:
+                    rpt.hold.resize(received(rpt.clientDoer.client))  # new pages wait while these fill the budget
                     self.pages.append(rpt)
 
                 yield self.tock
@@ -235,20 +844,34 @@ class VerifyEnd(doing.DoDoer):
 
             while self.requests:
                 report = self.requests.popleft()
-                for cred in report.creds:
-                    purl = parse.urlparse(cred.link)
-                    cred.said = purl.path.lstrip('/oobi/')
+                tracing.end(report.trace, "requests")
+                tracing.begin(report.trace, "credentials", creds=len(report.creds))
+                expiry = self.JobExpiry if report.job else self.Expiry
+                for idx, cred in enumerate(report.creds):
+                    if (fetch := self.fetches.get(cred.said)) is not None:  # share in-flight credential fetch
+                        fetch.expiry = max(fetch.expiry, expiry)
+                        report.creds[idx] = fetch
+                        continue
+
+                    if self.fresh(cred.said):
+                        continue
 
+                    purl = parse.urlparse(cred.link)
                     client = http.clienting.Client(hostname=purl.hostname, port=purl.port)
                     clientDoer = http.clienting.ClientDoer(client=client)
                     self.extend([clientDoer])
 
                     cred.clientDoer = clientDoer
+                    cred.start = time.perf_counter()
+                    cred.expiry = expiry
+                    cred.trace = report.trace
+                    tracing.begin(cred.trace, "oobi", key=cred.said, said=cred.said, link=cred.link)
                     client.request(
                         method="GET",
                         path=purl.path,
                         qargs=parse.parse_qs(purl.query),
                         )
+                    self.fetches[cred.said] = cred
 
                 self.requested.append(report)
 
@@ -268,38 +891,43 @@ class VerifyEnd(doing.DoDoer):
         yield self.tock
 
         while True:
-            while self.requested:
-                report = self.requested.popleft()
-                for cred in report.creds:
-                    if cred.clientDoer is not None and cred.clientDoer.client.responses:
-                        response = cred.clientDoer.client.responses.popleft()
+            for said, cred in list(self.fetches.items()):
+                if not cred.clientDoer.client.responses:
+                    if time.perf_counter() - cred.start > cred.expiry:
                         self.remove([cred.clientDoer])
+                        cred.clientDoer = None
+                        del self.fetches[said]
+                        cred.error = f"Timed out fetching credential link: {cred.link}"
+                        tracing.end(cred.trace, "oobi", key=said, error=cred.error)
+                    continue
 
-                        if not (response["status"] == 200):
-                            report.result = dict(msg=f"Invalid reponse from credential link: {cred.link}")
-                            self.failed.append(report)
-                            continue
-
-                        if response["headers"]["Content-Type"] == "application/acdc+json":
-                            self.ims.extend(bytearray(response["body"]))
-                            cred.clientDoer = None
-                        else:
-                            report.result = dict(msg=f"Invalid reponse from credential link: {cred.link}")
-                            self.failed.append(report)
-                            continue
+                response = cred.clientDoer.client.responses.popleft()
+                self.remove([cred.clientDoer])
+                cred.clientDoer = None
+                del self.fetches[said]
+                meter.observe("oobi", time.perf_counter() - cred.start)
+                meter.count("fetched_bytes", len(response["body"]))
+                tracing.end(cred.trace, "oobi", key=said, status=response["status"], bytes=len(response["body"]))
+
+                if not (response["status"] == 200) or \
+                        response["headers"]["Content-Type"] != "application/acdc+json":
+                    cred.error = f"Invalid reponse from credential link: {cred.link}"
+                    continue
 
-                complete = True
-                for cred in report.creds:
-                    if cred.clientDoer is not None:
-                        complete = False
+                self.parse(said, response["body"])
 
-                if complete:
+            for _ in range(len(self.requested)):
+                report = self.requested.popleft()
+                errors = [cred.error for cred in report.creds if cred.error is not None]
+                if errors:
+                    self.fail(report, msg=errors[0])
+                elif all(cred.clientDoer is None for cred in report.creds):
+                    tracing.end(report.trace, "credentials")
+                    tracing.begin(report.trace, "resolve")
                     self.parsed.append(report)
                 else:
                     self.requested.append(report)
 
-                yield self.tock
-
             yield self.tock
 
     def parsedDo(self, tymth, tock=0.0):
@@ -318,54 +946,20 @@ class VerifyEnd(doing.DoDoer):
         while True:
             while self.parsed:
                 report = self.parsed.popleft()
-                results = dict()
-
-                complete = True
-                failed = False
-                for cred in report.creds:
-                    said = self.vry.reger.saved.get(keys=cred.said)
-                    if said is None:
-                        complete = False
-                        continue
-
-                    creder = self.vry.reger.creds.get(keys=(said.qb64,))
-                    attrs = creder.crd["a"]
-                    if "rd" not in attrs:
-                        report.result = dict(msg=f"Invalid data attestation {cred.said}")
-                        self.failed.append(report)
-                        failed = True
-
-                    # TODO: Fix this:
-                    # if attrs["rd"] != report.said:
-                    #     report.result = dict(msg=f"Report SAID in credential {attrs['rd']} does not match "
-                    #                              f"actual SAID {report.said} for credential {creder.said}")
-                    #     self.failed.append(report)
-                    #     failed = True
-                    # TODO: validate individual facts
-
-                    vira = dict(
-                        i=creder.issuer,
-                    )
-
-                    chains = creder.crd['e']
-                    if 'oor' in chains:
-                        chainSaid = chains['oor']['n']
-                        oor = self.vry.reger.creds.get(keys=(chainSaid,))
-                        vira['oor'] = oor.crd['a']
-                    elif 'ecr' in chains:
-                        chainSaid = chains['ecr']['n']
-                        ecr = self.vry.reger.creds.get(keys=(chainSaid,))
-                        vira['ecr'] = ecr.crd['a']
-
-                    vira['f'] = attrs['f']
-
-                    results[creder.said] = vira
-
-                if failed:
-                    continue
-                elif complete:
+                with profiling.profiled(report.profile):
+                    try:
+                        results, msg = self.resolve(report)
+                    except Exception as ex:
+                        logger.exception("VerifyEnd: resolving report %s failed", report.uuid)
+                        results, msg = None, f"Verification failed: {ex}"
+
+                if msg is not None:
+                    self.fail(report, msg=msg)
+                elif results is not None:
                     report.results = results
-                    self.complete.append(report)
+                    self.finish(report)
+                elif self.expired(report):
+                    self.fail(report, msg="Timed out resolving credentials")
                 else:
                     self.parsed.append(report)
 
@@ -373,63 +967,51 @@ class VerifyEnd(doing.DoDoer):
 
             yield self.tock
 
-    def msgDo(self, tymth=None, tock=0.0):
-        """
-        Returns doifiable Doist compatibile generator method (doer dog) to process
-            incoming message stream of .kevery
 
-        Parameters:
-            tymth (function): injected function wrapper closure returned by .tymen() of
-                Tymist instance. Calling tymth() returns associated Tymist .tyme.
-            tock (float): injected initial tock value
+def received(client):
+    """ Returns bytes of the response received so far by hio http client """
+    body = client.respondent.body if client.respondent is not None else None
+    return len(client.connector.rxbs) + (len(body) if body else 0)
 
-        Usage:
-            add result of doify on this method to doers list
-        """
-        self.wind(tymth)
-        self.tock = tock
-        _ = (yield self.tock)
 
-        if self.parser.ims:
-            logger.info("Client %s received:\n%s\n...\n", self.kvy, self.parser.ims[:1024])
-        done = yield from self.parser.parsator()  # process messages continuously
-        return done  # should nover get here except forced close
+def inspect(data):
+    """ Returns credential links and digests of iXBRL report
 
-    def escrowDo(self, tymth=None, tock=0.0):
-        """
-         Returns doifiable Doist compatibile generator method (doer dog) to process
-            .kevery and .tevery escrows.
+    Parameters:
+        data (bytes): iXBRL report
 
-        Parameters:
-            tymth (function): injected function wrapper closure returned by .tymen() of
-                Tymist instance. Calling tymth() returns associated Tymist .tyme.
-            tock (float): injected initial tock value
+    Returns:
+        tuple: (links, digests) credential OOBI links of the report and its Digests, digests
+               is None when the report has no credential links
 
-        Usage:
-            add result of doify on this method to doers list
-        """
-        self.wind(tymth)
-        self.tock = tock
-        _ = (yield self.tock)
+    """
+    with meter.timed("parse"):
+        root = html.document_fromstring(data)
+    links = [link.attrib["href"] for link in root.xpath(".//link[@type='application/json+acdc']")]
+    if len(links) == 0:
+        return links, None
 
-        while True:
-            self.kvy.processEscrows()
-            self.rvy.processEscrowReply()
-            self.tvy.processEscrows()
-            self.vry.processEscrows()
+    return links, verifying.digest(data, root=root)
 
-            yield
 
+def components(hby, alias):
+    """ Returns the habitat and event processors shared by the verification endpoints
+
+    Parameters:
+        hby (Habery): keystore of the service
+        alias (str): alias of the service identifier, created if it does not exist
 
-def setup(hby, alias, httpPort, httpHost):
-    # make hab
+    Returns:
+        tuple: (hab, kvy, tvy, rvy, verfer)
+
+    """
     hab = hby.habByName(name=alias)
     if hab is None:
         hab = hby.makeHab(name=alias, transferable=True)
 
-    print(f"Using hab {hab.name}:{hab.pre}")
+    logger.info("Using hab %s:%s", hab.name, hab.pre)
     reger = viring.Reger(name=hab.name, db=hab.db, temp=False)
-    verfer = verifying.Verifier(hby=hby, reger=reger)
+    verfer = vdrverifying.Verifier(hby=hby, reger=reger)
 
     rvy = routing.Revery(db=hby.db)
     kvy = eventing.Kevery(db=hby.db,
@@ -444,35 +1026,89 @@ def setup(hby, alias, httpPort, httpHost):
 
     tvy.registerReplyRoutes(router=rvy.rtr)
 
-    app = falcon.App(middleware=falcon.CORSMiddleware(
-        allow_origins='*', allow_credentials='*', expose_headers=['cesr-attachment', 'cesr-date', 'content-type']))
+    return hab, kvy, tvy, rvy, verfer
+
+
+def setup(hby, alias, httpPort, httpHost, ttl=None, parallelism=None, profiler=None, limits=None, compressor=None,
+          jobTtl=None, oobis=None, tracer=None):
+    hab, kvy, tvy, rvy, verfer = components(hby, alias)
+    jobber = jobbing.Jobber(name=hby.name, base=hby.base, temp=hby.temp, reopen=True)
+
+    compressor = compressor if compressor is not None else compressing.Compressor()
+    app = falcon.App(middleware=[falcon.CORSMiddleware(
+        allow_origins='*', allow_credentials='*', expose_headers=['cesr-attachment', 'cesr-date', 'content-type']),
+        compressor])
     server = http.Server(host=httpHost, port=httpPort, app=app)
     httpServerDoer = http.ServerDoer(server=server)
 
-    doers = []
-    doers += loadEnds(app=app, hby=hby, hab=hab, kvy=kvy, tvy=tvy, rvy=rvy, vry=verfer)
+    doers = [basing.BaserDoer(baser=jobber)]
+    ends = loadEnds(app=app, hby=hby, hab=hab, kvy=kvy, tvy=tvy, rvy=rvy, vry=verfer, ttl=ttl,
+                    parallelism=parallelism, profiler=profiler, limits=limits, jobber=jobber, jobTtl=jobTtl,
+                    tracer=tracer)
+    doers += ends
+    if oobis is not None:
+        doers += oobis.warmers(resolver=ends[0], hby=hby)
     doers.extend([httpServerDoer])
 
     return doers
 
 
-def loadEnds(app, hby, hab, kvy, tvy, rvy, vry):
-    verifyEnd = VerifyEnd(hby=hby, hab=hab, kvy=kvy, tvy=tvy, rvy=rvy, vry=vry)
+def loadEnds(app, hby, hab, kvy, tvy, rvy, vry, ttl=None, parallelism=None, profiler=None, limits=None, jobber=None,
+             jobTtl=None, tracer=None):
+    profiler = profiler if profiler is not None else profiling.Profiler()
+    tracer = tracer if tracer is not None else tracing.Tracer()
+    limits = limits if limits is not None else admitting.Limits()
+    verifyAdmitter, saidifyAdmitter = limits.admitters()
+
+    verifyEnd = VerifyEnd(hby=hby, hab=hab, kvy=kvy, tvy=tvy, rvy=rvy, vry=vry, ttl=ttl, profiler=profiler,
+                          admitter=verifyAdmitter, jobber=jobber, jobTtl=jobTtl, tracer=tracer)
     app.add_route("/verify", verifyEnd)
+    if jobber is not None:
+        app.add_route("/verify/{jid}", verifyEnd, suffix="job")
+
+    batchEnd = BatchEnd(verifyEnd=verifyEnd, parallelism=parallelism)
+    app.add_route("/verify/batch", batchEnd)
 
-    reporting.loadEnds(app=app)
+    app.add_route("/metrics", metering.MetricsEnd())
+
+    if profiler.path is not None:
+        app.add_route("/profiles/{said}", profiling.ProfileEnd(profiler=profiler))
+
+    reporting.loadEnds(app=app, profiler=profiler, admitter=saidifyAdmitter, tracer=tracer)
 
     return [verifyEnd]
 
 
+def served(rpt):
+    """ End the trace of report rpt, if sampled, once its results are handed to the client or its job """
+    tracing.end(rpt.trace, "respond")
+    conclude(rpt.trace, rpt)
+
+
+def conclude(trace, rpt):
+    """ End trace, if sampled, with the outcome of report rpt, None for a report without credential links """
+    if rpt is None:
+        tracing.close(trace, status="failed", msg="No credential links found")
+        return
+
+    tracing.close(trace, said=rpt.said, status="complete" if rpt.results is not None else "failed",
+                  msg=rpt.result["msg"] if rpt.result is not None else None)
+
+
+def oobiSaid(link):
+    """ Returns credential SAID from the path of an ACDC credential OOBI link """
+    return parse.urlparse(link).path.lstrip('/oobi/')
+
+
 class ReportIterable:
 
     TimeoutReport = 10
 
-    def __init__(self, uuid, complete, failed):
+    def __init__(self, uuid, verifyEnd):
         self.uuid = uuid
-        self.complete = complete
-        self.failed = failed
+        self.verifyEnd = verifyEnd
+        self.complete = verifyEnd.complete
+        self.failed = verifyEnd.failed
         self.done = False
 
     def __iter__(self):
@@ -494,6 +1130,8 @@ class ReportIterable:
                 if rpt.uuid == self.uuid:
                     data = json.dumps(rpt.results)
                     self.done = True
+                    meter.count("results_served")
+                    served(rpt)
                     return data.encode("utf-8")
                 else:
                     self.complete.append(rpt)
@@ -504,9 +1142,161 @@ class ReportIterable:
                 if rpt.uuid == self.uuid:
                     data = json.dumps(rpt.result)
                     self.done = True
+                    meter.count("results_served")
+                    served(rpt)
                     return data.encode("utf-8")
+                else:
+                    self.failed.append(rpt)
 
             self.end = time.perf_counter()
             return b''
 
+        self.done = True
+        self.verifyEnd.abandon(self.uuid)
         raise StopIteration
+
+
+class BatchEnd:
+    """ Resource for verifying batches of reports through VerifyEnd """
+
+    Parallelism = 16
+
+    def __init__(self, verifyEnd, parallelism=None):
+        """ Create batch verification resource
+
+        Parameters:
+            verifyEnd (VerifyEnd): report verification pipeline
+            parallelism (int): maximum number of reports of one batch in the pipeline at once
+
+        """
+        self.verifyEnd = verifyEnd
+        self.parallelism = parallelism if parallelism is not None else self.Parallelism
+
+    def on_post(self, req, rep):
+        """ Verify batch POST endpoint
+
+        Parameters:
+            req: falcon.Request HTTP request
+            rep: falcon.Response HTTP response
+
+       ---
+        summary:  Verify a batch of reports
+        description:  Verify every report in the batch, streaming one JSON result line per report
+                      as each verification completes
+        tags:
+           - Verify
+        requestBody:
+            required: true
+            content:
+              application/json:
+                schema:
+                  type: object
+                  properties:
+                    reports:
+                      type: array
+                      description: report URLs or objects with either a url or an uploaded report field
+        responses:
+           200:
+              description: newline delimited JSON results, one per report
+           400:
+              description: Invalid batch
+        """
+        self.verifyEnd.admitter.limit(req)
+        items = batchReports(compressing.media(req))
+
+        rep.content_type = "application/x-ndjson"
+        rep.stream = BatchIterable(verifyEnd=self.verifyEnd, reports=items, parallelism=self.parallelism)
+
+
+def batchReports(body):
+    """ Returns the reports of a batch verification request body as dicts with a url or report field
+
+    Raises falcon.HTTPBadRequest for an invalid batch.
+
+    """
+    reports = body.get("reports") if isinstance(body, dict) else body
+    if not isinstance(reports, list) or len(reports) == 0:
+        raise falcon.HTTPBadRequest(title="Invalid batch", description="The request must include a reports list")
+
+    items = []
+    for report in reports:
+        if isinstance(report, str):
+            report = dict(url=report)
+        if not isinstance(report, dict) or not ("url" in report or "report" in report):
+            raise falcon.HTTPBadRequest(title="Invalid batch",
+                                        description="Each report must be a URL or include a url or report field")
+        if not isinstance(report.get("url", report.get("report")), str):
+            raise falcon.HTTPBadRequest(title="Invalid batch",
+                                        description="The url or report field of each report must be a string")
+        items.append(report)
+
+    return items
+
+
+class BatchIterable:
+    """ Iterable that feeds batch reports into VerifyEnd and streams their results as they complete """
+
+    TimeoutReport = ReportIterable.TimeoutReport
+
+    def __init__(self, verifyEnd, reports, parallelism):
+        self.verifyEnd = verifyEnd
+        self.reports = deque(enumerate(reports))
+        self.parallelism = parallelism
+        self.inflight = dict()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.reports and not self.inflight:
+            raise StopIteration
+
+        lines = []
+        while self.reports and len(self.inflight) < self.parallelism:
+            if not self.verifyEnd.admitter.acquire():  # wait for capacity instead of rejecting admitted batches
+                break
+
+            idx, report = self.reports.popleft()
+            try:
+                if "url" in report:
+                    uuid = self.verifyEnd.fetch(report["url"])
+                else:
+                    uuid = self.verifyEnd.upload(report.pop("report").encode("utf-8"))
+            except falcon.HTTPError as ex:  # the slot was released with the invalid report
+                lines.append(dict(i=idx, msg=f"{ex.title}: {ex.description}"))
+                continue
+            except Exception as ex:  # one report must not end the stream of the others' results
+                logger.exception("BatchIterable: starting report %s of batch failed", idx)
+                self.verifyEnd.release()
+                lines.append(dict(i=idx, msg=f"Verification failed: {ex}"))
+                continue
+
+            if uuid is None:
+                lines.append(dict(i=idx, msg="No credential links found"))
+                continue
+
+            self.inflight[uuid] = (idx, time.perf_counter())
+
+        for deck in (self.verifyEnd.complete, self.verifyEnd.failed):
+            for _ in range(len(deck)):
+                rpt = deck.popleft()
+                if rpt.uuid not in self.inflight:
+                    deck.append(rpt)
+                    continue
+
+                idx, _ = self.inflight.pop(rpt.uuid)
+                served(rpt)
+                if rpt.results is not None:
+                    lines.append(dict(i=idx, said=rpt.said, results=rpt.results))
+                else:
+                    lines.append(dict(i=idx, **rpt.result))
+
+        now = time.perf_counter()
+        for uuid, (idx, start) in list(self.inflight.items()):
+            if now - start > self.TimeoutReport:
+                del self.inflight[uuid]
+                self.verifyEnd.abandon(uuid)
+                lines.append(dict(i=idx, msg="Timed out waiting for verification"))
+
+        meter.count("results_served", len(lines))
+        return b"".join(json.dumps(line).encode("utf-8") + b"\n" for line in lines)
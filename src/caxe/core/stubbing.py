@@ -0,0 +1,151 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.stubbing module
+
+Local stub of report hosting and credential OOBI endpoints for offline load tests
+
+"""
+import mimetypes
+import os
+import random
+import socketserver
+import threading
+import time
+from wsgiref import simple_server
+
+import falcon
+
+from caxe.core import fixturing
+
+
+class Stubber:
+    """ Injects configurable latency and failures into stub server responses """
+
+    def __init__(self, latency=0.0, jitter=0.0, failures=0.0, seed=None):
+        """ Create stub behaviour
+
+        Parameters:
+            latency (float): seconds to delay every response
+            jitter (float): maximum additional random seconds of delay
+            failures (float): fraction of requests, between 0 and 1, answered with 503
+            seed (int): optional random seed for reproducible failures and jitter
+
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.failures = failures
+        self.rand = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def respond(self):
+        """ Delay the current request and raise HTTP 503 for a failure """
+        with self.lock:
+            delay = self.latency + (self.rand.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.rand.random() < self.failures
+
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            raise falcon.HTTPServiceUnavailable(title="Stub failure", description="Injected stub failure")
+
+
+class OobiEnd:
+    """ Resource serving fixture credential and schema OOBIs """
+
+    def __init__(self, path, stubber):
+        self.path = path
+        self.stubber = stubber
+
+    def on_get(self, req, rep, said):
+        """ OOBI GET endpoint
+
+        Parameters:
+            req: falcon.Request HTTP request
+            rep: falcon.Response HTTP response
+            said (str): qb64 SAID of credential or schema
+
+        """
+        self.stubber.respond()
+
+        said = os.path.basename(said)
+        for ext, contentType in ((".cesr", "application/acdc+json"), (".json", "application/schema+json")):
+            path = os.path.join(self.path, f"{said}{ext}")
+            if os.path.exists(path):
+                rep.status = falcon.HTTP_200
+                rep.content_type = contentType
+                with open(path, "rb") as f:
+                    rep.data = f.read()
+                return
+
+        raise falcon.HTTPNotFound(title="Not Found", description=f"No OOBI for {said}")
+
+
+class ReportEnd:
+    """ Resource serving fixture reports and their taxonomy files """
+
+    def __init__(self, path, stubber):
+        self.path = os.path.realpath(path)
+        self.stubber = stubber
+
+    def on_get(self, req, rep, name):
+        """ Report GET endpoint
+
+        Parameters:
+            req: falcon.Request HTTP request
+            rep: falcon.Response HTTP response
+            name (str): path of report or taxonomy file relative to the reports directory
+
+        """
+        self.stubber.respond()
+
+        path = os.path.realpath(os.path.join(self.path, name))
+        if not path.startswith(self.path + os.sep) or not os.path.isfile(path):
+            raise falcon.HTTPNotFound(title="Not Found", description=f"No report {name}")
+
+        rep.status = falcon.HTTP_200
+        rep.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        with open(path, "rb") as f:
+            rep.data = f.read()
+
+
+class ThreadingServer(socketserver.ThreadingMixIn, simple_server.WSGIServer):
+    """ WSGI server handling each request in its own thread so injected latency does not serialize requests """
+    daemon_threads = True
+
+
+class QuietHandler(simple_server.WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def app(path, stubber):
+    """ Returns falcon app serving the fixture in directory path
+
+    Parameters:
+        path (str): fixture directory
+        stubber (Stubber): latency and failure injection
+
+    """
+    application = falcon.App()
+    application.add_route("/oobi/{said}", OobiEnd(path=os.path.join(path, "oobis"), stubber=stubber))
+    reportEnd = ReportEnd(path=os.path.join(path, "reports"), stubber=stubber)
+    application.add_sink(reportEnd.on_get, prefix=r"/reports/(?P<name>.+)")  # names span taxonomy subdirectories
+    return application
+
+
+def server(path, host="127.0.0.1", port=8724, stubber=None):
+    """ Returns stub server for the fixture in directory path, call serve_forever() to run it
+
+    Parameters:
+        path (str): fixture directory built by fixturing.Fixturer
+        host (str): host address to bind
+        port (int): port to bind
+        stubber (Stubber): latency and failure injection, none by default
+
+    """
+    fixturing.load(path)  # fail early on a directory that is not a fixture
+    stubber = stubber if stubber is not None else Stubber()
+    return simple_server.make_server(host, port, app(path, stubber), server_class=ThreadingServer,
+                                     handler_class=QuietHandler)
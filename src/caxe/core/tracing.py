@@ -0,0 +1,212 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.tracing module
+
+Sampled trace spans of single report requests exported to a local JSONL file
+
+"""
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from caxe.core.metering import meter
+
+
+class Tracer:
+    """ Sampled tracing of verify and saidify requests
+
+    Tracing is off unless a trace file is configured.  With a file, a .rate fraction of
+    requests is traced.  A trace is keyed by the uuid of the report's verification, or a
+    random id for saidify requests, and holds a root span for the whole request with a
+    child span for each stage the report passes through, each deck it waits in and
+    each credential OOBI fetch it starts.  Every span is appended to the file as one
+    JSON line when it ends, by a single write so processes sharing the file never
+    interleave lines, and timeline() rebuilds the timeline of a request offline.
+
+    """
+
+    def __init__(self, path=None, rate=1.0):
+        """ Create tracer
+
+        Parameters:
+            path (str): JSONL file to append spans to, None disables tracing
+            rate (float): fraction of requests traced, from 0.0 to 1.0
+
+        """
+        self.path = path
+        self.rate = rate
+        self.fd = None
+
+        if self.path is not None and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def __getstate__(self):
+        """ Returns tracer state without the open file, worker processes open their own """
+        return dict(self.__dict__, fd=None)
+
+    def trace(self, tid, name, **attrs):
+        """ Returns new Trace of request tid, started with root span name, if the request is sampled, otherwise None
+
+        Parameters:
+            tid (str): trace id, the uuid of the report's verification
+            name (str): name of the root span
+            attrs (dict): attributes of the root span
+
+        """
+        if self.path is None or random.random() >= self.rate:
+            return None
+
+        meter.count("traces_sampled")
+        return Trace(tracer=self, tid=tid, name=name, attrs=attrs)
+
+    def export(self, record):
+        """ Append finished span record to the trace file """
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+        os.write(self.fd, json.dumps(record, default=str).encode("utf-8") + b"\n")
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class Span:
+    """ Timed operation of a trace """
+
+    __slots__ = ("trace", "sid", "parent", "name", "wall", "start", "attrs")
+
+    def __init__(self, trace, name, parent=None, attrs=None):
+        self.trace = trace
+        self.sid = os.urandom(8).hex()
+        self.parent = parent
+        self.name = name
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        self.attrs = attrs if attrs is not None else dict()
+
+    def end(self, **attrs):
+        """ Finish span with additional attributes and export it """
+        self.attrs.update(attrs)
+        self.trace.tracer.export(dict(trace=self.trace.tid, span=self.sid, parent=self.parent, name=self.name,
+                                      start=self.wall, secs=time.perf_counter() - self.start, attrs=self.attrs))
+
+
+class Trace:
+    """ Spans of one traced request, open spans keyed by name and an optional key such as a credential SAID """
+
+    __slots__ = ("tracer", "tid", "root", "spans")
+
+    def __init__(self, tracer, tid, name, attrs=None):
+        self.tracer = tracer
+        self.tid = tid
+        self.root = Span(trace=self, name=name, attrs=attrs)
+        self.spans = dict()
+
+    def begin(self, name, key=None, **attrs):
+        """ Start child span name of the root span, ending any open span of the same name and key """
+        self.end(name, key=key)
+        span = self.spans[(name, key)] = Span(trace=self, name=name, parent=self.root.sid, attrs=attrs)
+        return span
+
+    def end(self, name, key=None, **attrs):
+        """ End open span name with additional attributes, if it is open """
+        if (span := self.spans.pop((name, key), None)) is not None:
+            span.end(**attrs)
+
+    def close(self, **attrs):
+        """ End the root span with additional attributes, ending every span still open as abandoned """
+        for span in list(self.spans.values()):
+            span.end(abandoned=True)
+        self.spans.clear()
+        self.root.end(**attrs)
+
+
+def begin(trace, name, key=None, **attrs):
+    """ Start span name of trace, if any """
+    if trace is not None:
+        trace.begin(name, key=key, **attrs)
+
+
+def end(trace, name, key=None, **attrs):
+    """ End open span name of trace, if any """
+    if trace is not None:
+        trace.end(name, key=key, **attrs)
+
+
+def close(trace, **attrs):
+    """ End the root span of trace, if any """
+    if trace is not None:
+        trace.close(**attrs)
+
+
+@contextmanager
+def spanned(trace, name, **attrs):
+    """ Context manager recording the enclosed block as span name of trace, if any, yielding the span or None """
+    if trace is None:
+        yield None
+        return
+
+    span = Span(trace=trace, name=name, parent=trace.root.sid, attrs=attrs)
+    try:
+        yield span
+    finally:
+        span.end()
+
+
+@contextmanager
+def timed(trace, stage):
+    """ Context manager recording the latency of the enclosed block as pipeline stage and as a span of trace """
+    with meter.timed(stage), spanned(trace, stage):
+        yield
+
+
+def timeline(path, tid):
+    """ Returns the spans of trace tid in the trace file at path, ordered by start time
+
+    Each span dict gains `offset`, its start in seconds after the earliest span of the
+    trace, and `depth`, its number of ancestors.
+
+    """
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:  # line cut short by a crash
+                continue
+
+            if record.get("trace") == tid:
+                spans.append(record)
+
+    spans.sort(key=lambda record: record["start"])
+    parents = {record["span"]: record["parent"] for record in spans}
+    origin = spans[0]["start"] if spans else 0.0
+    for record in spans:
+        depth, parent = 0, record["parent"]
+        while parent is not None and depth < len(spans):
+            depth, parent = depth + 1, parents.get(parent)
+        record["offset"] = record["start"] - origin
+        record["depth"] = depth
+
+    return spans
+
+
+def slowest(path, count=10):
+    """ Returns root span records of the count slowest traces in the trace file at path """
+    roots = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+
+            if record.get("parent") is None:
+                roots.append(record)
+
+    return sorted(roots, key=lambda record: record["secs"], reverse=True)[:count]
@@ -4,6 +4,114 @@ KERI
 caxe.core.verifying module
 
 """
+import base64
+import re
+from dataclasses import dataclass
+
+import blake3
+from lxml import etree, html
+
+from keri.core import coring
+
+from caxe.core import saiding
+from caxe.core.metering import meter
+
+IX_NAMESPACES = ("http://www.xbrl.org/2013/inlineXBRL", "http://www.xbrl.org/2008/inlineXBRL")
+FACT_TAGS = tuple(f"{{{ns}}}{name}" for ns in IX_NAMESPACES for name in ("nonFraction", "nonNumeric", "fraction"))
+Declaration = re.compile(rb'\sxmlns(?::([^\s=]+))?="([^"]*)"')  # namespace declarations as serialized by lxml
+
+
+def encode(raw):
+    """ Returns qb64 of 32 byte Blake3-256 digest raw
+
+    Equivalent to coring.Diger(raw=raw).qb64 without the cost of constructing a Matter
+    instance for each of the many fact digests of a report.
+
+    """
+    return coring.MtrDex.Blake3_256 + base64.urlsafe_b64encode(b'\x00' + raw)[1:].decode("utf-8")
+
+
+@dataclass(slots=True)
+class Digests:
+    """ Digests of an iXBRL report
+
+    Attributes:
+        rd (str): qb64 digest of canonical form of report without its credential links
+        facts (dict): qb64 digest of each fact keyed by fact id
+
+    """
+    rd: str
+    facts: dict
+
+
+def canonical(root):
+    """ Returns the C14N 2.0 canonical form of HTML parsed report root, as etree.canonicalize does
+
+    The HTML parser keeps namespace declarations as plain attributes, so the serialized
+    tree is parsed again as XML to resolve them.  lxml's canonicalize() writes C14N 2.0 in
+    Python, several times slower than libxml2's exclusive C14N 1.0, which renders the same
+    bytes unless a namespace is bound to more than one prefix and C14N 2.0 rewrites the
+    prefixes of the alias.  Reports declaring such aliases take the slow path.
+
+    """
+    data = etree.tostring(root)
+    prefixes = dict()
+    for prefix, uri in Declaration.findall(data):  # a declaration quoted in text at worst takes the slow path
+        prefixes.setdefault(uri, set()).add(prefix)
+
+    if any(len(names) > 1 for names in prefixes.values()):
+        return etree.canonicalize(data.decode("utf-8")).encode("utf-8")
+
+    tree = etree.fromstring(data, parser=etree.XMLParser(huge_tree=True))
+    return etree.tostring(tree, method="c14n", exclusive=True, with_comments=False)
+
+
+def digest(doc, root=None):
+    """ Calculate report digest and the digest of every fact in the document
+
+    The report digest is calculated from the canonical form of the report with its
+    ACDC credential links removed, the same way `cake extract` calculates it.  Fact
+    digests are calculated in a single traversal of the inline XBRL fact elements of
+    the document.  Facts without an id are given the same ixv-N id Arelle assigns.
+
+    The HTML parser lower cases names and drops namespaces, so facts are digested from
+    a forgiving XML parse of the document, the form Arelle attests them in.  A document
+    that is not well formed XML has only the facts the XML parser recovers.
+
+    Parameters:
+        doc (bytes|str): iXBRL report
+        root (HtmlElement): the document already parsed with html.document_fromstring, its
+                            credential links are removed
+
+    Returns:
+        Digests: report and fact digests
+
+    """
+    if isinstance(doc, str):
+        doc = doc.encode("utf-8")
+
+    if root is None:
+        with meter.timed("parse"):
+            root = html.document_fromstring(doc)
+
+    for link in root.xpath(".//link[@type='application/json+acdc']"):
+        link.getparent().remove(link)
+
+    with meter.timed("canonicalize"):
+        rd = encode(blake3.blake3(canonical(root)).digest())
+
+    facts = dict()
+    with meter.timed("parse"):
+        root = etree.fromstring(doc, parser=etree.XMLParser(huge_tree=True, recover=True))
+
+    for idx, fact in enumerate(root.iter(*FACT_TAGS) if root is not None else ()):
+        if (fid := fact.get("id")) is None:
+            fid = "ixv-%d" % idx
+            fact.set("id", fid)
+
+        facts[fid] = encode(blake3.blake3(etree.tostring(fact)).digest())
+
+    return Digests(rd=rd, facts=facts)
 
 
 def verify(doc, values):
@@ -11,5 +119,42 @@ def verify(doc, values):
       Parse the doc, verify the digest of canonical form or entire doc
       Read values, extract content and verify digest of each element.
 
+    Parameters:
+        doc (bytes|str|Digests): iXBRL report or its previously calculated digests
+        values (list): attested facts, the `f` list of a data attestation, its blocks if the facts
+                       are attested in blocks
+
+    Returns:
+        dict: report digest `rd` and the ids of `matched`, `mismatched` and `missing` facts,
+              where missing facts are attested but not present in the document
+
+    Raises:
+        ValueError: if values is not a list of facts with string `i` and `d` fields or of
+                    blocks of them with matching SAIDs
+
     """
+    values = saiding.expand(values)
+    if not isinstance(values, list) or not all(isinstance(value, dict) and isinstance(value.get('i'), str)
+                                               and isinstance(value.get('d'), str) for value in values):
+        raise ValueError("attested facts must be a list of facts with i and d fields")
+
+    digests = doc if isinstance(doc, Digests) else digest(doc)
+
+    index = {value['i']: value['d'] for value in values}
+    matched = []
+    mismatched = []
+    for fid, dig in digests.facts.items():
+        if (attested := index.pop(fid, None)) is None:
+            continue
+
+        if attested == dig:
+            matched.append(fid)
+        else:
+            mismatched.append(fid)
 
+    return dict(
+        rd=digests.rd,
+        matched=matched,
+        mismatched=mismatched,
+        missing=list(index.keys())
+    )
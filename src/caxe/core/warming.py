@@ -0,0 +1,182 @@
+# -*- encoding: utf-8 -*-
+"""
+CAXE
+caxe.core.warming module
+
+Background resolution of the credential and issuer OOBIs a service expects to verify
+
+"""
+import time
+from urllib import parse
+
+from hio.base import doing
+from hio.core import http
+from keri import help
+from keri.db import basing
+from keri.help import helping
+
+from caxe.core import serving
+from caxe.core.metering import meter
+
+logger = help.ogler.getLogger()
+
+
+class Oobis:
+    """ Credential and issuer OOBIs to keep resolved, from the keystore configuration file
+
+    Configuration file fields:
+        curls (list): credential OOBI URLs, such as the data attestations of frequent filers
+        iurls (list): issuer identifier OOBI URLs, such as the GLEIF root and the QVIs
+
+    """
+
+    def __init__(self, curls=None, iurls=None, interval=None):
+        """ Create OOBI warming configuration
+
+        Parameters:
+            curls (list): credential OOBI URLs
+            iurls (list): identifier OOBI URLs
+            interval (float): seconds between refreshes, defaults to half the verification cache TTL
+
+        """
+        self.curls = list(curls) if curls is not None else []
+        self.iurls = list(iurls) if iurls is not None else []
+        self.interval = interval
+
+    @classmethod
+    def load(cls, cf, interval=None):
+        """ Returns OOBI warming configuration of the configuration file cf, which may be None """
+        conf = cf.get() if cf is not None else dict()
+        return cls(curls=conf.get("curls"), iurls=conf.get("iurls"), interval=interval)
+
+    def warmers(self, resolver, hby):
+        """ Returns list of the Warmer doer resolving the OOBIs into resolver, empty if there are none """
+        if not self.curls and not self.iurls:
+            return []
+
+        return [Warmer(resolver=resolver, hby=hby, curls=self.curls, iurls=self.iurls, interval=self.interval)]
+
+
+class Warmer(doing.DoDoer):
+    """ Resolves configured OOBIs at startup and refreshes them on a schedule
+
+    Identifier OOBIs are queued for the keystore's Oobiery, which fetches and parses
+    their KELs.  Credential OOBIs are fetched into the parser of the resolver like those
+    of a report and their chains resolved, so the credentials are fresh and verifying a
+    report that links them only reads the registry.  Refreshing picks up rotations and
+    revocations before a report needs them.
+
+    """
+
+    Interval = 300.0  # seconds between refreshes when verification results are not cached
+    Expiry = 30.0  # seconds a credential OOBI may take to fetch and resolve
+
+    def __init__(self, resolver, hby, curls=(), iurls=(), interval=None):
+        """ Create OOBI warmer
+
+        Parameters:
+            resolver (Resolver): parser and chain cache of the verification endpoints
+            hby (Habery): keystore whose Oobiery resolves identifier OOBIs
+            curls (list): credential OOBI URLs
+            iurls (list): identifier OOBI URLs
+            interval (float): seconds between refreshes, defaults to half the verification cache
+                              TTL so warmed credentials stay fresh, or .Interval without a cache
+
+        """
+        self.resolver = resolver
+        self.hby = hby
+        self.curls = list(curls)
+        self.iurls = list(iurls)
+        if interval is None:
+            ttl = resolver.cacher.ttl
+            interval = min(self.Interval, ttl / 2) if ttl > 0 else self.Interval
+        self.interval = interval
+        self.fetches = dict()
+        self.parsing = dict()
+
+        meter.depth("warming", lambda: len(self.fetches) + len(self.parsing))
+
+        super(Warmer, self).__init__(doers=[doing.doify(self.warmDo)])
+
+    def refresh(self):
+        """ Queue identifier OOBIs for the Oobiery and fetch every credential OOBI not already in flight """
+        for url in self.iurls:
+            self.hby.db.oobis.pin(keys=(url,), val=basing.OobiRecord(date=helping.nowIso8601()))
+
+        for link in self.curls:
+            said = serving.oobiSaid(link)
+            if said in self.fetches or said in self.parsing:
+                continue
+
+            purl = parse.urlparse(link)
+            client = http.clienting.Client(hostname=purl.hostname, port=purl.port)
+            clientDoer = http.clienting.ClientDoer(client=client)
+            self.extend([clientDoer])
+
+            client.request(
+                method="GET",
+                path=purl.path,
+                qargs=parse.parse_qs(purl.query),
+            )
+            self.fetches[said] = (link, clientDoer, time.perf_counter())
+
+        meter.count("oobis_refreshed", len(self.curls) + len(self.iurls))
+
+    def collect(self):
+        """ Parse fetched credential streams and resolve the chains of parsed credentials """
+        now = time.perf_counter()
+        for said, (link, clientDoer, start) in list(self.fetches.items()):
+            if not clientDoer.client.responses:
+                if now - start > self.Expiry:
+                    self.remove([clientDoer])
+                    del self.fetches[said]
+                    logger.error("Timed out warming credential OOBI %s", link)
+                    meter.count("oobis_failed")
+                continue
+
+            response = clientDoer.client.responses.popleft()
+            self.remove([clientDoer])
+            del self.fetches[said]
+
+            if not (response["status"] == 200) or \
+                    response["headers"].get("Content-Type") != "application/acdc+json":
+                logger.error("Invalid response %s warming credential OOBI %s", response["status"], link)
+                meter.count("oobis_failed")
+                continue
+
+            self.resolver.parse(said, response["body"])
+            self.parsing[said] = (link, start)
+
+        for said, (link, start) in list(self.parsing.items()):
+            if self.resolver.chainer.resolve(said) is not None:
+                del self.parsing[said]
+                meter.observe("warm", now - start)
+            elif now - start > self.Expiry:
+                del self.parsing[said]
+                logger.error("Timed out resolving chain of warmed credential OOBI %s", link)
+                meter.count("oobis_failed")
+
+    def warmDo(self, tymth=None, tock=0.0):
+        """
+        Returns doifiable Doist for resolving the OOBIs at startup and every .interval seconds
+
+        Parameters:
+            tymth (function): injected function wrapper closure returned by .tymen() of
+                Tymist instance. Calling tymth() returns associated Tymist .tyme.
+            tock (float): injected initial tock value
+
+        Usage:
+            add result of doify on this method to doers list
+        """
+        self.wind(tymth)
+        self.tock = tock
+        _ = (yield self.tock)
+
+        last = None
+        while True:
+            if last is None or time.monotonic() - last >= self.interval:
+                self.refresh()
+                last = time.monotonic()
+
+            self.collect()
+            yield self.tock
@@ -0,0 +1,112 @@
+# -*- encoding: utf-8 -*-
+"""
+tests.core.test_compressing module
+
+"""
+import gzip
+import os
+import zlib
+
+import falcon
+import pytest
+
+from caxe.core import compressing
+
+Data = os.urandom(100000) + b"x" * 300000
+
+
+def decode(encodings, body, limit=compressing.Limit):
+    """ Returns body decoded chunk by chunk as the request handlers do and the decoder """
+    decoder = compressing.Decoder(encodings, limit=limit)
+    chunks = [decoder.decode(body[idx:idx + compressing.Chunk]) for idx in range(0, len(body), compressing.Chunk)]
+    chunks.append(decoder.flush())
+    return b"".join(chunks), decoder
+
+
+def brotli():
+    return pytest.importorskip("brotli")
+
+
+def bomb(megabytes):
+    """ Returns gzip of gzip of megabytes MB of zeros """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, compressing.Windows["gzip"])
+    block = bytes(1 << 20)
+    inner = b"".join(compressor.compress(block) for _ in range(megabytes)) + compressor.flush()
+    return gzip.compress(inner, 9)
+
+
+@pytest.mark.parametrize("encoding,compress", [("gzip", gzip.compress), ("deflate", zlib.compress)])
+def test_decode(encoding, compress):
+    data, decoder = decode([encoding], compress(Data))
+    assert data == Data
+    assert decoder.size == len(Data)
+
+
+def test_decode_br():
+    data, _ = decode(["br"], brotli().compress(Data))
+    assert data == Data
+
+
+def test_decode_stacked():
+    data, decoder = decode(["gzip", "gzip"], gzip.compress(gzip.compress(Data)))
+    assert data == Data
+    assert decoder.size == len(Data)
+
+    data, _ = decode(["deflate", "br"], brotli().compress(zlib.compress(Data)))
+    assert data == Data
+
+
+def test_too_many_codings():
+    with pytest.raises(falcon.HTTPUnsupportedMediaType):
+        compressing.Decoder(["gzip", "gzip", "gzip"])
+
+    with pytest.raises(falcon.HTTPUnsupportedMediaType):
+        compressing.Decoder(["compress"])
+
+
+@pytest.mark.parametrize("encodings,body", [
+    (["gzip"], gzip.compress(Data)[:-20]),
+    (["deflate"], zlib.compress(Data)[:len(zlib.compress(Data)) // 2]),
+    (["gzip", "gzip"], gzip.compress(gzip.compress(Data))[:-100]),
+    (["gzip"], b"not gzip at all"),
+])
+def test_truncated(encodings, body):
+    with pytest.raises(falcon.HTTPBadRequest):
+        decode(encodings, body)
+
+
+def test_truncated_br():
+    with pytest.raises(falcon.HTTPBadRequest):
+        decode(["br"], brotli().compress(Data)[:-20])
+
+
+def test_bomb():
+    """ Each stage stops within one piece of the limit however far the body would expand """
+    limit = 1 << 20
+    body = bomb(64)
+    decoder = compressing.Decoder(["gzip", "gzip"], limit=limit)
+    with pytest.raises(falcon.HTTPPayloadTooLarge):
+        for idx in range(0, len(body), compressing.Chunk):
+            decoder.decode(body[idx:idx + compressing.Chunk])
+        decoder.flush()
+
+    assert max(decoder.sizes) <= limit + compressing.Chunk
+
+
+def test_bomb_br():
+    limit = 1 << 20
+    body = brotli().compress(bytes(64 << 20), quality=5)
+    decoder = compressing.Decoder(["br"], limit=limit)
+    with pytest.raises(falcon.HTTPPayloadTooLarge):
+        decoder.decode(body)
+        decoder.flush()
+
+    assert decoder.size <= limit + compressing.Chunk
+
+
+def test_limit():
+    data, _ = decode(["gzip"], gzip.compress(Data), limit=len(Data))
+    assert data == Data
+
+    with pytest.raises(falcon.HTTPPayloadTooLarge):
+        decode(["gzip"], gzip.compress(Data), limit=len(Data) - 1)
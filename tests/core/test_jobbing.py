@@ -0,0 +1,84 @@
+# -*- encoding: utf-8 -*-
+"""
+tests.core.test_jobbing module
+
+"""
+import time
+
+from hio.base import doing
+from keri.app import habbing
+
+from caxe.core import jobbing, serving
+
+Linked = (b'<html><head><link type="application/json+acdc" href="http://127.0.0.1:5642/oobi/EAAA"/></head>'
+          b'<body>report</body></html>')
+Unlinked = b"<html><body>report</body></html>"
+
+
+def test_restart(tmp_path):
+    jobber = jobbing.Jobber(name="test", headDirPath=str(tmp_path), temp=False, reopen=True)
+    jobber.create("JURL", url="http://127.0.0.1/report.xhtml")
+    time.sleep(0.001)  # pending jobs are resumed oldest first
+    jobber.create("JUP", data=Linked)
+    jobber.create("JDONE", url="http://127.0.0.1/done.xhtml")
+    jobber.finish("JDONE", said="ESAID", results=dict(EAAA=dict(i="EISS")))
+    jobber.create("JUP", url="http://127.0.0.1/other.xhtml")  # an existing job is left as is
+    jobber.close()
+
+    jobber = jobbing.Jobber(name="test", headDirPath=str(tmp_path), temp=False, reopen=True)
+    try:
+        assert [jid for jid, _ in jobber.pending()] == ["JURL", "JUP"]
+        assert jobber.get("JUP").url is None
+        assert jobber.report("JUP") == Linked
+        assert jobber.report("JURL") is None
+
+        rec = jobber.get("JDONE")
+        assert (rec.status, rec.said, rec.results) == (jobbing.Complete, "ESAID", dict(EAAA=dict(i="EISS")))
+
+        jobber.finish("JUP", msg="failed")
+        assert jobber.get("JUP").status == jobbing.Failed
+        assert jobber.report("JUP") is None
+        assert [jid for jid, _ in jobber.pending()] == ["JURL"]
+
+        assert jobber.prune(3600.0) == 0
+        assert jobber.prune(-1.0) == 2
+        assert jobber.get("JDONE") is None and jobber.get("JURL") is not None
+    finally:
+        jobber.close()
+
+
+def test_resume(tmp_path):
+    jobber = jobbing.Jobber(name="test", headDirPath=str(tmp_path), temp=False, reopen=True)
+    jobber.create("JURL", url="http://127.0.0.1:5642/report.xhtml")
+    jobber.create("JLINKED", data=Linked)
+    jobber.create("JUNLINKED", data=Unlinked)
+    jobber.create("JLOST", data=Unlinked)
+    jobber.delVal(jobber.reps, b"JLOST")
+    jobber.close()
+
+    jobber = jobbing.Jobber(name="test", headDirPath=str(tmp_path), temp=False, reopen=True)
+    with habbing.openHby(name="test", temp=True) as hby:
+        hab, kvy, tvy, rvy, verfer = serving.components(hby, "caxe")
+        verifyEnd = serving.VerifyEnd(hby=hby, hab=hab, kvy=kvy, rvy=rvy, tvy=tvy, vry=verfer, jobber=jobber)
+
+        doist = doing.Doist(tock=0.0)
+        resumer = verifyEnd.jobDo(tymth=doist.tymen(), tock=0.0)
+        next(resumer)
+        for _ in range(5):
+            next(resumer)
+
+        assert not verifyEnd.resumes
+        assert verifyEnd.jobs == {"JURL", "JLINKED"}
+        assert [rpt.uuid for rpt in verifyEnd.pages] == ["JURL"]
+        assert [rpt.uuid for rpt in verifyEnd.requests] == ["JLINKED"]
+        assert verifyEnd.admitter.active == 2
+
+        assert jobber.get("JUNLINKED").status == jobbing.Failed
+        assert jobber.get("JUNLINKED").msg == "No credential links found"
+        assert jobber.get("JLOST").msg == "Uploaded report of job was lost"
+        assert {jid for jid, _ in jobber.pending()} == {"JURL", "JLINKED"}
+
+        for rpt in verifyEnd.pages:
+            verifyEnd.remove([rpt.clientDoer])
+
+    jobber.close()
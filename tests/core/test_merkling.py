@@ -0,0 +1,90 @@
+# -*- encoding: utf-8 -*-
+"""
+tests.core.test_merkling module
+
+"""
+import json
+
+import pytest
+
+from caxe.core import merkling, saiding
+
+
+def facts(count):
+    return [dict(i=f"f{idx}", d=f"E{idx:043d}", v=str(idx)) for idx in range(count)]
+
+
+@pytest.mark.parametrize("count", range(1, 9))
+def test_prove_verify(count):
+    records = facts(count)
+    root = merkling.Merkler(records).root
+    for record in records:
+        proof = merkling.prove(records, record["i"])
+        assert proof["mr"] == root and proof["n"] == count
+        assert merkling.verify(proof)
+        assert merkling.verify(proof, mr=root)
+
+
+def test_root():
+    assert merkling.Merkler([]).root != merkling.Merkler(facts(1)).root
+    assert merkling.Merkler(facts(2)).root != merkling.Merkler(list(reversed(facts(2)))).root
+
+    merkler = merkling.Merkler()
+    for record in facts(5):
+        merkler.add(record)
+    assert merkler.root == merkling.Merkler(facts(5)).root
+
+
+@pytest.mark.parametrize("count", range(1, 9))
+def test_verify_forged_index(count):
+    """ No proof verifies under another index or leaf count than those of its tree """
+    records = facts(count)
+    for record in records:
+        proof = merkling.prove(records, record["i"])
+        for n in range(1, 2 * count + 2):
+            for x in range(n):
+                if (x, n) != (proof["x"], proof["n"]):
+                    assert not merkling.verify({**proof, "x": x, "n": n})
+
+
+def test_verify_forged_promoted():
+    """ The promoted last leaf of a three leaf tree cannot pose as the second leaf of a two leaf tree """
+    proof = merkling.prove(facts(3), "f2")
+    assert (proof["x"], proof["n"], len(proof["p"])) == (2, 3, 1)
+    assert not merkling.verify({**proof, "x": 1, "n": 2})
+
+
+def test_verify_tampered():
+    records = facts(5)
+    proof = merkling.prove(records, "f3")
+    other = merkling.Merkler(facts(6)).root
+
+    assert not merkling.verify(proof, mr=other)
+    assert not merkling.verify({**proof, "f": {**proof["f"], "v": "9"}})
+    assert not merkling.verify({**proof, "i": "f2"})
+    assert not merkling.verify({**proof, "p": proof["p"][:-1]})
+    assert not merkling.verify({**proof, "p": proof["p"] + proof["p"][:1]})
+    assert not merkling.verify({**proof, "p": [proof["p"][0][:-1] + "A"] + proof["p"][1:]})
+    assert not merkling.verify({**proof, "p": ["not a digest"] + proof["p"][1:]})
+    assert not merkling.verify({**proof, "x": -1})
+    assert not merkling.verify({key: value for key, value in proof.items() if key != "n"})
+
+
+def test_prove_unknown():
+    with pytest.raises(ValueError):
+        merkling.prove(facts(3), "f9")
+
+    with pytest.raises(ValueError):
+        merkling.Merkler(facts(3)).proof(1, facts(3)[2])
+
+
+def test_prove_blocks():
+    records = facts(5)
+    _, compact, raw = saiding.blocks(dict(d="", f=records), name="f", size=2)
+
+    proof = merkling.prove(json.loads(raw)["f"], "f3")
+    assert proof == merkling.prove(records, "f3")
+    assert merkling.verify(proof)
+
+    with pytest.raises(ValueError):
+        merkling.prove(compact["f"], "f3")
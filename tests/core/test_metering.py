@@ -0,0 +1,59 @@
+# -*- encoding: utf-8 -*-
+"""
+tests.core.test_metering module
+
+"""
+from caxe.core import metering
+
+
+def total(text, name):
+    """ Returns the value of the sample line of text starting with name """
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+
+    return None
+
+
+def test_render_sums_states():
+    meter = metering.Meter()
+    meter.observe("parse", 0.002)
+    meter.count("results_served", 2)
+    meter.depth("verify_active", lambda: 1)
+
+    other = metering.Meter()
+    other.observe("parse", 3.0)
+    other.count("results_served", 3)
+    other.count("jobs_expired")
+    other.depth("verify_active", lambda: 2)
+
+    text = meter.render([other.state()])
+    assert total(text, 'caxe_stage_seconds_count{stage="parse"}') == 2
+    assert total(text, 'caxe_stage_seconds_bucket{stage="parse",le="0.005"}') == 1
+    assert total(text, 'caxe_stage_seconds_bucket{stage="parse",le="+Inf"}') == 2
+    assert total(text, 'caxe_stage_seconds_sum{stage="parse"}') == 3.002
+    assert total(text, "caxe_results_served_total") == 5
+    assert total(text, "caxe_jobs_expired_total") == 1
+    assert total(text, 'caxe_deck_depth{deck="verify_active"}') == 3
+
+
+def test_sharer_states(tmp_path, monkeypatch):
+    meter = metering.Meter()
+    monkeypatch.setattr(metering, "meter", meter)
+
+    meter.count("results_served", 4)
+    meter.depth("verify_active", lambda: 1)
+    metering.Sharer(path=str(tmp_path), name="worker-0").publish()
+
+    owner = metering.Sharer(path=str(tmp_path), name="owner")
+    owner.publish()
+    assert [state["counters"]["results_served"] for state in owner.states()] == [4]
+
+    # a restarted worker carries its predecessor's counters forward but not its gauges
+    meter.counters = dict(results_served=1)
+    worker = metering.Sharer(path=str(tmp_path), name="worker-0")
+    assert worker.states()[0]["counters"]["results_served"] == 4
+    assert worker.states()[0]["depths"] == {}
+    worker.publish()
+    assert metering.Sharer.read(worker.filename("worker-0"))["counters"]["results_served"] == 5
+    assert metering.Sharer.read(worker.filename("worker-0"))["depths"] == {"verify_active": 1}
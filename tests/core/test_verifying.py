@@ -0,0 +1,78 @@
+# -*- encoding: utf-8 -*-
+"""
+tests.core.test_verifying module
+
+"""
+import json
+
+import blake3
+import pytest
+from lxml import etree, html
+
+from caxe.core import saiding, verifying
+
+Report = b"""<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">
+<head><title>Report</title><link type="application/json+acdc" href="http://127.0.0.1/oobi/EAAA"/></head>
+<body>
+<p><ix:nonFraction id="f0" name="ifrs-full:Revenue" contextRef="c" unitRef="u" decimals="0">100</ix:nonFraction></p>
+<p><ix:nonNumeric id="f1" name="ifrs-full:Name" contextRef="c">Filer</ix:nonNumeric></p>
+<p><ix:nonFraction name="ifrs-full:Profit" contextRef="c" unitRef="u" decimals="0">7</ix:nonFraction></p>
+</body>
+</html>"""
+
+
+def test_digest():
+    digests = verifying.digest(Report)
+    assert list(digests.facts) == ["f0", "f1", "ixv-2"]  # Arelle's id of a fact without one
+    assert all(len(dig) == 44 and dig.startswith("E") for dig in digests.facts.values())
+
+    # the report digest excludes the credential links and matches C14N 2.0 of the report
+    root = html.document_fromstring(Report)
+    for link in root.xpath(".//link[@type='application/json+acdc']"):
+        link.getparent().remove(link)
+    canonical = etree.canonicalize(etree.tostring(root).decode("utf-8")).encode("utf-8")
+    assert digests.rd == verifying.encode(blake3.blake3(canonical).digest())
+
+    unlinked = Report.replace(b'<link type="application/json+acdc" href="http://127.0.0.1/oobi/EAAA"/>', b"")
+    assert verifying.digest(unlinked).rd == digests.rd
+    assert verifying.digest(Report.replace(b">100<", b">101<")).rd != digests.rd
+    assert verifying.digest(Report.decode("utf-8")) == digests
+
+
+def test_digest_malformed():
+    digests = verifying.digest(b"<html><body><p>unclosed<br></body></html>")
+    assert digests.facts == {}
+
+
+def test_verify():
+    digests = verifying.digest(Report)
+    values = [dict(i=fid, d=dig) for fid, dig in digests.facts.items()]
+    values[1]["d"] = digests.facts["f0"]
+    values.append(dict(i="f9", d=digests.facts["f0"]))
+
+    result = verifying.verify(Report, values)
+    assert result == dict(rd=digests.rd, matched=["f0", "ixv-2"], mismatched=["f1"], missing=["f9"])
+    assert verifying.verify(digests, values) == result
+    assert verifying.verify(digests, [])["matched"] == []
+
+
+@pytest.mark.parametrize("values", [None, "f", [1], [dict(i="f0")], [dict(i="f0", d=1)], [dict(i=0, d="E")]])
+def test_verify_malformed(values):
+    with pytest.raises(ValueError):
+        verifying.verify(verifying.digest(Report), values)
+
+
+def test_verify_blocks():
+    digests = verifying.digest(Report)
+    values = [dict(i=fid, d=dig) for fid, dig in digests.facts.items()]
+    _, compact, raw = saiding.blocks(dict(d="", f=values), name="f", size=2)
+
+    expanded = json.loads(raw)["f"]
+    assert verifying.verify(digests, expanded)["matched"] == ["f0", "f1", "ixv-2"]
+
+    with pytest.raises(ValueError):  # the block SAIDs alone cannot be checked
+        verifying.verify(digests, compact["f"])
+
+    expanded[0]["f"][0]["d"] = digests.facts["f1"]
+    with pytest.raises(ValueError):  # the block no longer matches its SAID
+        verifying.verify(digests, expanded)